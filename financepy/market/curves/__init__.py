@@ -7,3 +7,5 @@ from .discount_curve_pwf import *
 from .discount_curve_pwl import *
 from .discount_curve_poly import *
 from .discount_curve_zeros import *
+from .discount_curve_set import *
+from .curve_store import *
@@ -0,0 +1,262 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import os
+from multiprocessing import shared_memory
+from typing import Optional
+
+import numpy as np
+
+from .interpolator import Interpolator, InterpTypes, _fit_coeffs
+from .discount_curve import DiscountCurve
+
+from ...utils.date import Date, excel_serial_to_date
+from ...utils.error import FinError
+from ...utils.frequency import FrequencyTypes
+from ...utils.day_count import DayCountTypes
+from ...utils.helpers import check_argument_types
+from ...utils.helpers import label_to_string
+
+# Each curve has a record of its offset into the store, its number of grid
+# points, its interpolation type, the Excel serial of its valuation date and
+# its frequency and day count types. A type that is None is stored as -1.
+_RECORD_SIZE = 6
+
+###############################################################################
+
+
+def _enum_to_value(enum_type):
+    """ The value of an enum type as stored in a curve record. """
+
+    if enum_type is None:
+        return -1
+
+    return enum_type.value
+
+###############################################################################
+
+
+def _value_to_enum(enum_class, value):
+    """ The enum type of a value stored in a curve record. """
+
+    if value < 0:
+        return None
+
+    return enum_class(int(value))
+
+###############################################################################
+
+
+class StoredDiscountCurve(DiscountCurve):
+    """ A discount curve whose grid times, discount factors and fitted
+    interpolation coefficients are views into a CurveStore. Nothing is copied
+    or refitted when it is created. The views are read-only as the arrays are
+    shared with every other process attached to the store. """
+
+    def __init__(self,
+                 value_date: Date,
+                 times: np.ndarray,
+                 dfs: np.ndarray,
+                 coeffs: np.ndarray,
+                 interp_type: InterpTypes,
+                 freq_type: Optional[FrequencyTypes],
+                 dc_type: Optional[DayCountTypes]):
+
+        for array in (times, dfs, coeffs):
+            array.flags.writeable = False
+
+        self._value_date = value_date
+        self._times = times
+        self._dfs = dfs
+        self._interp_type = interp_type
+        self._freq_type = freq_type
+        self._dc_type = dc_type
+
+        self._interpolator = Interpolator(interp_type)
+        self._interpolator._times = times
+        self._interpolator._dfs = dfs
+        self._interpolator._coeffs = coeffs
+
+###############################################################################
+
+
+class CurveStore():
+    """ A store which packs the grid times, discount factors, interpolation
+    coefficients and interpolation types of a list of built discount curves
+    into one block of shared memory or one memory-mapped file. Other processes
+    attach to the store by name and reconstruct the curves as views into the
+    block without copying or refitting them. A store that is pickled, for
+    example as the argument of a task sent to a process pool, is sent by name
+    and attaches to the block when it is unpickled. """
+
+    def __init__(self,
+                 curves: list,
+                 filename: Optional[str] = None):
+        """ Create a store holding a list of curves. Each curve must hold a
+        grid of times and discount factors and an interpolation scheme, as do
+        DiscountCurve, IborSingleCurve and OISCurve. The store is created in
+        shared memory unless a filename is given in which case it is written
+        to a memory-mapped file. The process that creates a shared memory
+        store should call unlink once all processes have finished with it. """
+
+        check_argument_types(self.__init__, locals())
+
+        if len(curves) == 0:
+            raise FinError("No curves to store.")
+
+        for curve in curves:
+            if hasattr(curve, "_dfs") is False or \
+                    hasattr(curve, "_interp_type") is False:
+                raise FinError("Curve type " + type(curve).__name__ +
+                               " does not have a grid of discount factors.")
+
+        num_curves = len(curves)
+        size = 1 + _RECORD_SIZE * num_curves
+        size += sum([8 * len(curve._times) for curve in curves])
+
+        self._shm = None
+
+        if filename is None:
+            self._shm = shared_memory.SharedMemory(create=True,
+                                                   size=8 * size)
+            self._name = self._shm.name
+            data = np.ndarray((size,), dtype=np.float64, buffer=self._shm.buf)
+        else:
+            self._name = filename
+            data = np.memmap(filename, dtype=np.float64, mode='w+',
+                             shape=(size,))
+
+        data[0] = num_curves
+        offset = 1 + _RECORD_SIZE * num_curves
+
+        for i, curve in enumerate(curves):
+            n = len(curve._times)
+            times = np.asarray(curve._times, dtype=np.float64)
+            dfs = np.asarray(curve._dfs, dtype=np.float64)
+            coeffs = _fit_coeffs(times, dfs, curve._interp_type.value)
+
+            record = 1 + _RECORD_SIZE * i
+            data[record] = offset
+            data[record + 1] = n
+            data[record + 2] = curve._interp_type.value
+            data[record + 3] = curve._value_date._excel_date
+            data[record + 4] = _enum_to_value(getattr(curve, "_freq_type",
+                                                      None))
+            data[record + 5] = _enum_to_value(getattr(curve, "_dc_type",
+                                                      None))
+
+            data[offset:offset + n] = times
+            data[offset + n:offset + 2 * n] = dfs
+            data[offset + 2 * n:offset + 8 * n] = coeffs.ravel()
+            offset += 8 * n
+
+        if filename is not None:
+            data.flush()
+
+        self._data = data
+
+    ###########################################################################
+
+    @classmethod
+    def attach(cls,
+               name: str):
+        """ Attach to an existing store given the name of its shared memory
+        block or the filename of its memory-mapped file. A file is mapped
+        read-only so that the file itself is never changed. """
+
+        store = cls.__new__(cls)
+        store._name = name
+        store._shm = None
+
+        if os.path.isfile(name):
+            store._data = np.memmap(name, dtype=np.float64, mode='r')
+        else:
+            store._shm = shared_memory.SharedMemory(name=name)
+            store._data = np.ndarray((store._shm.size // 8,),
+                                     dtype=np.float64,
+                                     buffer=store._shm.buf)
+
+        return store
+
+    ###########################################################################
+
+    @property
+    def name(self):
+        """ The name of the shared memory block or the memory-mapped file. """
+        return self._name
+
+    ###########################################################################
+
+    def __len__(self):
+        return int(self._data[0])
+
+    ###########################################################################
+
+    def curve(self,
+              i: int):
+        """ Returns the curve at an index in the store. Its arrays are views
+        into the store so it can only be used while the store is open. """
+
+        if i < 0 or i >= len(self):
+            raise FinError("Curve index out of range.")
+
+        record = 1 + _RECORD_SIZE * i
+        offset = int(self._data[record])
+        n = int(self._data[record + 1])
+        interp_type = InterpTypes(int(self._data[record + 2]))
+        d, m, y = excel_serial_to_date(int(self._data[record + 3]))
+        freq_type = _value_to_enum(FrequencyTypes, self._data[record + 4])
+        dc_type = _value_to_enum(DayCountTypes, self._data[record + 5])
+
+        times = self._data[offset:offset + n]
+        dfs = self._data[offset + n:offset + 2 * n]
+        coeffs = self._data[offset + 2 * n:offset + 8 * n].reshape(6, n)
+
+        return StoredDiscountCurve(Date(d, m, y), times, dfs, coeffs,
+                                   interp_type, freq_type, dc_type)
+
+    ###########################################################################
+
+    def curves(self):
+        """ Returns a list of all of the curves in the store. """
+
+        return [self.curve(i) for i in range(0, len(self))]
+
+    ###########################################################################
+
+    def close(self):
+        """ Detach this process from the store. Any curves taken from the
+        store must have been deleted first. """
+
+        self._data = None
+
+        if self._shm is not None:
+            self._shm.close()
+
+    ###########################################################################
+
+    def unlink(self):
+        """ Free a shared memory store or delete the file of a memory-mapped
+        store. This should be called once by the process that created it. """
+
+        if self._shm is not None:
+            self._shm.unlink()
+        elif os.path.isfile(self._name):
+            os.remove(self._name)
+
+    ###########################################################################
+
+    def __reduce__(self):
+        return (CurveStore.attach, (self._name,))
+
+    ###########################################################################
+
+    def __repr__(self):
+
+        s = label_to_string("OBJECT TYPE", type(self).__name__)
+        s += label_to_string("NAME", self._name)
+        s += label_to_string("NUM CURVES", len(self))
+        return s
+
+###############################################################################
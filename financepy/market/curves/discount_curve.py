@@ -8,6 +8,7 @@ import numpy as np
 from .interpolator import Interpolator, InterpTypes, interpolate
 
 from ...utils.date import Date
+from ...utils.date_array import DateArray
 from ...utils.error import FinError
 from ...utils.global_vars import gDaysInYear, gSmall
 from ...utils.frequency import annual_frequency, FrequencyTypes
@@ -251,7 +252,7 @@ class DiscountCurve:
                                 maturityDt,
                                 freq_type)
 
-            flow_dates = schedule._generate()
+            flow_dates = list(schedule._generate())
             flow_dates[0] = effective_date
 
             day_counter = DayCount(dc_type)
@@ -283,11 +284,12 @@ class DiscountCurve:
     ###########################################################################
 
     def df(self,
-           dt: (list, Date),
+           dt: (list, Date, DateArray),
            day_count=DayCountTypes.ACT_ACT_ISDA):
         ''' Function to calculate a discount factor from a date or a
         vector of dates. The day count determines how dates get converted to
-        years. I allow this to default to ACT_ACT_ISDA unless specified. '''
+        years. I allow this to default to ACT_ACT_ISDA unless specified. A
+        DateArray of dates is converted to times in a single pass. '''
 
         times = times_from_dates(dt, self._value_date, day_count)
         dfs = self._df(times)
@@ -0,0 +1,372 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+from numba import njit, float64, int64
+import numpy as np
+
+from .interpolator import InterpTypes, _fit_coeffs, _vinterpolate_coeffs
+from .discount_curve import DiscountCurve
+
+from ...utils.date import Date
+from ...utils.date_array import DateArray
+from ...utils.error import FinError
+from ...utils.global_vars import gDaysInYear, gSmall
+from ...utils.frequency import annual_frequency, FrequencyTypes
+from ...utils.day_count import DayCount, DayCountTypes
+from ...utils.math import test_monotonicity
+from ...utils.schedule import Schedule
+from ...utils.helpers import check_argument_types
+from ...utils.helpers import times_from_dates
+from ...utils.helpers import label_to_string
+
+###############################################################################
+
+
+@njit(float64[:, :, :](float64[:], float64[:, :], int64),
+      fastmath=True, cache=True)
+def _fit_coeffs_set(times, dfs, method):
+    """ Fit the interpolation scheme to every scenario in a scenarios x pillars
+    array of discount factors. Returns a scenarios x 6 x pillars array of the
+    coefficient arrays built by _fit_coeffs. """
+
+    num_scenarios = dfs.shape[0]
+    coeffs = np.zeros((num_scenarios, 6, len(times)))
+
+    for i in range(0, num_scenarios):
+        coeffs[i] = _fit_coeffs(times, np.ascontiguousarray(dfs[i]), method)
+
+    return coeffs
+
+###############################################################################
+
+
+@njit(float64[:, :](float64[:], float64[:, :, :], int64),
+      fastmath=True, cache=True, nogil=True)
+def _df_set(t, coeffs, method):
+    """ Interpolate the discount factors of every scenario at a vector of
+    times. Returns a scenarios x times array. """
+
+    num_scenarios = coeffs.shape[0]
+    dfs = np.empty((num_scenarios, len(t)))
+
+    for i in range(0, num_scenarios):
+        dfs[i] = _vinterpolate_coeffs(t, coeffs[i], method)
+
+    return dfs
+
+###############################################################################
+
+
+class DiscountCurveSet(DiscountCurve):
+    """ A set of discount curves, one per scenario, which share a valuation
+    date, a grid of pillar dates and an interpolation scheme. The discount
+    factors are held as a scenarios x pillars array and are interpolated for
+    all scenarios in one call. The df function returns one discount factor per
+    scenario for a date and a scenarios x dates array for a vector of dates.
+    As this is a DiscountCurve it can be passed to products whose valuation
+    is linear in the discount factors and which then return one value per
+    scenario. """
+
+    ###########################################################################
+
+    def __init__(self,
+                 value_date: Date,
+                 df_dates: (list, DateArray),
+                 df_values: np.ndarray,
+                 interp_type: InterpTypes = InterpTypes.FLAT_FWD_RATES):
+        """ Create the set of curves from a vector of pillar dates and a
+        scenarios x pillars array of discount factors at those dates. As with
+        DiscountCurve a pillar at time zero with a discount factor of one is
+        added unless the first pillar date is the valuation date. """
+
+        check_argument_types(self.__init__, locals())
+
+        df_values = np.array(df_values, dtype=np.float64)
+
+        if df_values.ndim == 1:
+            df_values = df_values.reshape(1, len(df_values))
+
+        if df_values.ndim != 2:
+            raise FinError("Discount factors must be scenarios x pillars")
+
+        if len(df_dates) < 1:
+            raise FinError("Times has zero length")
+
+        if len(df_dates) != df_values.shape[1]:
+            raise FinError("Number of dates and pillars are not the same")
+
+        if isinstance(df_dates, DateArray):
+            df_dates = df_dates.to_dates()
+
+        times = times_from_dates(df_dates, value_date)
+
+        if df_dates[0] == value_date:
+            dfs = df_values
+        else:
+            times = np.concatenate(([0.0], times))
+            ones = np.ones((df_values.shape[0], 1))
+            dfs = np.concatenate((ones, df_values), axis=1)
+
+        if test_monotonicity(times) is False:
+            print(times)
+            raise FinError("Times are not sorted in increasing order")
+
+        self._value_date = value_date
+        self._df_dates = df_dates
+        self._df_values = df_values
+        self._times = times
+        self._dfs = np.ascontiguousarray(dfs)
+        self._interp_type = interp_type
+        self._freq_type = FrequencyTypes.CONTINUOUS
+        self._dc_type = DayCountTypes.ACT_ACT_ISDA
+        self._coeffs = _fit_coeffs_set(self._times, self._dfs,
+                                       self._interp_type.value)
+
+    ###########################################################################
+
+    @classmethod
+    def from_curve(cls,
+                   curve: DiscountCurve,
+                   df_dates: (list, DateArray),
+                   bump_sizes: np.ndarray):
+        """ Create a set of scenarios from a discount curve by shifting its
+        continuously compounded forward rates up by each of the bump sizes, as
+        in DiscountCurve.bump. The curve is sampled at the pillar dates and the
+        scenarios use the same interpolation scheme as the curve. """
+
+        times = times_from_dates(df_dates, curve._value_date)
+        dfs = curve._df(np.asarray(times, dtype=np.float64))
+        bump_sizes = np.asarray(bump_sizes, dtype=np.float64).reshape(-1, 1)
+        df_values = dfs * np.exp(-bump_sizes * times)
+
+        return cls(curve._value_date, df_dates, df_values, curve._interp_type)
+
+    ###########################################################################
+
+    @property
+    def num_scenarios(self):
+        return self._dfs.shape[0]
+
+    ###########################################################################
+
+    def scenario(self,
+                 i: int):
+        """ Returns the discount curve of a single scenario. """
+
+        return DiscountCurve(self._value_date,
+                             self._df_dates,
+                             self._df_values[i],
+                             self._interp_type)
+
+    ###########################################################################
+
+    def df(self,
+           dt: (list, Date, DateArray),
+           day_count=DayCountTypes.ACT_ACT_ISDA):
+        """ Discount factors of every scenario at a date or a vector of dates.
+        Returns a vector with one discount factor per scenario for a date and a
+        scenarios x dates array for a vector of dates. """
+
+        times = times_from_dates(dt, self._value_date, day_count)
+        return self._df(times)
+
+    ###########################################################################
+
+    def _df(self,
+            t: (float, np.ndarray)):
+        """ Hidden function to calculate the discount factors of every
+        scenario at a time or a vector of times. """
+
+        if isinstance(t, np.ndarray):
+            tvec = t.astype(np.float64)
+        else:
+            tvec = np.array([t], dtype=np.float64)
+
+        if np.any(tvec < 0.0):
+            raise FinError("Interpolate times must all be >= 0")
+
+        dfs = _df_set(tvec, self._coeffs, self._interp_type.value)
+
+        if isinstance(t, np.ndarray):
+            return dfs
+
+        return dfs[:, 0]
+
+    ###########################################################################
+
+    def zero_rate(self,
+                  dts: (list, Date, DateArray),
+                  freq_type: FrequencyTypes = FrequencyTypes.CONTINUOUS,
+                  dc_type: DayCountTypes = DayCountTypes.ACT_360):
+        """ Zero rates of every scenario with a specified frequency. Returns a
+        vector of rates for a date and a scenarios x dates array for a vector
+        of dates. """
+
+        if isinstance(freq_type, FrequencyTypes) is False:
+            raise FinError("Invalid Frequency type.")
+
+        if isinstance(dc_type, DayCountTypes) is False:
+            raise FinError("Invalid Day Count type.")
+
+        dfs = self.df(dts)
+        t = np.maximum(times_from_dates(dts, self._value_date, dc_type),
+                       gSmall)
+
+        if freq_type == FrequencyTypes.CONTINUOUS:
+            return -np.log(dfs) / t
+        elif freq_type == FrequencyTypes.SIMPLE:
+            return (1.0 / dfs - 1.0) / t
+
+        f = annual_frequency(freq_type)
+        return (np.power(dfs, -1.0 / (t * f)) - 1.0) * f
+
+    ###########################################################################
+
+    def fwd(self,
+            dts: (list, Date, DateArray)):
+        """ Continuously compounded forward rates of every scenario at the
+        dates provided, measured over one day. """
+
+        if isinstance(dts, Date):
+            dts_plus_one_day = dts.add_days(1)
+        elif isinstance(dts, DateArray):
+            dts_plus_one_day = dts.add_days(1)
+        else:
+            dts_plus_one_day = [dt.add_days(1) for dt in dts]
+
+        df1 = self.df(dts)
+        df2 = self.df(dts_plus_one_day)
+        return np.log(df1 / df2) * gDaysInYear
+
+    ###########################################################################
+
+    def fwd_rate(self,
+                 start_date: (list, Date),
+                 date_or_tenor: (Date, str, list),
+                 dc_type: DayCountTypes = DayCountTypes.ACT_360):
+        """ Forward rates of every scenario between two dates according to the
+        day count convention. Returns a vector of rates for a start date and a
+        scenarios x dates array for a list of start dates. """
+
+        if isinstance(start_date, Date):
+            start_dates = [start_date]
+        elif isinstance(start_date, list):
+            start_dates = start_date
+        else:
+            raise FinError("Start date and end date must be same types.")
+
+        if isinstance(date_or_tenor, str):
+            end_dates = [dt.add_tenor(date_or_tenor) for dt in start_dates]
+        elif isinstance(date_or_tenor, Date):
+            end_dates = [date_or_tenor] * len(start_dates)
+        else:
+            end_dates = date_or_tenor
+
+        day_count = DayCount(dc_type)
+        year_fracs = np.array([day_count.year_frac(dt1, dt2)[0]
+                               for dt1, dt2 in zip(start_dates, end_dates)])
+
+        df1 = self.df(start_dates)
+        df2 = self.df(end_dates)
+        fwd_rates = (df1 / df2 - 1.0) / year_fracs
+
+        if isinstance(start_date, Date):
+            return fwd_rates[:, 0]
+
+        return fwd_rates
+
+    ###########################################################################
+
+    def swap_rate(self,
+                  effective_date: Date,
+                  maturity_date: (list, Date),
+                  freq_type=FrequencyTypes.ANNUAL,
+                  dc_type: DayCountTypes = DayCountTypes.THIRTY_E_360):
+        """ Par swap rates of every scenario to the maturity dates calculated
+        as in DiscountCurve.swap_rate. Returns a vector of rates for a date and
+        a scenarios x dates array for a list of maturity dates. """
+
+        if effective_date < self._value_date:
+            raise FinError("Swap starts before the curve valuation date.")
+
+        if isinstance(freq_type, FrequencyTypes) is False:
+            raise FinError("Invalid Frequency type.")
+
+        if freq_type == FrequencyTypes.SIMPLE:
+            raise FinError("Cannot calculate par rate with simple yield freq.")
+        elif freq_type == FrequencyTypes.CONTINUOUS:
+            raise FinError("Cannot calculate par rate with continuous freq.")
+
+        if isinstance(maturity_date, Date):
+            maturity_dates = [maturity_date]
+        else:
+            maturity_dates = maturity_date
+
+        day_counter = DayCount(dc_type)
+        df_start = self.df(effective_date)
+        par_rates = np.zeros((self.num_scenarios, len(maturity_dates)))
+
+        for j, maturityDt in enumerate(maturity_dates):
+
+            if maturityDt <= effective_date:
+                raise FinError("Maturity date is before the swap start date.")
+
+            schedule = Schedule(effective_date,
+                                maturityDt,
+                                freq_type)
+
+            flow_dates = list(schedule._generate())
+            flow_dates[0] = effective_date
+
+            alphas = np.array([day_counter.year_frac(flow_dates[i - 1],
+                                                     flow_dates[i])[0]
+                               for i in range(1, len(flow_dates))])
+
+            dfs = self.df(flow_dates[1:])
+            pv01 = dfs @ alphas
+
+            small = np.abs(pv01) < gSmall
+            par_rates[:, j] = np.where(small, 0.0,
+                                       (df_start - dfs[:, -1]) /
+                                       np.where(small, 1.0, pv01))
+
+        if isinstance(maturity_date, Date):
+            return par_rates[:, 0]
+
+        return par_rates
+
+    ###########################################################################
+
+    def bump(self,
+             bump_size: float):
+        """ Returns a new set in which the continuously compounded forward
+        rates of every scenario are shifted up by the bump size. """
+
+        times = times_from_dates(self._df_dates, self._value_date)
+        df_values = self._df_values * np.exp(-bump_size * times)
+
+        return DiscountCurveSet(self._value_date,
+                                self._df_dates,
+                                df_values,
+                                self._interp_type)
+
+    ###########################################################################
+
+    def __repr__(self):
+
+        s = label_to_string("OBJECT TYPE", type(self).__name__)
+        s += label_to_string("VALUE DATE", self._value_date)
+        s += label_to_string("NUM SCENARIOS", self.num_scenarios)
+        s += label_to_string("INTERP TYPE", self._interp_type)
+        num_points = len(self._df_dates)
+        s += label_to_string("DATES", "MIN DF, MAX DF")
+        for i in range(0, num_points):
+            s += label_to_string("%12s" % self._df_dates[i],
+                                 "%12.8f, %12.8f" %
+                                 (np.min(self._df_values[:, i]),
+                                  np.max(self._df_values[:, i])))
+
+        return s
+
+###############################################################################
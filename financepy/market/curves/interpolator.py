@@ -2,14 +2,11 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
-from numba import njit, float64, int64
+from numba import njit, float64, int64, types
 import numpy as np
 from ...utils.error import FinError
 from ...utils.global_vars import gSmall
 
-from scipy.interpolate import PchipInterpolator
-from scipy.interpolate import CubicSpline
-
 ###############################################################################
 
 from enum import Enum
@@ -61,16 +58,24 @@ def interpolate(t: (float, np.ndarray),  # time or array of times
         raise FinError("Unknown input type" + type(t))
 
 
+###############################################################################
+# The arrays of a curve held in a CurveStore are read-only so the functions
+# that evaluate a fitted curve take read-only arrays. Writable arrays are
+# passed to them without a copy.
+###############################################################################
+
+_ro_float64_1d = types.Array(float64, 1, 'A', readonly=True)
+_ro_float64_2d = types.Array(float64, 2, 'A', readonly=True)
+
 ###############################################################################
 
 
-@njit(float64(float64, float64[:], float64[:], int64),
+@njit(float64(float64, int64, _ro_float64_1d, _ro_float64_1d, int64),
       fastmath=True, cache=True, nogil=True)
-def _uinterpolate(t, times, dfs, method):
-    """ Return the interpolated value of y given x and a vector of x and y.
-    The values of x must be monotonic and increasing. The different schemes for
-    interpolation are linear in y (as a function of x), linear in log(y) and
-    piecewise flat in the continuously compounded forward y rate. """
+def _interpolate_bracket(t, i, times, dfs, method):
+    """ Return the interpolated value of y at x = t given the index i of the
+    first grid point on or after t, or the number of grid points if t lies
+    beyond the grid. """
 
     small = 1e-10
     num_points = times.size
@@ -78,13 +83,6 @@ def _uinterpolate(t, times, dfs, method):
     if t == times[0]:
         return dfs[0]
 
-    i = 0
-    while times[i] < t and i < num_points - 1:
-        i = i + 1
-
-    if t > times[i]:
-        i = num_points
-
     yvalue = 0.0
 
     ###########################################################################
@@ -172,7 +170,29 @@ def _uinterpolate(t, times, dfs, method):
 
 ###############################################################################
 
-@njit(float64[:](float64[:], float64[:], float64[:], int64),
+
+@njit(float64(float64, _ro_float64_1d, _ro_float64_1d, int64),
+      fastmath=True, cache=True, nogil=True)
+def _uinterpolate(t, times, dfs, method):
+    """ Return the interpolated value of y given x and a vector of x and y.
+    The values of x must be monotonic and increasing. The different schemes for
+    interpolation are linear in y (as a function of x), linear in log(y) and
+    piecewise flat in the continuously compounded forward y rate. The
+    bracketing interval is found by binary search. """
+
+    if t == times[0]:
+        return dfs[0]
+
+    # Index of the first time on or after t which is times.size if there is
+    # none so that t is extrapolated
+    i = np.searchsorted(times, t)
+
+    return _interpolate_bracket(t, i, times, dfs, method)
+
+
+###############################################################################
+
+@njit(float64[:](_ro_float64_1d, _ro_float64_1d, _ro_float64_1d, int64),
       fastmath=True, cache=True, nogil=True)
 def _vinterpolate(xValues,
                   xvector,
@@ -181,12 +201,32 @@ def _vinterpolate(xValues,
     """ Return the interpolated values of y given x and a vector of x and y.
     The values of x must be monotonic and increasing. The different schemes for
     interpolation are linear in y (as a function of x), linear in log(y) and
-    piecewise flat in the continuously compounded forward y rate. """
+    piecewise flat in the continuously compounded forward y rate. If the input
+    values are sorted they are bracketed in a single pass along the grid and
+    otherwise each is bracketed by binary search. """
 
     n = xValues.size
+    num_points = xvector.size
     yvalues = np.empty(n)
+
+    is_sorted = True
+    for i in range(1, n):
+        if xValues[i] < xValues[i - 1]:
+            is_sorted = False
+            break
+
+    if not is_sorted:
+        for i in range(0, n):
+            yvalues[i] = _uinterpolate(xValues[i], xvector, dfs, method)
+        return yvalues
+
+    # Sorted times such as cashflow schedules are bracketed by walking along
+    # the grid once
+    j = 0
     for i in range(0, n):
-        yvalues[i] = _uinterpolate(xValues[i], xvector, dfs, method)
+        while j < num_points and xvector[j] < xValues[i]:
+            j = j + 1
+        yvalues[i] = _interpolate_bracket(xValues[i], j, xvector, dfs, method)
 
     return yvalues
 
@@ -194,89 +234,508 @@ def _vinterpolate(xValues,
 ###############################################################################
 
 
-class Interpolator():
+@njit(float64[:](float64[:], float64[:], int64, float64, int64, float64),
+      fastmath=True, cache=True)
+def _cubic_spline_slopes(x, y, left_order, left_value, right_order,
+                         right_value):
+    """ Slopes at the knots of a cubic spline through the points (x, y). The
+    end conditions set either the first (order 1) or the second (order 2)
+    derivative at each end. The tridiagonal system is the one solved by
+    SciPy's CubicSpline so the spline agrees with it. """
+
+    n = len(x)
+    dx = x[1:] - x[:-1]
+    slope = (y[1:] - y[:-1]) / dx
+
+    lower = np.zeros(n)
+    diag = np.zeros(n)
+    upper = np.zeros(n)
+    b = np.zeros(n)
+
+    for i in range(1, n - 1):
+        lower[i] = dx[i]
+        diag[i] = 2.0 * (dx[i - 1] + dx[i])
+        upper[i] = dx[i - 1]
+        b[i] = 3.0 * (dx[i] * slope[i - 1] + dx[i - 1] * slope[i])
+
+    if left_order == 1:
+        diag[0] = 1.0
+        b[0] = left_value
+    else:
+        diag[0] = 2.0 * dx[0]
+        upper[0] = dx[0]
+        b[0] = -0.5 * left_value * dx[0]**2 + 3.0 * (y[1] - y[0])
 
-    def __init__(self,
-                 interpolatorType: InterpTypes):
+    if right_order == 1:
+        diag[n - 1] = 1.0
+        b[n - 1] = right_value
+    else:
+        diag[n - 1] = 2.0 * dx[n - 2]
+        lower[n - 1] = dx[n - 2]
+        b[n - 1] = 0.5 * right_value * dx[n - 2]**2 + \
+            3.0 * (y[n - 1] - y[n - 2])
 
-        self._interp_type = interpolatorType
-        self._interp_fn = None
-        self._times = None
-        self._dfs = None
-        self._refit_curve = False
+    # Thomas algorithm
+    for i in range(1, n):
+        w = lower[i] / diag[i - 1]
+        diag[i] = diag[i] - w * upper[i - 1]
+        b[i] = b[i] - w * b[i - 1]
 
-    ###########################################################################
+    slopes = np.zeros(n)
+    slopes[n - 1] = b[n - 1] / diag[n - 1]
+    for i in range(n - 2, -1, -1):
+        slopes[i] = (b[i] - upper[i] * slopes[i + 1]) / diag[i]
 
-    def fit(self,
-            times: np.ndarray,
-            dfs: np.ndarray):
+    return slopes
 
-        self._times = times
-        self._dfs = dfs
+###############################################################################
+
+
+@njit(float64(float64, float64, float64, float64), fastmath=True, cache=True)
+def _pchip_edge_slope(h0, h1, m0, m1):
+    """ One-sided three point estimate of the slope at an end point of a PCHIP
+    which is limited to preserve the shape of the data. """
+
+    d = ((2.0 * h0 + h1) * m0 - h0 * m1) / (h0 + h1)
 
-        if len(times) == 1:
-            return
+    if np.sign(d) != np.sign(m0):
+        d = 0.0
+    elif np.sign(m0) != np.sign(m1) and np.abs(d) > 3.0 * np.abs(m0):
+        d = 3.0 * m0
 
-        if self._interp_type == InterpTypes.PCHIP_LOG_DISCOUNT:
+    return d
 
-            logDfs = np.log(self._dfs)
-            self._interp_fn = PchipInterpolator(self._times, logDfs)
+###############################################################################
+
+
+@njit(float64[:](float64[:], float64[:]), fastmath=True, cache=True)
+def _pchip_slopes(x, y):
+    """ Slopes at the knots of a piecewise cubic Hermite interpolating
+    polynomial which preserves monotonicity. This follows SciPy's
+    PchipInterpolator. """
+
+    n = len(x)
+    h = x[1:] - x[:-1]
+    m = (y[1:] - y[:-1]) / h
+    slopes = np.zeros(n)
+
+    if n == 2:
+        slopes[0] = m[0]
+        slopes[1] = m[0]
+        return slopes
+
+    for k in range(1, n - 1):
+        if np.sign(m[k]) != np.sign(m[k - 1]) or m[k] == 0.0 or \
+                m[k - 1] == 0.0:
+            slopes[k] = 0.0
+        else:
+            w1 = 2.0 * h[k] + h[k - 1]
+            w2 = h[k] + 2.0 * h[k - 1]
+            whmean = (w1 / m[k - 1] + w2 / m[k]) / (w1 + w2)
+            slopes[k] = 1.0 / whmean
+
+    slopes[0] = _pchip_edge_slope(h[0], h[1], m[0], m[1])
+    slopes[n - 1] = _pchip_edge_slope(h[n - 2], h[n - 3], m[n - 2], m[n - 3])
+
+    return slopes
+
+###############################################################################
+
+
+@njit(float64[:, :](float64[:], float64[:], int64, float64[:, :]),
+      fastmath=True, cache=True)
+def _fit_cubic(times, y, method, coeffs):
+    """ Fit the cubic of a cubic scheme to the values y at the times and store
+    the coefficients of the cubic in (t - times[k]) on each interval k in
+    rows 2 to 5 of the coefficient array, starting with the constant. """
+
+    num_points = len(times)
+
+    if num_points == 1:
+        coeffs[2, 0] = y[0]
+        return coeffs
+
+    if method == InterpTypes.PCHIP_LOG_DISCOUNT.value or \
+            method == InterpTypes.PCHIP_ZERO_RATES.value:
+        slopes = _pchip_slopes(times, y)
+    elif method == InterpTypes.FINCUBIC_ZERO_RATES.value:
+        # Second derivative at left is zero and first derivative at right is
+        # clamped to zero
+        slopes = _cubic_spline_slopes(times, y, 2, 0.0, 1, 0.0)
+    elif method == InterpTypes.NATCUBIC_LOG_DISCOUNT.value or \
+            method == InterpTypes.NATCUBIC_ZERO_RATES.value:
+        # Second derivatives are clamped to zero at end points
+        slopes = _cubic_spline_slopes(times, y, 2, 0.0, 2, 0.0)
+    else:
+        raise FinError("Invalid interpolation scheme.")
+
+    # Cubic Hermite coefficients on each interval
+    for k in range(0, num_points - 1):
+        dx = times[k + 1] - times[k]
+        slope = (y[k + 1] - y[k]) / dx
+        c = (slopes[k] + slopes[k + 1] - 2.0 * slope) / dx
+        coeffs[2, k] = y[k]
+        coeffs[3, k] = slopes[k]
+        coeffs[4, k] = (slope - slopes[k]) / dx - c
+        coeffs[5, k] = c / dx
+
+    return coeffs
+
+###############################################################################
+
+
+@njit(float64[:, :](float64[:], float64[:], int64), fastmath=True, cache=True)
+def _fit_coeffs(times, dfs, method):
+    """ Fit the interpolation scheme to the discount factors at the times and
+    return the result as a coefficient array which can be passed into compiled
+    code. Row 0 holds the times and row 1 the discount factors. For the cubic
+    schemes rows 2 to 5 hold the coefficients of the cubic in (t - times[k])
+    on each interval k, starting with the constant. The cubic is fitted to the
+    log discount factors or to the zero rates depending on the scheme. Linear
+    schemes only use the first two rows. """
+
+    num_points = len(times)
+    coeffs = np.zeros((6, num_points))
+    coeffs[0, :] = times
+    coeffs[1, :] = dfs
+
+    if method == InterpTypes.FLAT_FWD_RATES.value or \
+            method == InterpTypes.LINEAR_FWD_RATES.value or \
+            method == InterpTypes.LINEAR_ZERO_RATES.value:
+        return coeffs
+
+    if method == InterpTypes.PCHIP_LOG_DISCOUNT.value or \
+            method == InterpTypes.NATCUBIC_LOG_DISCOUNT.value:
+        y = np.log(dfs)
+    else:
+        y = -np.log(dfs) / (times + gSmall)
+        if times[0] == 0.0 and num_points > 1:
+            y[0] = y[1]
+
+    return _fit_cubic(times, y, method, coeffs)
+
+###############################################################################
+
+
+@njit(float64(float64, _ro_float64_2d),
+      fastmath=True, cache=True, nogil=True)
+def _cubic_value(t, coeffs):
+    """ Return the value at time t of the cubic in a coefficient array. The
+    cubic on the nearest interval is used beyond the grid. """
+
+    times = coeffs[0]
+    num_points = len(times)
+
+    k = 0
+    if num_points > 1:
+        k = np.searchsorted(times, t, side='right') - 1
+        k = min(max(k, 0), num_points - 2)
+
+    dx = t - times[k]
+    return coeffs[2, k] + dx * (coeffs[3, k] + dx * (coeffs[4, k] +
+                                                     dx * coeffs[5, k]))
+
+###############################################################################
+
+
+@njit(float64(float64, _ro_float64_2d, int64),
+      fastmath=True, cache=True, nogil=True)
+def _uinterpolate_coeffs(t, coeffs, method):
+    """ Return the interpolated discount factor at time t for any of the
+    schemes in InterpTypes using a coefficient array built by _fit_coeffs.
+    Cubic schemes are extrapolated using the cubic on the nearest interval.
+    As this is compiled it can be called from other NUMBA functions. """
 
-        elif self._interp_type == InterpTypes.PCHIP_ZERO_RATES:
+    if method == InterpTypes.FLAT_FWD_RATES.value or \
+            method == InterpTypes.LINEAR_FWD_RATES.value or \
+            method == InterpTypes.LINEAR_ZERO_RATES.value:
+        return _uinterpolate(t, coeffs[0], coeffs[1], method)
 
-            gSmallVector = np.ones(len(self._times)) * gSmall
-            zero_rates = -np.log(self._dfs) / (self._times + gSmallVector)
+    y = _cubic_value(t, coeffs)
 
-            if self._times[0] == 0.0:
-                zero_rates[0] = zero_rates[1]
+    if method == InterpTypes.PCHIP_LOG_DISCOUNT.value or \
+            method == InterpTypes.NATCUBIC_LOG_DISCOUNT.value:
+        return np.exp(y)
 
-            self._interp_fn = PchipInterpolator(self._times, zero_rates)
+    return np.exp(-t * y)
 
-        # if self._interp_type == InterpTypes.FINCUBIC_LOG_DISCOUNT:
+###############################################################################
+
+
+@njit(float64[:](_ro_float64_1d, _ro_float64_2d, int64),
+      fastmath=True, cache=True, nogil=True)
+def _vinterpolate_coeffs(tvalues, coeffs, method):
+    """ Return the interpolated discount factors at a vector of times using a
+    coefficient array built by _fit_coeffs. """
+
+    n = tvalues.size
+    yvalues = np.empty(n)
+    for i in range(0, n):
+        yvalues[i] = _uinterpolate_coeffs(tvalues[i], coeffs, method)
 
-        #     """ Second derivatives at left is zero and first derivative at
-        #     right is clamped to zero. """
-        #     logDfs = np.log(self._dfs)
-        #     self._interp_fn = CubicSpline(self._times, logDfs,
-        #                                  bc_type=((2, 0.0), (1, 0.0)))
+    return yvalues
 
-        elif self._interp_type == InterpTypes.FINCUBIC_ZERO_RATES:
+###############################################################################
 
-            """ Second derivatives at left is zero and first derivative at
-            right is clamped to zero. """
-            gSmallVector = np.ones(len(self._times)) * gSmall
-            zero_rates = -np.log(self._dfs) / (self._times + gSmallVector)
 
-            if self._times[0] == 0.0:
-                zero_rates[0] = zero_rates[1]
+@njit(fastmath=True, cache=True)
+def _linear_df_weights(t, times, dfs, method):
+    """ Return the index i of the last grid point used to interpolate the
+    discount factor at time t with one of the linear schemes and the
+    derivatives of this discount factor with respect to the discount factors
+    at grid points i-2, i-1 and i. Each interpolated discount factor depends
+    on at most these three grid points. """
 
-            self._interp_fn = CubicSpline(self._times, zero_rates,
-                                          bc_type=((2, 0.0), (1, 0.0)))
+    num_points = times.size
+    i = np.searchsorted(times, t)
+    df = _interpolate_bracket(t, i, times, dfs, method)
 
-        elif self._interp_type == InterpTypes.NATCUBIC_LOG_DISCOUNT:
+    if method == InterpTypes.FLAT_FWD_RATES.value:
 
-            """ Second derivatives are clamped to zero at end points """
-            logDfs = np.log(self._dfs)
-            self._interp_fn = CubicSpline(self._times, logDfs,
-                                          bc_type='natural')
+        i = min(i, num_points - 1)
+        dt = times[i] - times[i - 1]
+        w1 = (times[i] - t) / dt
+        w2 = (t - times[i - 1]) / dt
+        return i, 0.0, df * w1 / dfs[i - 1], df * w2 / dfs[i]
 
-        elif self._interp_type == InterpTypes.NATCUBIC_ZERO_RATES:
+    elif method == InterpTypes.LINEAR_ZERO_RATES.value:
 
-            """ Second derivatives are clamped to zero at end points """
-            gSmallVector = np.ones(len(self._times)) * gSmall
-            zero_rates = -np.log(self._dfs) / (self._times + gSmallVector)
+        # The zero rate is flat before the first and after the last pillar
+        if i == 1 or i == num_points:
+            i = i - 1 if i == num_points else i
+            return i, 0.0, 0.0, df * t / (times[i] * dfs[i])
 
-            if self._times[0] == 0.0:
-                zero_rates[0] = zero_rates[1]
+        dt = times[i] - times[i - 1]
+        w1 = (times[i] - t) / dt
+        w2 = (t - times[i - 1]) / dt
+        d1 = df * w1 * t / (times[i - 1] * dfs[i - 1])
+        d2 = df * w2 * t / (times[i] * dfs[i])
+        return i, 0.0, d1, d2
 
-            self._interp_fn = CubicSpline(self._times, zero_rates,
-                                          bc_type='natural')
+    elif method == InterpTypes.LINEAR_FWD_RATES.value:
 
-    #        elif self._interp_type  == InterpTypes.LINEAR_LOG_DISCOUNT:
-    #
-    #            logDfs = np.log(self._dfs)
-    #            self._interp_fn = interp1d(self._times, logDfs,
-    #                                      fill_value="extrapolate")
+        small = 1e-10
+
+        if i == 1:
+            d2 = df * t / (times[1] + small) / (dfs[1] + small)
+            return i, 0.0, 0.0, d2
+
+        if i == num_points:
+            # The last forward rate is extended beyond the grid
+            i = num_points - 1
+            h = times[i] - times[i - 1]
+            tau = t - times[i]
+            d1 = -df * tau / h / dfs[i - 1]
+            d2 = df * (1.0 + tau / h) / dfs[i]
+            return i, 0.0, d1, d2
+
+        h1 = times[i - 1] - times[i - 2]
+        h2 = times[i] - times[i - 1]
+        tau = t - times[i - 1]
+        w1 = (times[i] - t) / h2
+        w2 = tau / h2
+        d0 = -df * tau * w1 / h1 / dfs[i - 2]
+        d1 = df * (1.0 + tau * w1 / h1 - tau * w2 / h2) / dfs[i - 1]
+        d2 = df * tau * w2 / h2 / dfs[i]
+        return i, d0, d1, d2
+
+    raise FinError("Not a linear interpolation scheme.")
+
+###############################################################################
+
+
+@njit(float64[:](float64[:], float64[:], float64[:], float64[:], int64,
+                 int64), fastmath=True, cache=True)
+def _spline_df_jacobian_column(tvalues, times, dfs, df_values, method, j):
+    """ Return the derivatives of the discount factors df_values at a vector
+    of times interpolated with a natural or FinCubic spline with respect to
+    the discount factor at grid point j. For fixed knots these splines are
+    linear in the values that they interpolate, so the derivative of the
+    spline with respect to its value at grid point j is the spline through
+    zero at all grid points except grid point j where it is one. """
+
+    n = tvalues.size
+    num_points = times.size
+    col = np.zeros(n)
+
+    coeffs = np.zeros((6, num_points))
+    coeffs[0, :] = times
+    e = np.zeros(num_points)
+
+    if method == InterpTypes.NATCUBIC_LOG_DISCOUNT.value:
+
+        e[j] = 1.0 / dfs[j]
+        _fit_cubic(times, e, method, coeffs)
+
+        for k in range(0, n):
+            col[k] = df_values[k] * _cubic_value(tvalues[k], coeffs)
+
+        return col
+
+    # The zero rate at time zero is set to the first zero rate after it
+    if times[0] == 0.0 and num_points > 1:
+        if j == 0:
+            return col
+        if j == 1:
+            e[0] = -1.0 / (dfs[1] * (times[1] + gSmall))
+
+    e[j] = -1.0 / (dfs[j] * (times[j] + gSmall))
+    _fit_cubic(times, e, method, coeffs)
+
+    for k in range(0, n):
+        t = tvalues[k]
+        col[k] = -t * df_values[k] * _cubic_value(t, coeffs)
+
+    return col
+
+###############################################################################
+
+
+@njit(float64[:](float64[:], float64[:], float64[:], int64, int64),
+      fastmath=True, cache=True)
+def _df_jacobian_column(tvalues, times, dfs, method, j):
+    """ Return the derivatives of the interpolated discount factors at a
+    vector of times with respect to the discount factor at grid point j.
+    These are analytic for the linear schemes and for the natural and
+    FinCubic splines. The PCHIP schemes limit their slopes so are not linear
+    in the grid values and for these the interpolator is refitted with the
+    grid discount factor bumped up and down and a central difference is
+    taken. """
+
+    n = tvalues.size
+    num_points = times.size
+    col = np.zeros(n)
+
+    if method == InterpTypes.FLAT_FWD_RATES.value or \
+            method == InterpTypes.LINEAR_FWD_RATES.value or \
+            method == InterpTypes.LINEAR_ZERO_RATES.value:
+
+        for k in range(0, n):
+
+            t = tvalues[k]
+
+            if t == times[0] or num_points == 1:
+                if j == 0:
+                    col[k] = 1.0
+                continue
+
+            i, d0, d1, d2 = _linear_df_weights(t, times, dfs, method)
+
+            if j == i - 2:
+                col[k] = d0
+            elif j == i - 1:
+                col[k] = d1
+            elif j == i:
+                col[k] = d2
+
+        return col
+
+    if method == InterpTypes.NATCUBIC_LOG_DISCOUNT.value or \
+            method == InterpTypes.NATCUBIC_ZERO_RATES.value or \
+            method == InterpTypes.FINCUBIC_ZERO_RATES.value:
+
+        coeffs = _fit_coeffs(times, dfs, method)
+        df_values = _vinterpolate_coeffs(tvalues, coeffs, method)
+        return _spline_df_jacobian_column(tvalues, times, dfs, df_values,
+                                          method, j)
+
+    bumped_dfs = dfs.copy()
+    h = 1e-6 * dfs[j]
+    bumped_dfs[j] = dfs[j] + h
+    coeffs = _fit_coeffs(times, bumped_dfs, method)
+    df_up = _vinterpolate_coeffs(tvalues, coeffs, method)
+    bumped_dfs[j] = dfs[j] - h
+    coeffs = _fit_coeffs(times, bumped_dfs, method)
+    df_down = _vinterpolate_coeffs(tvalues, coeffs, method)
+
+    for k in range(0, n):
+        col[k] = (df_up[k] - df_down[k]) / (2.0 * h)
+
+    return col
+
+###############################################################################
+
+
+@njit(float64[:, :](float64[:], float64[:], float64[:], int64),
+      fastmath=True, cache=True)
+def _df_jacobian(tvalues, times, dfs, method):
+    """ Return the matrix of derivatives of the interpolated discount factors
+    at a vector of times with respect to the discount factors at the grid
+    times. The columns are as calculated by _df_jacobian_column so they are
+    analytic for all schemes except PCHIP. """
+
+    n = tvalues.size
+    num_points = times.size
+    jac = np.zeros((n, num_points))
+
+    if method == InterpTypes.FLAT_FWD_RATES.value or \
+            method == InterpTypes.LINEAR_FWD_RATES.value or \
+            method == InterpTypes.LINEAR_ZERO_RATES.value:
+
+        for k in range(0, n):
+
+            t = tvalues[k]
+
+            if t == times[0] or num_points == 1:
+                jac[k, 0] = 1.0
+                continue
+
+            i, d0, d1, d2 = _linear_df_weights(t, times, dfs, method)
+
+            if i >= 2:
+                jac[k, i - 2] = d0
+            jac[k, i - 1] = d1
+            jac[k, i] = d2
+
+        return jac
+
+    if method == InterpTypes.NATCUBIC_LOG_DISCOUNT.value or \
+            method == InterpTypes.NATCUBIC_ZERO_RATES.value or \
+            method == InterpTypes.FINCUBIC_ZERO_RATES.value:
+
+        coeffs = _fit_coeffs(times, dfs, method)
+        df_values = _vinterpolate_coeffs(tvalues, coeffs, method)
+
+        for j in range(0, num_points):
+            jac[:, j] = _spline_df_jacobian_column(tvalues, times, dfs,
+                                                   df_values, method, j)
+
+        return jac
+
+    for j in range(0, num_points):
+        jac[:, j] = _df_jacobian_column(tvalues, times, dfs, method, j)
+
+    return jac
+
+###############################################################################
+
+
+class Interpolator():
+
+    def __init__(self,
+                 interpolatorType: InterpTypes):
+
+        self._interp_type = interpolatorType
+        self._coeffs = None
+        self._times = None
+        self._dfs = None
+        self._refit_curve = False
+
+    ###########################################################################
+
+    def fit(self,
+            times: np.ndarray,
+            dfs: np.ndarray):
+        """ Fit the interpolation scheme to the discount factors. The fitted
+        scheme is held as a coefficient array in _coeffs which can be passed
+        to compiled code that calls _uinterpolate_coeffs. """
+
+        self._times = times
+        self._dfs = dfs
+
+        self._coeffs = _fit_coeffs(np.asarray(times, dtype=np.float64),
+                                   np.asarray(dfs, dtype=np.float64),
+                                   self._interp_type.value)
 
     ###########################################################################
 
@@ -298,7 +757,8 @@ class Interpolator():
             if np.abs(t) < gSmall:
                 return 1.0
 
-            tvec = np.array([t])
+            return _uinterpolate_coeffs(t, self._coeffs,
+                                        self._interp_type.value)
 
         elif isinstance(t, np.ndarray):
 
@@ -306,47 +766,10 @@ class Interpolator():
                 print(t)
                 raise FinError("Interpolate times must all be >= 0")
 
-            tvec = t
+            return _vinterpolate_coeffs(t.astype(np.float64), self._coeffs,
+                                        self._interp_type.value)
 
         else:
             raise FinError("t is not a recognized type")
 
-        if self._interp_type == InterpTypes.PCHIP_LOG_DISCOUNT:
-
-            out = np.exp(self._interp_fn(tvec))
-
-        elif self._interp_type == InterpTypes.PCHIP_ZERO_RATES:
-
-            out = np.exp(-tvec * self._interp_fn(tvec))
-
-        # if self._interp_type == InterpTypes.FINCUBIC_LOG_DISCOUNT:
-
-        #     out = np.exp(self._interp_fn(tvec))
-
-        elif self._interp_type == InterpTypes.FINCUBIC_ZERO_RATES:
-
-            out = np.exp(-tvec * self._interp_fn(tvec))
-
-        elif self._interp_type == InterpTypes.NATCUBIC_LOG_DISCOUNT:
-
-            out = np.exp(self._interp_fn(tvec))
-
-        elif self._interp_type == InterpTypes.NATCUBIC_ZERO_RATES:
-
-            out = np.exp(-tvec * self._interp_fn(tvec))
-
-        #        elif self._interp_type == InterpTypes.LINEAR_LOG_DISCOUNT:
-        #
-        #            out = np.exp(self._interp_fn(tvec))
-
-        else:
-
-            out = _vinterpolate(tvec, self._times, self._dfs,
-                                self._interp_type.value)
-
-        if isinstance(t, (float, np.float64)):
-            return out[0]
-        else:
-            return out
-
 ###############################################################################
@@ -3,3 +3,4 @@ from .equity_vol_surface import *
 # from .fx_vol_surface import *
 from .fx_vol_surface_plus import *
 from .ibor_cap_vol_curve import *
+from .vol_grid import *
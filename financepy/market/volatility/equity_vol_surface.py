@@ -2,6 +2,10 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
+from concurrent.futures import Executor
+
+from typing import Optional
+
 import numpy as np
 from scipy.optimize import minimize
 
@@ -14,7 +18,10 @@ from ...utils.global_vars import gDaysInYear
 from ...utils.global_types import OptionTypes
 from ...models.option_implied_dbn import option_implied_dbn
 from ...utils.helpers import check_argument_types, label_to_string
+from ...utils.helpers import times_from_dates, parallel_map
+from ...utils.date_array import DateArray
 from ...market.curves.discount_curve import DiscountCurve
+from ...market.volatility.vol_grid import VolGrid
 
 from ...models.volatility_fns import VolFuncTypes
 from ...models.volatility_fns import vol_function_clark
@@ -24,6 +31,8 @@ from ...models.volatility_fns import vol_function_ssvi
 from ...models.sabr import vol_function_sabr
 from ...models.sabr import vol_function_sabr_beta_one
 from ...models.sabr import vol_function_sabr_beta_half
+from ...models.volatility_fns import vol_function_grad
+from ...models.volatility_fns import flat_smile_params
 
 from ...utils.math import norminvcdf
 
@@ -33,6 +42,7 @@ from ...utils.distribution import FinDistribution
 
 from ...utils.solver_1d import newton_secant
 from ...utils.solver_nm import nelder_mead
+from ...utils.solver_lm import levenberg_marquardt
 from ...utils.global_types import FinSolverTypes
 
 ###############################################################################
@@ -80,6 +90,39 @@ def _obj(params, *args):
     return tot
 
 ###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _obj_residuals(params, *args):
+    """ Return the differences between the fitted and market vols at each
+    strike of one time slice, whose sum of squares is _obj, together with
+    their Jacobian with respect to params. """
+
+    s = args[0]
+    t = args[1]
+    r = args[2]
+    q = args[3]
+    strikes = args[4]
+    index = args[5]
+    volatility_grid = args[6]
+    vol_type_value = args[7]
+
+    f = s * np.exp((r-q)*t)
+
+    num_strikes = len(volatility_grid[0])
+
+    res = np.zeros(num_strikes)
+    jac = np.zeros((num_strikes, len(params)))
+
+    for i in range(0, num_strikes):
+        fittedVol = vol_function(vol_type_value, params, f, strikes[i], t)
+        res[i] = fittedVol - volatility_grid[index][i]
+        jac[i, :] = vol_function_grad(vol_type_value, params, f, strikes[i],
+                                      t)
+
+    return res, jac
+
+###############################################################################
 # Do not cache this function as it leads to complaints
 ###############################################################################
 
@@ -115,6 +158,24 @@ def _solve_to_horizon(s, t, r, q,
         elif finSolverType == FinSolverTypes.CONJUGATE_GRADIENT:
             opt = minimize(_obj, x_inits, args, method="CG", tol=tol)
             xopt = opt.x
+        elif finSolverType == FinSolverTypes.LEVENBERG_MARQUARDT:
+            x_init = np.array(x_inits, dtype=np.float64)
+            f = s * np.exp((r-q)*t)
+            atm_index = np.argmin(np.abs(np.array(strikes) - f))
+            atm_vol = volatility_grid[timeIndex][atm_index]
+            x_flat = flat_smile_params(vol_type_value, len(x_init), f,
+                                       atm_vol, t)
+            xopt = None
+            if np.any(x_init):
+                try:
+                    xopt, _ = levenberg_marquardt(_obj_residuals, x_init,
+                                                  args, 1e-10, 200)
+                except FinError:
+                    # The parameters of another expiry can be a poor start
+                    pass
+            if xopt is None:
+                xopt, _ = levenberg_marquardt(_obj_residuals, x_flat, args,
+                                              1e-10, 200)
     except Exception:
         # If convergence fails try again with CG if necessary
         if finSolverType != FinSolverTypes.CONJUGATE_GRADIENT:
@@ -164,6 +225,64 @@ def vol_function(vol_function_type_value, params, f, k, t):
 ###############################################################################
 
 
+@njit(float64[:](int64, float64[:, :], float64[:], float64[:], float64[:],
+                 float64[:]), cache=True, fastmath=True)
+def _vol_from_strikes_times(vol_type_value, parameters, t_grid, fwds,
+                            strikes, t_exps):
+    """ Return the volatility at each pair of strike and expiry time. The
+    bracketing expiries are found in one binary search and the smile is
+    evaluated at both of them. Linear interpolation is done in variance and
+    the volatility is flat outside the first and last expiries. """
+
+    num_curves = len(t_grid)
+    num_vols = len(strikes)
+    indices = np.searchsorted(t_grid, t_exps)
+    vols = np.empty(num_vols)
+
+    for j in range(0, num_vols):
+
+        t_exp = t_exps[j]
+        k = strikes[j]
+
+        if num_curves == 1 or t_exp <= t_grid[0]:
+            index0 = 0
+            index1 = 0
+        elif t_exp >= t_grid[-1]:
+            index0 = num_curves - 1
+            index1 = num_curves - 1
+        else:
+            index1 = indices[j]
+            index0 = index1 - 1
+
+        t0 = t_grid[index0]
+        t1 = t_grid[index1]
+
+        vol0 = vol_function(vol_type_value, parameters[index0],
+                            fwds[index0], k, t0)
+
+        if index1 != index0:
+            vol1 = vol_function(vol_type_value, parameters[index1],
+                                fwds[index1], k, t1)
+        else:
+            vol1 = vol0
+
+        if np.abs(t1 - t0) > 1e-6:
+            vart0 = vol0 * vol0 * t0
+            vart1 = vol1 * vol1 * t1
+            vart = ((t_exp - t0) * vart1 + (t1 - t_exp) * vart0) / (t1 - t0)
+
+            if vart < 0.0:
+                raise FinError("Negative variance.")
+
+            vols[j] = np.sqrt(vart / t_exp)
+        else:
+            vols[j] = vol1
+
+    return vols
+
+###############################################################################
+
+
 @njit(cache=True, fastmath=True)
 def _delta_fit(k, *args):
     """ This is the objective function used in the determination of the
@@ -239,9 +358,15 @@ class EquityVolSurface:
                  strikes: (list, np.ndarray),
                  volatility_grid: (list, np.ndarray),
                  volatility_function_type: VolFuncTypes = VolFuncTypes.CLARK,
-                 finSolverType: FinSolverTypes = FinSolverTypes.NELDER_MEAD):
+                 finSolverType: FinSolverTypes = FinSolverTypes.NELDER_MEAD,
+                 num_processes: int = 1,
+                 executor: Optional[Executor] = None):
         """ Create the EquitySurface object by passing in market vol data
-        for a list of strikes and expiry dates. """
+        for a list of strikes and expiry dates. The smiles of the expiry dates
+        after the first are solved starting from the parameters of the first
+        expiry. They are calibrated in the executor if one is given, which
+        lets many surfaces share one pool, else in parallel in num_processes
+        processes if this is more than one. The results are the same. """
 
         check_argument_types(self.__init__, locals())
 
@@ -270,8 +395,11 @@ class EquityVolSurface:
 
         self._volatility_grid = volatility_grid
         self._volatility_function_type = volatility_function_type
+        self._num_processes = num_processes
+        self._finSolverType = finSolverType
 
-        self._build_vol_surface(finSolverType=finSolverType)
+        self._build_vol_surface(finSolverType=finSolverType,
+                                executor=executor)
 
 ###############################################################################
 
@@ -357,6 +485,67 @@ class EquityVolSurface:
 
         return volt
 
+###############################################################################
+
+    def vol_from_strikes_times(self,
+                               strikes: (float, np.ndarray),
+                               t_exps: (float, np.ndarray)):
+        """ Interpolates the Black-Scholes volatility from the volatility
+        surface at arrays of strikes and expiry times in years. Either may be
+        a scalar in which case it is broadcast against the other. The result
+        is the same as calling vol_from_strike_date for each pair but all of
+        the volatilities are calculated in one compiled call. """
+
+        strikes, t_exps = np.broadcast_arrays(
+            np.asarray(strikes, dtype=np.float64),
+            np.asarray(t_exps, dtype=np.float64))
+
+        shape = strikes.shape
+
+        vols = _vol_from_strikes_times(self._volatility_function_type.value,
+                                       self._parameters,
+                                       self._t_exp,
+                                       self._F0T,
+                                       np.ascontiguousarray(strikes.ravel()),
+                                       np.ascontiguousarray(t_exps.ravel()))
+
+        return vols.reshape(shape)
+
+###############################################################################
+
+    def vol_from_strikes_dates(self,
+                               strikes: (float, np.ndarray),
+                               expiry_dates: (Date, list, DateArray)):
+        """ Interpolates the Black-Scholes volatility from the volatility
+        surface at an array of strikes and a list of expiry dates as in
+        vol_from_strikes_times. """
+
+        t_exps = times_from_dates(expiry_dates, self._value_date)
+
+        return self.vol_from_strikes_times(strikes, t_exps)
+
+###############################################################################
+
+    def build_vol_grid(self,
+                       num_log_moneyness: int = 101,
+                       num_std: float = 4.0,
+                       tol: float = 1e-4):
+        """ Precompute a grid of the total variance of the surface in expiry
+        time and log-moneyness for pricers which need many volatilities. Each
+        expiry row covers num_std standard deviations about the forward at the
+        highest ATM vol of the surface and the square root of its own expiry
+        time, widened if needed to cover the quoted strikes of that expiry.
+        The grid is refined until its volatility error is below tol. It is not
+        updated if the surface is recalibrated. Returns a VolGrid. """
+
+        check_argument_types(self.build_vol_grid, locals())
+
+        vol_type_value = self._volatility_function_type.value
+
+        return VolGrid(vol_function, vol_type_value, self._parameters,
+                       self._F0T, self._t_exp, num_log_moneyness,
+                       num_std, tol, strikes=self._strikes)
+
 ###############################################################################
 
     # def delta_to_strike(self, call_delta, expiry_date, delta_method):
@@ -562,7 +751,8 @@ class EquityVolSurface:
 
 ###############################################################################
 
-    def _build_vol_surface(self, finSolverType=FinSolverTypes.NELDER_MEAD):
+    def _build_vol_surface(self, finSolverType=FinSolverTypes.NELDER_MEAD,
+                           executor=None):
         """ Main function to construct the vol surface. """
 
         s = self._stock_price
@@ -602,6 +792,50 @@ class EquityVolSurface:
             print(self._volatilityFunctionType)
             raise FinError("Unknown Model Type")
 
+        self._set_forwards()
+
+        #######################################################################
+        # THE ACTUAL COMPUTATION LOOP STARTS HERE
+        #######################################################################
+
+        vol_type_value = self._volatility_function_type.value
+
+        x_init = np.zeros(num_parameters)
+
+        # The first expiry is solved alone and its parameters are the
+        # starting point for all of the other expiries
+        self._parameters[0, :] = \
+            _solve_to_horizon(s, self._t_exp[0], self._r[0], self._q[0],
+                              self._strikes, 0, self._volatility_grid,
+                              vol_type_value, x_init, finSolverType)
+
+        n = numExpiryDates - 1
+
+        results = parallel_map(_solve_to_horizon,
+                               [s] * n, self._t_exp[1:], self._r[1:],
+                               self._q[1:],
+                               [self._strikes] * n,
+                               range(1, n + 1),
+                               [self._volatility_grid] * n,
+                               [vol_type_value] * n,
+                               [self._parameters[0]] * n,
+                               [finSolverType] * n,
+                               num_processes=self._num_processes,
+                               executor=executor)
+
+        for i, res in enumerate(results):
+            self._parameters[i + 1, :] = res
+
+###############################################################################
+
+    def _set_forwards(self):
+        """ Set the expiry times, the zero rates of the discount and dividend
+        curves and the forwards of the expiry dates from the stock price and
+        the curves. """
+
+        s = self._stock_price
+        numExpiryDates = self._numExpiryDates
+
         self._t_exp = np.zeros(numExpiryDates)
 
         self._F0T = np.zeros(numExpiryDates)
@@ -628,34 +862,107 @@ class EquityVolSurface:
             self._q[i] = -np.log(div_df) / t_exp
             self._F0T[i] = f
 
-        #######################################################################
-        # THE ACTUAL COMPUTATION LOOP STARTS HERE
-        #######################################################################
+###############################################################################
 
-        vol_type_value = self._volatility_function_type.value
+    def recalibrate(self,
+                    volatility_grid: (list, np.ndarray),
+                    stock_price: Optional[float] = None,
+                    discount_curve: Optional[DiscountCurve] = None,
+                    dividend_curve: Optional[DiscountCurve] = None,
+                    previous_surface: Optional["EquityVolSurface"] = None,
+                    tol: float = 1e-8,
+                    executor: Optional[Executor] = None):
+        """ Refit the surface to a new grid of market vols at the same strikes
+        and expiry dates. A new stock price, discount curve and dividend curve
+        may also be given, otherwise they are unchanged. Each smile is solved
+        starting from the parameters of the same expiry date in the previous
+        surface, which is this surface if none is given. This must have the
+        same expiry dates and strikes. An expiry date whose market vols have
+        not moved by more than tol and whose forward has not moved by more
+        than tol in relative terms from those of the previous surface keeps
+        its previous parameters. The others are refitted in the executor if
+        one is given. Returns the number of expiry dates which were refitted.
+        """
+
+        check_argument_types(self.recalibrate, locals())
+
+        if previous_surface is None:
+            previous_surface = self
+
+        if isinstance(previous_surface, EquityVolSurface) is False:
+            raise FinError("Previous surface must be an EquityVolSurface")
+
+        if previous_surface._volatility_function_type != \
+                self._volatility_function_type:
+            raise FinError("Previous surface has a different vol function")
+
+        if list(previous_surface._expiry_dates) != list(self._expiry_dates):
+            raise FinError("Previous surface has different expiry dates")
+
+        if np.array_equal(previous_surface._strikes, self._strikes) is False:
+            raise FinError("Previous surface has different strikes")
+
+        new_grid = np.array(volatility_grid, dtype=np.float64)
+        old_grid = np.array(previous_surface._volatility_grid,
+                            dtype=np.float64)
+
+        if new_grid.shape != (self._numExpiryDates, self._num_strikes):
+            raise FinError("Vol grid must be nExpiryDates x nStrikes")
+
+        if old_grid.shape != new_grid.shape:
+            raise FinError("Previous surface has a different vol grid size")
+
+        # Copies are needed as the previous surface may be this surface
+        parameters = previous_surface._parameters.copy()
+        old_fwds = previous_surface._F0T.copy()
 
-        x_inits = []
-        x_init = np.zeros(num_parameters)
-        x_inits.append(x_init)
+        self._volatility_grid = volatility_grid
 
-        for i in range(0, numExpiryDates):
+        if stock_price is not None:
+            self._stock_price = stock_price
+
+        if discount_curve is not None:
+            self._discount_curve = discount_curve
 
-            t = self._t_exp[i]
-            r = self._r[i]
-            q = self._q[i]
+        if dividend_curve is not None:
+            self._dividend_curve = dividend_curve
 
-            res = _solve_to_horizon(s, t, r, q,
-                                    self._strikes,
-                                    i,
-                                    self._volatility_grid,
-                                    vol_type_value,
-                                    x_inits[i],
-                                    finSolverType)
+        self._set_forwards()
 
-            self._parameters[i, :] = res
+        changed = []
+        for i in range(0, self._numExpiryDates):
+            vol_change = np.max(np.abs(new_grid[i] - old_grid[i]))
+            fwd_change = np.abs(self._F0T[i] - old_fwds[i]) / self._F0T[i]
+            if vol_change > tol or fwd_change > tol:
+                changed.append(i)
 
-            x_init = res
-            x_inits.append(x_init)
+        s = self._stock_price
+        vol_type_value = self._volatility_function_type.value
+        finSolverType = self._finSolverType
+
+        n = len(changed)
+
+        # The smiles are independent so they can all be solved in parallel
+        results = parallel_map(_solve_to_horizon,
+                               [s] * n,
+                               self._t_exp[changed],
+                               self._r[changed],
+                               self._q[changed],
+                               [self._strikes] * n,
+                               changed,
+                               [self._volatility_grid] * n,
+                               [vol_type_value] * n,
+                               parameters[changed],
+                               [finSolverType] * n,
+                               num_processes=self._num_processes,
+                               executor=executor)
+
+        for i, res in zip(changed, results):
+            parameters[i, :] = res
+
+        self._parameters = parameters
+
+        return len(changed)
 
 ###############################################################################
 
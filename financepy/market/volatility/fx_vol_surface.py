@@ -2,6 +2,10 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane, Saeed Amen
 ##############################################################################
 
+from concurrent.futures import Executor
+
+from typing import Optional
+
 import numpy as np
 from scipy.optimize import minimize
 
@@ -17,7 +21,9 @@ from ...models.option_implied_dbn import option_implied_dbn
 from ...products.fx.fx_mkt_conventions import FinFXATMMethod
 from ...products.fx.fx_mkt_conventions import FinFXDeltaMethod
 from ...utils.helpers import check_argument_types, label_to_string
+from ...utils.helpers import parallel_map
 from ...market.curves.discount_curve import DiscountCurve
+from ...market.volatility.vol_grid import VolGrid
 
 from ...models.black_scholes import BlackScholes
 
@@ -405,9 +411,15 @@ class FXVolSurface():
                  riskReversal25DeltaVols: (list, np.ndarray),
                  atmMethod: FinFXATMMethod = FinFXATMMethod.FWD_DELTA_NEUTRAL,
                  delta_method: FinFXDeltaMethod = FinFXDeltaMethod.SPOT_DELTA,
-                 volatility_function_type: VolFuncTypes = VolFuncTypes.CLARK):
+                 volatility_function_type: VolFuncTypes = VolFuncTypes.CLARK,
+                 num_processes: int = 1,
+                 executor: Optional[Executor] = None):
         """ Create the FinFXVolSurface object by passing in market vol data
-        for ATM and 25 Delta Market Strangles and Risk Reversals. """
+        for ATM and 25 Delta Market Strangles and Risk Reversals. The smiles
+        of the tenors are calibrated in the executor if one is given, which
+        lets many surfaces share one pool, else in parallel in num_processes
+        processes if this is more than one. The starting point of each smile
+        only depends on its own market vols so the results are the same. """
 
         check_argument_types(self.__init__, locals())
 
@@ -459,13 +471,14 @@ class FXVolSurface():
 
         self._vol_func_type = volatility_function_type
         self._tenorIndex = 0
+        self._num_processes = num_processes
 
         self._expiry_dates = []
         for i in range(0, self._num_vol_curves):
             expiry_date = value_date.add_tenor(tenors[i])
             self._expiry_dates.append(expiry_date)
 
-        self.build_vol_surface()
+        self.build_vol_surface(executor)
 
 ###############################################################################
 
@@ -539,7 +552,7 @@ class FXVolSurface():
 
 ###############################################################################
 
-    def build_vol_surface(self):
+    def build_vol_surface(self, executor: Optional[Executor] = None):
 
         s = self._spot_fx_rate
         num_vol_curves = self._num_vol_curves
@@ -562,10 +575,6 @@ class FXVolSurface():
 
         self._parameters = np.zeros([num_vol_curves, num_parameters])
 
-        self._F0T = np.zeros(num_vol_curves)
-        self._rd = np.zeros(num_vol_curves)
-        self._rf = np.zeros(num_vol_curves)
-        self._K_ATM = np.zeros(num_vol_curves)
         self._deltaATM = np.zeros(num_vol_curves)
 
         self._K_25D_C = np.zeros(num_vol_curves)
@@ -573,40 +582,8 @@ class FXVolSurface():
         self._K_25D_C_MS = np.zeros(num_vol_curves)
         self._K_25D_P_MS = np.zeros(num_vol_curves)
         self._V_25D_MS = np.zeros(num_vol_curves)
-        self._t_exp = np.zeros(num_vol_curves)
-
-        #######################################################################
-        # TODO: ADD SPOT DAYS
-        #######################################################################
-        spot_date = self._value_date
-
-        for i in range(0, num_vol_curves):
-
-            expiry_date = self._expiry_dates[i]
-            t_exp = (expiry_date - spot_date) / gDaysInYear
-
-            domDF = self._dom_discount_curve._df(t_exp)
-            forDF = self._for_discount_curve._df(t_exp)
-            f = s * forDF/domDF
-
-            self._t_exp[i] = t_exp
-            self._rd[i] = -np.log(domDF) / t_exp
-            self._rf[i] = -np.log(forDF) / t_exp
-            self._F0T[i] = f
-
-            atm_vol = self._atm_vols[i]
 
-            # This follows exposition in Clarke Page 52
-            if self._atmMethod == FinFXATMMethod.SPOT:
-                self._K_ATM[i] = s
-            elif self._atmMethod == FinFXATMMethod.FWD:
-                self._K_ATM[i] = f
-            elif self._atmMethod == FinFXATMMethod.FWD_DELTA_NEUTRAL:
-                self._K_ATM[i] = f * np.exp(atm_vol*atm_vol*t_exp/2.0)
-            elif self._atmMethod == FinFXATMMethod.FWD_DELTA_NEUTRAL_PREM_ADJ:
-                self._K_ATM[i] = f * np.exp(-atm_vol*atm_vol*t_exp/2.0)
-            else:
-                raise FinError("Unknown Delta Type")
+        self._set_forwards()
 
         #######################################################################
         # THE ACTUAL COMPUTATION LOOP STARTS HERE
@@ -679,27 +656,223 @@ class FXVolSurface():
         delta_method_value = self._delta_method.value
         vol_type_value = self._vol_func_type.value
 
-        for i in range(0, num_vol_curves):
+        n = num_vol_curves
 
-            t = self._t_exp[i]
-            r_d = self._rd[i]
-            r_f = self._rf[i]
-            K_ATM = self._K_ATM[i]
-            atm_vol = self._atm_vols[i]
-            ms25DVol = self._mktStrangle25DeltaVols[i]
-            rr25DVol = self._riskReversal25DeltaVols[i]
-
-#            print(t, rd, rf, K_ATM, atm_vol, ms25DVol, rr25DVol)
-
-            res = solve_to_horizon_fast(s, t, r_d, r_f, K_ATM,
-                                        atm_vol, ms25DVol, rr25DVol,
-                                        delta_method_value, vol_type_value,
-                                        x_inits[i])
+        results = parallel_map(solve_to_horizon_fast,
+                               [s] * n, self._t_exp, self._rd, self._rf,
+                               self._K_ATM, self._atm_vols,
+                               self._mktStrangle25DeltaVols,
+                               self._riskReversal25DeltaVols,
+                               [delta_method_value] * n,
+                               [vol_type_value] * n,
+                               x_inits,
+                               num_processes=self._num_processes,
+                               executor=executor)
 
+        for i, res in enumerate(results):
             (self._parameters[i, :],
              self._K_25D_C_MS[i], self._K_25D_P_MS[i],
              self._K_25D_C[i], self._K_25D_P[i]) = res
 
+###############################################################################
+
+    def build_vol_grid(self,
+                       num_log_moneyness: int = 101,
+                       num_std: float = 4.0,
+                       tol: float = 1e-4):
+        """ Precompute a grid of the total variance of the surface in expiry
+        time and log-moneyness for pricers which need many volatilities. Each
+        expiry row covers num_std standard deviations about the forward at the
+        highest ATM vol of the surface and the square root of its own expiry
+        time, widened if needed to cover the ATM and 25 delta strikes of that
+        expiry. The grid is refined until its volatility error is below tol
+        and is not updated on recalibration. Returns a VolGrid. """
+
+        check_argument_types(self.build_vol_grid, locals())
+
+        vol_type_value = self._vol_func_type.value
+
+        strikes = np.column_stack((self._K_ATM, self._K_25D_C,
+                                   self._K_25D_P, self._K_25D_C_MS,
+                                   self._K_25D_P_MS))
+
+        return VolGrid(vol_function, vol_type_value, self._parameters,
+                       self._F0T, self._t_exp, num_log_moneyness,
+                       num_std, tol, strikes=strikes)
+
+###############################################################################
+
+    def _atm_strike(self, f, atm_vol, t_exp):
+        """ Returns the ATM strike of a tenor given its forward and ATM vol
+        using the ATM convention of the surface. """
+
+        s = self._spot_fx_rate
+
+        # This follows exposition in Clarke Page 52
+        if self._atmMethod == FinFXATMMethod.SPOT:
+            return s
+        elif self._atmMethod == FinFXATMMethod.FWD:
+            return f
+        elif self._atmMethod == FinFXATMMethod.FWD_DELTA_NEUTRAL:
+            return f * np.exp(atm_vol*atm_vol*t_exp/2.0)
+        elif self._atmMethod == FinFXATMMethod.FWD_DELTA_NEUTRAL_PREM_ADJ:
+            return f * np.exp(-atm_vol*atm_vol*t_exp/2.0)
+        else:
+            raise FinError("Unknown Delta Type")
+
+###############################################################################
+
+    def _set_forwards(self):
+        """ Set the expiry times, the zero rates of the domestic and foreign
+        curves, the forwards and the ATM strikes of the tenors from the spot
+        rate, the curves and the ATM vols. """
+
+        s = self._spot_fx_rate
+        num_vol_curves = self._num_vol_curves
+
+        self._F0T = np.zeros(num_vol_curves)
+        self._rd = np.zeros(num_vol_curves)
+        self._rf = np.zeros(num_vol_curves)
+        self._K_ATM = np.zeros(num_vol_curves)
+        self._t_exp = np.zeros(num_vol_curves)
+
+        #######################################################################
+        # TODO: ADD SPOT DAYS
+        #######################################################################
+        spot_date = self._value_date
+
+        for i in range(0, num_vol_curves):
+
+            expiry_date = self._expiry_dates[i]
+            t_exp = (expiry_date - spot_date) / gDaysInYear
+
+            domDF = self._dom_discount_curve._df(t_exp)
+            forDF = self._for_discount_curve._df(t_exp)
+            f = s * forDF/domDF
+
+            self._t_exp[i] = t_exp
+            self._rd[i] = -np.log(domDF) / t_exp
+            self._rf[i] = -np.log(forDF) / t_exp
+            self._F0T[i] = f
+
+            self._K_ATM[i] = self._atm_strike(f, self._atm_vols[i], t_exp)
+
+###############################################################################
+
+    def recalibrate(self,
+                    atm_vols: (list, np.ndarray),
+                    mktStrangle25DeltaVols: (list, np.ndarray),
+                    riskReversal25DeltaVols: (list, np.ndarray),
+                    spot_fx_rate: Optional[float] = None,
+                    dom_discount_curve: Optional[DiscountCurve] = None,
+                    for_discount_curve: Optional[DiscountCurve] = None,
+                    previous_surface: Optional["FXVolSurface"] = None,
+                    tol: float = 1e-8,
+                    executor: Optional[Executor] = None):
+        """ Refit the surface to new ATM vols and 25 Delta Market Strangles
+        and Risk Reversals, all in percent, for the same tenors. A new spot
+        rate, domestic curve and foreign curve may also be given, otherwise
+        they are unchanged. Each smile is solved starting from the parameters
+        of the same tenor in the previous surface, which is this surface if
+        none is given. This must have the same expiry dates. A tenor whose
+        market vols have not moved by more than tol and whose forward has not
+        moved by more than tol in relative terms from those of the previous
+        surface keeps its previous parameters and strikes. The others are
+        refitted in the executor if one is given. Returns the number of tenors
+        which were refitted. """
+
+        check_argument_types(self.recalibrate, locals())
+
+        if previous_surface is None:
+            previous_surface = self
+
+        if isinstance(previous_surface, FXVolSurface) is False:
+            raise FinError("Previous surface must be an FXVolSurface")
+
+        if previous_surface._vol_func_type != self._vol_func_type:
+            raise FinError("Previous surface has a different vol function")
+
+        if previous_surface._num_vol_curves != self._num_vol_curves:
+            raise FinError("Previous surface has a different number of tenors")
+
+        if list(previous_surface._expiry_dates) != list(self._expiry_dates):
+            raise FinError("Previous surface has different expiry dates")
+
+        if len(atm_vols) != self._num_vol_curves:
+            raise FinError("Number ATM vols must equal number of tenors")
+
+        if len(mktStrangle25DeltaVols) != self._num_vol_curves:
+            raise FinError("Number MS25D vols must equal number of tenors")
+
+        if len(riskReversal25DeltaVols) != self._num_vol_curves:
+            raise FinError("Number RR25D vols must equal number of tenors")
+
+        new_quotes = np.array([atm_vols, mktStrangle25DeltaVols,
+                               riskReversal25DeltaVols]) / 100.0
+
+        old_quotes = np.array([previous_surface._atm_vols,
+                               previous_surface._mktStrangle25DeltaVols,
+                               previous_surface._riskReversal25DeltaVols])
+
+        # Copies are needed as the previous surface may be this surface
+        parameters = previous_surface._parameters.copy()
+        K_25D_C_MS = previous_surface._K_25D_C_MS.copy()
+        K_25D_P_MS = previous_surface._K_25D_P_MS.copy()
+        K_25D_C = previous_surface._K_25D_C.copy()
+        K_25D_P = previous_surface._K_25D_P.copy()
+        old_fwds = previous_surface._F0T.copy()
+
+        self._atm_vols = new_quotes[0]
+        self._mktStrangle25DeltaVols = new_quotes[1]
+        self._riskReversal25DeltaVols = new_quotes[2]
+
+        if spot_fx_rate is not None:
+            self._spot_fx_rate = spot_fx_rate
+
+        if dom_discount_curve is not None:
+            self._dom_discount_curve = dom_discount_curve
+
+        if for_discount_curve is not None:
+            self._for_discount_curve = for_discount_curve
+
+        self._set_forwards()
+
+        changed = []
+        for i in range(0, self._num_vol_curves):
+            vol_change = np.max(np.abs(new_quotes[:, i] - old_quotes[:, i]))
+            fwd_change = np.abs(self._F0T[i] - old_fwds[i]) / self._F0T[i]
+            if vol_change > tol or fwd_change > tol:
+                changed.append(i)
+
+        s = self._spot_fx_rate
+        delta_method_value = self._delta_method.value
+        vol_type_value = self._vol_func_type.value
+        n = len(changed)
+
+        args = ([s] * n, self._t_exp[changed], self._rd[changed],
+                self._rf[changed], self._K_ATM[changed],
+                self._atm_vols[changed],
+                self._mktStrangle25DeltaVols[changed],
+                self._riskReversal25DeltaVols[changed],
+                [delta_method_value] * n, [vol_type_value] * n,
+                parameters[changed])
+
+        results = parallel_map(solve_to_horizon_fast, *args,
+                               num_processes=self._num_processes,
+                               executor=executor)
+
+        for i, res in zip(changed, results):
+            (parameters[i, :], K_25D_C_MS[i], K_25D_P_MS[i],
+             K_25D_C[i], K_25D_P[i]) = res
+
+        self._parameters = parameters
+        self._K_25D_C_MS = K_25D_C_MS
+        self._K_25D_P_MS = K_25D_P_MS
+        self._K_25D_C = K_25D_C
+        self._K_25D_P = K_25D_P
+
+        return n
+
 ###############################################################################
 
     def solver_for_smile_strike(self,
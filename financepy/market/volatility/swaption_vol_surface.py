@@ -2,6 +2,10 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
+from concurrent.futures import Executor
+
+from typing import Optional, Union
+
 import numpy as np
 from scipy.optimize import minimize
 
@@ -12,6 +16,8 @@ from ...utils.error import FinError
 from ...utils.date import Date
 from ...utils.global_vars import gDaysInYear
 from ...utils.helpers import check_argument_types, label_to_string
+from ...utils.helpers import parallel_map
+from ...market.volatility.vol_grid import VolGrid
 
 from ...models.volatility_fns import VolFuncTypes
 from ...models.volatility_fns import vol_function_clark
@@ -21,9 +27,12 @@ from ...models.volatility_fns import vol_function_ssvi
 from ...models.sabr import vol_function_sabr
 from ...models.sabr import vol_function_sabr_beta_half
 from ...models.sabr import vol_function_sabr_beta_one
+from ...models.volatility_fns import vol_function_grad
+from ...models.volatility_fns import flat_smile_params
 
 
 from ...utils.solver_nm import nelder_mead
+from ...utils.solver_lm import levenberg_marquardt
 from ...utils.global_types import FinSolverTypes
 
 ###############################################################################
@@ -125,6 +134,36 @@ def _obj(params, *args):
     return tot
 
 ###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _obj_residuals(params, *args):
+    """ Return the differences between the fitted and market vols at each
+    strike of one time slice, whose sum of squares is _obj, together with
+    their Jacobian with respect to params. """
+
+    t = args[0]
+    f = args[1]
+    strikesGrid = args[2]
+    index = args[3]
+    volatility_grid = args[4]
+    vol_type_value = args[5]
+
+    num_strikes = len(volatility_grid)
+
+    res = np.zeros(num_strikes)
+    jac = np.zeros((num_strikes, len(params)))
+
+    for i in range(0, num_strikes):
+
+        k = strikesGrid[i][index]
+        fitted_vol = vol_function(vol_type_value, params, f, k, t)
+        res[i] = fitted_vol - volatility_grid[i][index]
+        jac[i, :] = vol_function_grad(vol_type_value, params, f, k, t)
+
+    return res, jac
+
+###############################################################################
 # Do not cache this function as it leads to complaints
 ###############################################################################
 
@@ -160,6 +199,24 @@ def _solve_to_horizon(t, f,
         elif finSolverType == FinSolverTypes.CONJUGATE_GRADIENT:
             opt = minimize(_obj, x_inits, args, method="CG", tol=tol)
             xopt = opt.x
+        elif finSolverType == FinSolverTypes.LEVENBERG_MARQUARDT:
+            x_init = np.array(x_inits, dtype=np.float64)
+            strikes = np.array([k[timeIndex] for k in strikesGrid])
+            atm_index = np.argmin(np.abs(strikes - f))
+            atm_vol = volatility_grid[atm_index][timeIndex]
+            x_flat = flat_smile_params(vol_type_value, len(x_init), f,
+                                       atm_vol, t)
+            xopt = None
+            if np.any(x_init):
+                try:
+                    xopt, _ = levenberg_marquardt(_obj_residuals, x_init,
+                                                  args, 1e-10, 200)
+                except FinError:
+                    # The parameters of another expiry can be a poor start
+                    pass
+            if xopt is None:
+                xopt, _ = levenberg_marquardt(_obj_residuals, x_flat, args,
+                                              1e-10, 200)
     except Exception:
         # If convergence fails try again with CG if necessary
         if finSolverType != FinSolverTypes.CONJUGATE_GRADIENT:
@@ -376,9 +433,16 @@ class SwaptionVolSurface():
                  strike_grid: (np.ndarray),
                  volatility_grid: (np.ndarray),
                  volatility_function_type: VolFuncTypes = VolFuncTypes.SABR,
-                 finSolverType: FinSolverTypes = FinSolverTypes.NELDER_MEAD):
+                 finSolverType: FinSolverTypes = FinSolverTypes.NELDER_MEAD,
+                 num_processes: int = 1,
+                 executor: Optional[Executor] = None):
         """ Create the FinSwaptionVolSurface object by passing in market vol
-        data for a list of strikes and expiry dates. """
+        data for a list of strikes and expiry dates. The smiles of the expiry
+        dates after the first are solved starting from the parameters of the
+        first expiry. They are calibrated in the executor if one is given,
+        which lets many surfaces share one pool, else in parallel in
+        num_processes processes if this is more than one. The results are the
+        same. """
 
         check_argument_types(self.__init__, locals())
 
@@ -411,8 +475,11 @@ class SwaptionVolSurface():
         self._volatility_function_type = volatility_function_type
 
         self._fwd_swap_rates = fwd_swap_rates
+        self._num_processes = num_processes
+        self._finSolverType = finSolverType
 
-        self._build_vol_surface(finSolverType=finSolverType)
+        self._build_vol_surface(finSolverType=finSolverType,
+                                executor=executor)
 
 ###############################################################################
 
@@ -500,6 +567,29 @@ class SwaptionVolSurface():
 
         return volt
 
+###############################################################################
+
+    def build_vol_grid(self,
+                       num_log_moneyness: int = 101,
+                       num_std: float = 4.0,
+                       tol: float = 1e-4):
+        """ Precompute a grid of the total variance of the surface in expiry
+        time and log-moneyness for pricers which need many volatilities. Each
+        expiry row covers num_std standard deviations about the forward at the
+        highest ATM vol of the surface and the square root of its own expiry
+        time, widened if needed to cover the quoted strikes of that expiry.
+        The grid is refined until its volatility error is below tol. It is not
+        updated if the surface is recalibrated. Returns a VolGrid. """
+
+        check_argument_types(self.build_vol_grid, locals())
+
+        vol_type_value = self._volatility_function_type.value
+
+        return VolGrid(vol_function, vol_type_value, self._parameters,
+                       np.array(self._fwd_swap_rates), self._t_exp,
+                       num_log_moneyness, num_std, tol,
+                       strikes=self._strike_grid.T)
+
 ###############################################################################
 
     # def delta_to_strike(self, call_delta, expiry_date, delta_method):
@@ -715,7 +805,8 @@ class SwaptionVolSurface():
 
 ###############################################################################
 
-    def _build_vol_surface(self, finSolverType=FinSolverTypes.NELDER_MEAD):
+    def _build_vol_surface(self, finSolverType=FinSolverTypes.NELDER_MEAD,
+                           executor=None):
         """ Main function to construct the vol surface. """
 
         if self._volatility_function_type == VolFuncTypes.CLARK:
@@ -759,27 +850,125 @@ class SwaptionVolSurface():
 
         vol_type_value = self._volatility_function_type.value
 
-        x_inits = []
         x_init = np.zeros(num_parameters)
-        x_inits.append(x_init)
 
-        for i in range(0, numExpiryDates):
+        # The first expiry is solved alone and its parameters are the
+        # starting point for all of the other expiries
+        self._parameters[0, :] = \
+            _solve_to_horizon(self._t_exp[0], self._fwd_swap_rates[0],
+                              self._strike_grid, 0,
+                              self._volatility_grid, vol_type_value,
+                              x_init, finSolverType)
+
+        n = numExpiryDates - 1
+
+        results = parallel_map(_solve_to_horizon,
+                               self._t_exp[1:],
+                               self._fwd_swap_rates[1:n + 1],
+                               [self._strike_grid] * n,
+                               range(1, n + 1),
+                               [self._volatility_grid] * n,
+                               [vol_type_value] * n,
+                               [self._parameters[0]] * n,
+                               [finSolverType] * n,
+                               num_processes=self._num_processes,
+                               executor=executor)
+
+        for i, res in enumerate(results):
+            self._parameters[i + 1, :] = res
+
+###############################################################################
+
+    def recalibrate(self,
+                    volatility_grid: np.ndarray,
+                    fwd_swap_rates: Union[list, np.ndarray, None] = None,
+                    previous_surface: Optional["SwaptionVolSurface"] = None,
+                    tol: float = 1e-8,
+                    executor: Optional[Executor] = None):
+        """ Refit the surface to a new grid of market vols at the same strikes
+        and expiry dates. New forward swap rates may also be given, otherwise
+        they are unchanged. Each smile is solved starting from the parameters
+        of the same expiry date in the previous surface, which is this surface
+        if none is given. This must have the same expiry dates and strikes. An
+        expiry date whose market vols have not moved by more than tol and
+        whose forward has not moved by more than tol in relative terms from
+        those of the previous surface keeps its previous parameters. The
+        others are refitted in the executor if one is given. Returns the
+        number of expiry dates which were refitted. """
+
+        check_argument_types(self.recalibrate, locals())
+
+        if previous_surface is None:
+            previous_surface = self
+
+        if isinstance(previous_surface, SwaptionVolSurface) is False:
+            raise FinError("Previous surface must be a SwaptionVolSurface")
+
+        if previous_surface._volatility_function_type != \
+                self._volatility_function_type:
+            raise FinError("Previous surface has a different vol function")
+
+        if volatility_grid.shape != self._strike_grid.shape:
+            raise FinError(
+                "Strike grid and volatility grid must have same size")
+
+        if previous_surface._volatility_grid.shape != volatility_grid.shape:
+            raise FinError("Previous surface has a different vol grid size")
 
-            t = self._t_exp[i]
+        if list(previous_surface._expiry_dates) != list(self._expiry_dates):
+            raise FinError("Previous surface has different expiry dates")
+
+        if np.array_equal(previous_surface._strike_grid,
+                          self._strike_grid) is False:
+            raise FinError("Previous surface has different strikes")
+
+        if fwd_swap_rates is not None and \
+                len(fwd_swap_rates) != self._numExpiryDates:
+            raise FinError("Number of forward swap rates must equal number "
+                           "of expiry dates")
+
+        # Copies are needed as the previous surface may be this surface
+        parameters = previous_surface._parameters.copy()
+        old_grid = previous_surface._volatility_grid.copy()
+        old_fwds = np.array(previous_surface._fwd_swap_rates)
+
+        self._volatility_grid = volatility_grid
+
+        if fwd_swap_rates is not None:
+            self._fwd_swap_rates = fwd_swap_rates
+
+        changed = []
+        for i in range(0, self._numExpiryDates):
             f = self._fwd_swap_rates[i]
+            vol_change = np.max(np.abs(volatility_grid[:, i] - old_grid[:, i]))
+            fwd_change = np.abs(f - old_fwds[i]) / np.abs(f)
+            if vol_change > tol or fwd_change > tol:
+                changed.append(i)
+
+        vol_type_value = self._volatility_function_type.value
+        finSolverType = self._finSolverType
+
+        n = len(changed)
+
+        # The smiles are independent so they can all be solved in parallel
+        results = parallel_map(_solve_to_horizon,
+                               self._t_exp[changed],
+                               [self._fwd_swap_rates[i] for i in changed],
+                               [self._strike_grid] * n,
+                               changed,
+                               [self._volatility_grid] * n,
+                               [vol_type_value] * n,
+                               parameters[changed],
+                               [finSolverType] * n,
+                               num_processes=self._num_processes,
+                               executor=executor)
 
-            res = _solve_to_horizon(t, f,
-                                    self._strike_grid,
-                                    i,
-                                    self._volatility_grid,
-                                    vol_type_value,
-                                    x_inits[i],
-                                    finSolverType)
+        for i, res in zip(changed, results):
+            parameters[i, :] = res
 
-            self._parameters[i, :] = res
+        self._parameters = parameters
 
-            x_init = res
-            x_inits.append(x_init)
+        return len(changed)
 
 ###############################################################################
 
@@ -0,0 +1,256 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+from numba import njit
+
+from ...utils.error import FinError
+from ...utils.helpers import label_to_string
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True, inline='always')
+def _interpolate_row(var_grid, row, x_mins, dxs, x):
+    """ Linear interpolation of the total variance in one row of the grid at a
+    log-moneyness. The grid is uniform so the cell is found without a search.
+    The total variance is flat outside the grid. """
+
+    n = var_grid.shape[1]
+    u = (x - x_mins[row]) / dxs[row]
+
+    if u <= 0.0:
+        return var_grid[row, 0]
+
+    if u >= n - 1:
+        return var_grid[row, n - 1]
+
+    j = int(u)
+    w = u - j
+    return (1.0 - w) * var_grid[row, j] + w * var_grid[row, j + 1]
+
+###############################################################################
+
+
+# This is inlined into its callers as passing the grid arrays to a separate
+# function costs more than the interpolation itself
+@njit(cache=True, fastmath=True, inline='always')
+def vol_grid_lookup(t_grid, log_fwds, x_mins, dxs, var_grid, k, t):
+    """ Return the volatility at a strike and expiry time from a grid of total
+    variances. Row i holds the total variance at expiry time t_grid[i] on a
+    uniform grid of log-moneyness ln(k/f) starting at x_mins[i] with spacing
+    dxs[i], where ln(f) is log_fwds[i]. Linear interpolation is done in
+    log-moneyness within each row and then in total variance at a fixed strike
+    between the rows. The volatility is flat outside the first and last expiry
+    times. This can be called from Numba compiled code. """
+
+    num_times = len(t_grid)
+    log_k = np.log(k)
+
+    # There are few expiries so a linear search is quickest
+    if t <= t_grid[0]:
+        i0 = 0
+        i1 = 0
+    elif t >= t_grid[num_times - 1]:
+        i0 = num_times - 1
+        i1 = num_times - 1
+    else:
+        i1 = 1
+        while t > t_grid[i1]:
+            i1 += 1
+        i0 = i1 - 1
+
+    t0 = t_grid[i0]
+    w0 = _interpolate_row(var_grid, i0, x_mins, dxs, log_k - log_fwds[i0])
+
+    if i1 == i0:
+        return np.sqrt(w0 / t0)
+
+    t1 = t_grid[i1]
+    w1 = _interpolate_row(var_grid, i1, x_mins, dxs, log_k - log_fwds[i1])
+    w = ((t - t0) * w1 + (t1 - t) * w0) / (t1 - t0)
+
+    return np.sqrt(w / t)
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _vol_grid_lookups(t_grid, log_fwds, x_mins, dxs, var_grid, strikes,
+                      t_exps):
+    """ Return the volatility from the grid at each pair of strike and expiry
+    time. """
+
+    num_vols = len(strikes)
+    vols = np.empty(num_vols)
+
+    for j in range(0, num_vols):
+        vols[j] = vol_grid_lookup(t_grid, log_fwds, x_mins, dxs, var_grid,
+                                  strikes[j], t_exps[j])
+
+    return vols
+
+###############################################################################
+
+
+def _smile_total_variances(vol_function, vol_type_value, parameters, fwds,
+                           t_exp, x_grid):
+    """ Return the total variance of the smile of each expiry at each
+    log-moneyness in the same row of a grid. """
+
+    num_times = len(t_exp)
+    var_grid = np.zeros(x_grid.shape)
+
+    for i in range(0, num_times):
+        for j, x in enumerate(x_grid[i]):
+            vol = vol_function(vol_type_value, parameters[i], fwds[i],
+                               fwds[i] * np.exp(x), t_exp[i])
+            var_grid[i, j] = vol * vol * t_exp[i]
+
+    if not np.all(np.isfinite(var_grid)):
+        raise FinError("Smile is not defined across the log-moneyness grid."
+                       " Try a smaller number of standard deviations.")
+
+    return var_grid
+
+###############################################################################
+
+
+class VolGrid():
+    """ A precomputed grid of the total variance of a volatility surface on
+    a uniform grid of log-moneyness at each expiry of the surface. It returns
+    the volatility at a strike and expiry time by interpolation without
+    evaluating the smile function. The arrays property gives the arrays that
+    need to be passed to vol_grid_lookup in Numba compiled pricers. """
+
+    def __init__(self,
+                 vol_function,
+                 vol_type_value: int,
+                 parameters: np.ndarray,
+                 fwds: np.ndarray,
+                 t_exp: np.ndarray,
+                 num_log_moneyness: int = 101,
+                 num_std: float = 4.0,
+                 tol: float = 1e-4,
+                 max_num_log_moneyness: int = 100001,
+                 strikes: np.ndarray = None):
+        """ Create the grid from the smile parameters, forwards and expiry
+        times of a surface and its Numba vol function. The log-moneyness grid
+        of each expiry runs from -x to +x about the forward where x is num_std
+        times the highest ATM vol of the surface times the square root of the
+        expiry time of that row. If the quoted strikes are given, either in a
+        2D array with a row per expiry or in a 1D array shared by all expiries,
+        each row is widened to cover the log-moneyness of its strikes. The
+        number of grid points is increased until the largest volatility error
+        at the midpoints of the grid cells is below tol. Beyond the grid the
+        total variance is flat. The grid is exact in time as the surface
+        interpolates linearly in total variance at a fixed strike between
+        expiries. """
+
+        if num_log_moneyness < 2:
+            raise FinError("Need at least two log-moneyness points")
+
+        t_exp = np.array(t_exp, dtype=np.float64)
+        fwds = np.array(fwds, dtype=np.float64)
+        num_times = len(t_exp)
+
+        atm_vols = [vol_function(vol_type_value, parameters[i], fwds[i],
+                                 fwds[i], t_exp[i])
+                    for i in range(0, num_times)]
+
+        x_maxs = num_std * np.max(atm_vols) * np.sqrt(t_exp)
+        x_mins = -x_maxs
+
+        if strikes is not None:
+
+            strikes = np.array(strikes, dtype=np.float64)
+
+            if strikes.ndim == 1:
+                strikes = np.tile(strikes, (num_times, 1))
+
+            if strikes.ndim != 2 or len(strikes) != num_times:
+                raise FinError("Strikes must have a row per expiry")
+
+            x_strikes = np.log(strikes / fwds.reshape(-1, 1))
+            x_mins = np.minimum(x_mins, np.min(x_strikes, axis=1))
+            x_maxs = np.maximum(x_maxs, np.max(x_strikes, axis=1))
+
+        n = num_log_moneyness
+
+        while True:
+
+            x_grid = np.linspace(x_mins, x_maxs, n, axis=1)
+            var_grid = _smile_total_variances(vol_function, vol_type_value,
+                                              parameters, fwds, t_exp, x_grid)
+
+            # Check the interpolated vol at the middle of each cell
+            x_mid = 0.5 * (x_grid[:, 1:] + x_grid[:, :-1])
+            var_mid = _smile_total_variances(vol_function, vol_type_value,
+                                             parameters, fwds, t_exp, x_mid)
+            var_interp = 0.5 * (var_grid[:, 1:] + var_grid[:, :-1])
+            t_col = t_exp.reshape(-1, 1)
+
+            max_error = np.max(np.abs(np.sqrt(var_mid / t_col) -
+                                      np.sqrt(var_interp / t_col)))
+
+            if max_error <= tol:
+                break
+
+            if 2 * n - 1 > max_num_log_moneyness:
+                raise FinError("Vol grid error " + str(max_error) +
+                               " is above tolerance at the maximum size")
+
+            n = 2 * n - 1
+
+        self._t_grid = t_exp
+        self._log_fwds = np.log(fwds)
+        self._x_mins = x_grid[:, 0].copy()
+        self._dxs = x_grid[:, 1] - x_grid[:, 0]
+        self._var_grid = var_grid
+        self._max_error = max_error
+
+    ###########################################################################
+
+    @property
+    def arrays(self):
+        """ The arguments of vol_grid_lookup which precede the strike and the
+        expiry time. """
+
+        return (self._t_grid, self._log_fwds, self._x_mins, self._dxs,
+                self._var_grid)
+
+    ###########################################################################
+
+    def vol_from_strikes_times(self,
+                               strikes: (float, np.ndarray),
+                               t_exps: (float, np.ndarray)):
+        """ Interpolate the volatility from the grid at arrays of strikes and
+        expiry times in years. Either may be a scalar in which case it is
+        broadcast against the other. """
+
+        strikes, t_exps = np.broadcast_arrays(
+            np.asarray(strikes, dtype=np.float64),
+            np.asarray(t_exps, dtype=np.float64))
+
+        shape = strikes.shape
+
+        vols = _vol_grid_lookups(*self.arrays,
+                                 np.ascontiguousarray(strikes.ravel()),
+                                 np.ascontiguousarray(t_exps.ravel()))
+
+        return vols.reshape(shape)
+
+    ###########################################################################
+
+    def __repr__(self):
+
+        s = label_to_string("OBJECT TYPE", type(self).__name__)
+        s += label_to_string("NUM EXPIRIES", len(self._t_grid))
+        s += label_to_string("NUM LOG-MONEYNESS", self._var_grid.shape[1])
+        s += label_to_string("LOG-MONEYNESS MIN", self._x_mins)
+        s += label_to_string("LOG-MONEYNESS STEP", self._dxs)
+        s += label_to_string("MAX ERROR", self._max_error)
+        return s
+
+###############################################################################
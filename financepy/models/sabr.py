@@ -68,6 +68,99 @@ def vol_function_sabr(params, f, k, t):
 ###############################################################################
 
 
+@njit(float64[:](float64, float64, float64, float64, float64, float64,
+                 float64), fastmath=True, cache=True)
+def _vol_function_sabr_grad(alpha, beta, rho, nu, f, k, t):
+    """ Derivatives of the Black volatility of vol_function_sabr with respect
+    to alpha, beta, rho and nu. Each intermediate term of the expansion is
+    differentiated in turn and combined by the chain rule. """
+
+    alpha_floored = False
+    if alpha < 1e-10:
+        alpha = 1e-10
+        alpha_floored = True
+
+    # Negative strikes or forwards
+    if k <= 0:
+        raise FinError("Strike must be positive")
+
+    if f <= 0:
+        raise FinError("Forward must be positive")
+
+    logfk = np.log(f / k)
+    log_prod = np.log(f * k)
+    b = 1.0 - beta
+    fkb = (f*k)**b
+    d = fkb**0.5
+
+    # Each derivative vector is in the order alpha, beta, rho, nu
+    a = b**2 * alpha**2 / (24.0 * fkb)
+    da = np.array([2.0 * b**2 * alpha / (24.0 * fkb),
+                   -2.0 * b * alpha**2 / (24.0 * fkb) + a * log_prod,
+                   0.0, 0.0])
+
+    # This is the second term b of vol_function_sabr
+    bb = 0.25 * rho * beta * nu * alpha / d
+    dbb = np.array([0.25 * rho * beta * nu / d,
+                    0.25 * rho * nu * alpha / d + 0.5 * bb * log_prod,
+                    0.25 * beta * nu * alpha / d,
+                    0.25 * rho * beta * alpha / d])
+
+    c = (2.0 - 3.0*rho**2.0) * nu**2.0 / 24
+    dc = np.array([0.0, 0.0,
+                   -0.25 * rho * nu**2,
+                   (2.0 - 3.0*rho**2.0) * nu / 12.0])
+
+    m = 1.0 + (a + bb + c) * t
+    dm = (da + dbb + dc) * t
+
+    q = 1.0 + bb**2 * logfk**2 / 24.0 + bb**4 * logfk**4 / 1920.0
+    dq = (bb * logfk**2 / 12.0 + bb**3 * logfk**4 / 480.0) * dbb
+
+    z = nu * d * logfk / alpha
+
+    eps = 1e-07
+
+    if abs(z) > eps:
+        root = np.sqrt(1.0 - 2.0*rho*z + z**2)
+        arg = root + z - rho
+        x = np.log(arg / (1.0 - rho))
+
+        dz = np.array([-z / alpha, -0.5 * z * log_prod, 0.0,
+                       d * logfk / alpha])
+        dx = dz / root
+        dx[2] += (-z / root - 1.0) / arg + 1.0 / (1.0 - rho)
+
+        # alpha * z / d is nu * logfk so vol = nu * logfk * m / (q * x)
+        vol = nu * logfk * m / (q * x)
+        grad = nu * logfk * dm / (q * x) - vol * (dq / q + dx / x)
+        grad[3] += logfk * m / (q * x)
+    else:
+        vol = alpha * m / (d * q)
+        grad = alpha * dm / (d * q) - vol * dq / q
+        grad[0] += m / (d * q)
+        grad[1] += 0.5 * vol * log_prod
+
+    if alpha_floored is True:
+        grad[0] = 0.0
+
+    return grad
+
+###############################################################################
+
+
+@njit(float64[:](float64[:], float64, float64, float64),
+      fastmath=True, cache=True)
+def vol_function_sabr_grad(params, f, k, t):
+    """ Derivatives of the SABR Black volatility with respect to alpha, beta,
+    rho and nu. """
+
+    return _vol_function_sabr_grad(params[0], params[1], params[2],
+                                   params[3], f, k, t)
+
+###############################################################################
+
+
 @njit(float64(float64[:], float64, float64, float64),
       fastmath=True, cache=True)
 def vol_function_sabr_beta_one(params, f, k, t):
@@ -114,6 +207,63 @@ def vol_function_sabr_beta_one(params, f, k, t):
 ###############################################################################
 
 
+@njit(float64[:](float64[:], float64, float64, float64),
+      fastmath=True, cache=True)
+def vol_function_sabr_beta_one_grad(params, f, k, t):
+    """ Derivatives of vol_function_sabr_beta_one with respect to alpha, rho
+    and nu which is the order of its parameters. """
+
+    alpha = params[0]
+    rho = params[1]
+    nu = params[2]
+
+    rho_clipped = False
+
+    if rho > 1.0:
+        rho = 0.99
+        rho_clipped = True
+
+    if rho < -1.0:
+        rho = -0.99
+        rho_clipped = True
+
+    m = f / k
+
+    s = rho * nu * alpha / 4.0 + nu * nu * ((2.0 - 3.0 * (rho**2.0)) / 24.0)
+    ds = np.array([rho * nu / 4.0,
+                   nu * alpha / 4.0 - rho * nu * nu / 4.0,
+                   rho * alpha / 4.0 + nu * (2.0 - 3.0 * (rho**2.0)) / 12.0])
+    num = 1.0 + s * t
+
+    if abs(m - 1.0) > 1e-6:
+
+        logM = np.log(m)
+        z = nu / alpha * logM
+        root = np.sqrt(1.0 - 2.0*rho*z + z**2.0)
+        arg = root + z - rho
+        x = np.log(arg / (1.0 - rho))
+
+        dz = np.array([-z / alpha, 0.0, logM / alpha])
+        dx = dz / root
+        dx[1] += (-z / root - 1.0) / arg + 1.0 / (1.0 - rho)
+
+        # alpha * z is nu * logM so sigma = nu * logM * num / x
+        sigma = nu * logM * num / x
+        grad = nu * logM * t * ds / x - sigma * dx / x
+        grad[2] += logM * num / x
+
+    else:
+        grad = alpha * t * ds
+        grad[0] += num
+
+    if rho_clipped is True:
+        grad[1] = 0.0
+
+    return grad
+
+###############################################################################
+
+
 @njit(float64(float64[:], float64, float64, float64),
       fastmath=True, cache=True)
 def vol_function_sabr_beta_half(params, f, k, t):
@@ -159,6 +309,20 @@ def vol_function_sabr_beta_half(params, f, k, t):
 ###############################################################################
 
 
+@njit(float64[:](float64[:], float64, float64, float64),
+      fastmath=True, cache=True)
+def vol_function_sabr_beta_half_grad(params, f, k, t):
+    """ Derivatives of vol_function_sabr_beta_half with respect to alpha, rho
+    and nu which is the order of its parameters. """
+
+    grad = _vol_function_sabr_grad(params[0], 0.50, params[1], params[2],
+                                   f, k, t)
+
+    return np.array([grad[0], grad[2], grad[3]])
+
+###############################################################################
+
+
 class SABR():
     """ SABR - Stochastic alpha beta rho model by Hagan et al. which is a
     stochastic volatility model where alpha controls the implied volatility,
@@ -3,10 +3,13 @@
 ##############################################################################
 
 import numpy as np
-from numba import njit, float64
+from numba import njit, float64, int64
 
-from ..utils.math import N
+from ..utils.math import N, nprime
 from ..utils.error import FinError
+from .sabr import vol_function_sabr_grad
+from .sabr import vol_function_sabr_beta_one_grad
+from .sabr import vol_function_sabr_beta_half_grad
 
 ###############################################################################
 # Parametric functions for option volatility to use in a Black-Scholes model
@@ -29,6 +32,48 @@ class VolFuncTypes(Enum):
 ###############################################################################
 
 
+def flat_smile_params(vol_function_type_value: int,
+                      num_params: int,
+                      f: float,
+                      atm_vol: float,
+                      t: float):
+    """ Return parameters of a volatility function which give a smile that
+    is close to flat at the ATM volatility. These are a starting point
+    for a calibration which has no better initial guess. """
+
+    params = np.zeros(num_params)
+
+    if vol_function_type_value == VolFuncTypes.CLARK.value or \
+            vol_function_type_value == VolFuncTypes.CLARK5.value:
+        params[0] = np.log(atm_vol)
+    elif vol_function_type_value == VolFuncTypes.SVI.value:
+        # The total variance at the money is a + b * sigma
+        params[4] = 0.10
+        params[1] = 0.10 * atm_vol * atm_vol * t / params[4]
+        params[0] = 0.90 * atm_vol * atm_vol * t
+    elif vol_function_type_value == VolFuncTypes.SABR.value:
+        params[1] = 0.50
+        params[0] = atm_vol * f ** (1.0 - params[1])
+        params[3] = 0.30
+    elif vol_function_type_value == VolFuncTypes.SABR_BETA_ONE.value:
+        params[0] = atm_vol
+        params[2] = 0.30
+    elif vol_function_type_value == VolFuncTypes.SABR_BETA_HALF.value:
+        params[0] = atm_vol * np.sqrt(f)
+        params[2] = 0.30
+    elif vol_function_type_value == VolFuncTypes.BBG.value:
+        # The last parameter is the constant term of the quadratic in delta
+        params[num_params - 1] = atm_vol
+    elif vol_function_type_value == VolFuncTypes.SSVI.value:
+        params[0] = 0.5
+        params[1] = atm_vol
+        params[2] = 0.0
+
+    return params
+
+###############################################################################
+
+
 @njit(float64(float64[:], float64, float64, float64),
       fastmath=True, cache=True)
 def vol_function_clark(params, f, k, t):
@@ -58,6 +103,38 @@ def vol_function_clark(params, f, k, t):
 ###############################################################################
 
 
+@njit(float64[:](float64[:], float64, float64, float64),
+      fastmath=True, cache=True)
+def vol_function_clark_grad(params, f, k, t):
+    """ Derivatives of the Clark volatility function with respect to each of
+    its parameters. The first parameter also sets the scale of the delta. """
+
+    x = np.log(f/k)
+    sigma0 = np.exp(params[0])
+    arg = x / (sigma0 * np.sqrt(t))
+    deltax = N(arg) - 0.50
+
+    poly = 0.0
+    dpoly = 0.0
+    for i in range(0, len(params)):
+        poly += params[i] * (deltax ** i)
+        if i > 0:
+            dpoly += i * params[i] * (deltax ** (i - 1))
+
+    vol = np.exp(poly)
+
+    grad = np.zeros(len(params))
+    for i in range(0, len(params)):
+        grad[i] = vol * (deltax ** i)
+
+    # d(arg)/d(params[0]) = -arg
+    grad[0] -= vol * dpoly * nprime(arg) * arg
+
+    return grad
+
+###############################################################################
+
+
 @njit(float64(float64[:], float64, float64, float64),
       fastmath=True, cache=True)
 def vol_function_bloomberg(params, f, k, t):
@@ -118,6 +195,37 @@ def vol_function_svi(params, f, k, t):
     return v
 
 ###############################################################################
+
+
+@njit(float64[:](float64[:], float64, float64, float64),
+      fastmath=True, cache=True)
+def vol_function_svi_grad(params, f, k, t):
+    """ Derivatives of the SVI volatility function with respect to a, b, rho,
+    m and sigma. """
+
+    x = np.log(f/k)
+
+    a = params[0]
+    b = params[1]
+    rho = params[2]
+    m = params[3]
+    sigma = params[4]
+
+    root = np.sqrt((x-m)**2 + sigma*sigma)
+    vart = a + b*(rho*(x-m) + root)
+    v = np.sqrt(vart/t)
+
+    grad = np.zeros(len(params))
+    grad[0] = 1.0
+    grad[1] = rho*(x-m) + root
+    grad[2] = b*(x-m)
+    grad[3] = -b*(rho + (x-m)/root)
+    grad[4] = b*sigma/root
+
+    # Chain rule from the total variance to the volatility
+    return grad / (2.0 * v * t)
+
+###############################################################################
 ###############################################################################
 # Gatheral SSVI surface SVI and equivalent local volatility
 # Code from https://wwwf.imperial.ac.uk/~ajacquie/IC_AMDP/IC_AMDP_Docs/Code/SSVI.pdf
@@ -254,3 +362,51 @@ def vol_function_ssvi(params, f, k, t):
 
 
 ###############################################################################
+
+
+@njit(float64[:](int64, float64[:], float64, float64, float64),
+      cache=True, fastmath=True)
+def vol_function_grad(vol_function_type_value, params, f, k, t):
+    """ Return the derivatives of the volatility for a strike with respect to
+    the parameters of the volatility function. These are analytic for the
+    Clark, SABR and SVI functions and are central differences for the BBG and
+    SSVI functions. The SSVI vol is a local vol which is itself computed by
+    finite differences of the SSVI total variance. """
+
+    if vol_function_type_value == VolFuncTypes.CLARK.value:
+        return vol_function_clark_grad(params, f, k, t)
+    elif vol_function_type_value == VolFuncTypes.SABR_BETA_ONE.value:
+        return vol_function_sabr_beta_one_grad(params, f, k, t)
+    elif vol_function_type_value == VolFuncTypes.SABR_BETA_HALF.value:
+        return vol_function_sabr_beta_half_grad(params, f, k, t)
+    elif vol_function_type_value == VolFuncTypes.SABR.value:
+        return vol_function_sabr_grad(params, f, k, t)
+    elif vol_function_type_value == VolFuncTypes.CLARK5.value:
+        return vol_function_clark_grad(params, f, k, t)
+    elif vol_function_type_value == VolFuncTypes.SVI.value:
+        return vol_function_svi_grad(params, f, k, t)
+    elif vol_function_type_value != VolFuncTypes.BBG.value and \
+            vol_function_type_value != VolFuncTypes.SSVI.value:
+        raise FinError("Unknown Model Type")
+
+    grad = np.zeros(len(params))
+
+    for i in range(0, len(params)):
+        h = 1e-6 * max(1.0, abs(params[i]))
+        params_up = params.copy()
+        params_up[i] += h
+        params_down = params.copy()
+        params_down[i] -= h
+
+        if vol_function_type_value == VolFuncTypes.BBG.value:
+            vol_up = vol_function_bloomberg(params_up, f, k, t)
+            vol_down = vol_function_bloomberg(params_down, f, k, t)
+        else:
+            vol_up = vol_function_ssvi(params_up, f, k, t)
+            vol_down = vol_function_ssvi(params_down, f, k, t)
+
+        grad[i] = (vol_up - vol_down) / (2.0 * h)
+
+    return grad
+
+###############################################################################
@@ -8,7 +8,7 @@ from numba import njit, float64, int64
 from math import exp, log
 from copy import deepcopy
 
-from ...utils.date import Date
+from ...utils.date import Date, intern_date
 from ...utils.error import FinError
 from ...utils.calendar import Calendar, CalendarTypes
 from ...utils.calendar import BusDayAdjustTypes, DateGenRuleTypes
@@ -18,8 +18,11 @@ from ...utils.global_vars import gDaysInYear
 from ...utils.math import ONE_MILLION
 from ...utils.helpers import label_to_string, table_to_string
 from ...market.curves.interpolator import InterpTypes, _uinterpolate
+from ...market.curves.interpolator import _fit_coeffs, _uinterpolate_coeffs
+from ...market.curves.interpolator import _ro_float64_2d
 
 from ...utils.helpers import check_argument_types
+from ...utils.schedule import gScheduleCache
 
 useFlatHazardRateIntegral = True
 standard_recovery_rate = 0.40
@@ -33,20 +36,46 @@ glob_num_steps_per_year = 25
 ###############################################################################
 
 
-@njit(float64[:](float64, float64, float64[:], float64[:], float64[:],
-                 float64[:], float64[:], float64[:], int64),
+def _ibor_curve_coeffs(libor_curve):
+    """ Coefficient array of the Ibor curve and the value of its interpolation
+    scheme so that the NUMBA code below interpolates the curve exactly as the
+    curve itself does, including for the cubic schemes. The coefficients
+    already fitted by the interpolator of the curve are reused. They are only
+    fitted here for a curve which has no interpolator. """
+
+    interpolator = getattr(libor_curve, "_interpolator", None)
+
+    if interpolator is not None and interpolator._coeffs is not None:
+        return interpolator._coeffs, interpolator._interp_type.value
+
+    interp_type = getattr(libor_curve, "_interp_type",
+                          InterpTypes.FLAT_FWD_RATES)
+
+    coeffs = _fit_coeffs(np.asarray(libor_curve._times, dtype=np.float64),
+                         np.asarray(libor_curve._dfs, dtype=np.float64),
+                         interp_type.value)
+
+    return coeffs, interp_type.value
+
+###############################################################################
+
+
+@njit(float64[:](float64, float64, float64[:], float64[:], _ro_float64_2d,
+                 int64, float64[:], float64[:], int64),
       fastmath=True, cache=True)
 def _risky_pv01_numba(teff,
                       accrual_factorPCDToNow,
                       paymentTimes,
                       year_fracs,
-                      npIborTimes,
-                      npIborValues,
+                      npIborCoeffs,
+                      ibor_method,
                       npSurvTimes,
                       npSurvValues,
                       pv01_method):
     """ Fast calculation of the risky PV01 of a CDS using NUMBA.
-    The output is a numpy array of the full and clean risky PV01."""
+    The output is a numpy array of the full and clean risky PV01. The Ibor
+    curve is passed as a coefficient array built by _fit_coeffs together
+    with the value of its interpolation scheme. """
 
     method = InterpTypes.FLAT_FWD_RATES.value
 
@@ -71,7 +100,7 @@ def _risky_pv01_numba(teff,
     # taking into account what coupon has already accrued and what has not
     qeff = _uinterpolate(teff, npSurvTimes, npSurvValues, method)
     q1 = _uinterpolate(tncd, npSurvTimes, npSurvValues, method)
-    z1 = _uinterpolate(tncd, npIborTimes, npIborValues, method)
+    z1 = _uinterpolate_coeffs(tncd, npIborCoeffs, ibor_method)
 
     # this is the part of the coupon accrued from previous coupon date to now
     # accrual_factorPCDToNow = day_count.year_frac(pcd,teff)
@@ -95,7 +124,7 @@ def _risky_pv01_numba(teff,
         t2 = paymentTimes[it]
 
         q2 = _uinterpolate(t2, npSurvTimes, npSurvValues, method)
-        z2 = _uinterpolate(t2, npIborTimes, npIborValues, method)
+        z2 = _uinterpolate_coeffs(t2, npIborCoeffs, ibor_method)
 
         accrual_factor = year_fracs[it]
 
@@ -131,12 +160,12 @@ def _risky_pv01_numba(teff,
 ###############################################################################
 
 
-@njit(float64(float64, float64, float64[:], float64[:], float64[:], float64[:],
-              float64, int64, int64), fastmath=True, cache=True)
+@njit(float64(float64, float64, _ro_float64_2d, int64, float64[:],
+              float64[:], float64, int64, int64), fastmath=True, cache=True)
 def _protection_leg_pv_numba(teff,
                              tmat,
-                             npIborTimes,
-                             npIborValues,
+                             npIborCoeffs,
+                             ibor_method,
                              npSurvTimes,
                              npSurvValues,
                              contract_recovery_rate,
@@ -151,7 +180,7 @@ def _protection_leg_pv_numba(teff,
     dt = (tmat - teff) / num_steps
 
     t = teff
-    z1 = _uinterpolate(t, npIborTimes, npIborValues, method)
+    z1 = _uinterpolate_coeffs(t, npIborCoeffs, ibor_method)
     q1 = _uinterpolate(t, npSurvTimes, npSurvValues, method)
 
     prot_pv = 0.0
@@ -161,7 +190,7 @@ def _protection_leg_pv_numba(teff,
 
         for _ in range(0, num_steps):
             t = t + dt
-            z2 = _uinterpolate(t, npIborTimes, npIborValues, method)
+            z2 = _uinterpolate_coeffs(t, npIborCoeffs, ibor_method)
             q2 = _uinterpolate(t, npSurvTimes, npSurvValues, method)
             # This needs to be updated to handle small h+r
             h12 = -log(q2 / q1) / dt
@@ -177,7 +206,7 @@ def _protection_leg_pv_numba(teff,
 
         for _ in range(0, num_steps):
             t += dt
-            z2 = _uinterpolate(t, npIborTimes, npIborValues, method)
+            z2 = _uinterpolate_coeffs(t, npIborCoeffs, ibor_method)
             q2 = _uinterpolate(t, npSurvTimes, npSurvValues, method)
             dq = q1 - q2
             dprot_pv = 0.5 * (z1 + z2) * dq
@@ -242,7 +271,40 @@ class CDS:
     ###########################################################################
 
     def _generate_adjusted_cds_payment_dates(self):
-        """ Generate CDS payment dates which have been holiday adjusted."""
+        """ Generate CDS payment dates which have been holiday adjusted. The
+        dates are taken from the schedule cache if a CDS with the same terms
+        has already been generated, as for the many names in a book which
+        trade to the same IMM dates. """
+
+        key = ("CDS",
+               self._step_in_date,
+               self._maturity_date,
+               self._freq_type,
+               self._cal_type,
+               self._bd_type,
+               self._dg_type)
+
+        entry = gScheduleCache.get(key)
+
+        if entry is None:
+            self._generate_cds_dates()
+            entry = (tuple([intern_date(dt) for dt in self._payment_dates]),
+                     tuple([intern_date(dt)
+                            for dt in self._accrual_start_dates]),
+                     tuple([intern_date(dt)
+                            for dt in self._accrual_end_dates]))
+            gScheduleCache.put(key, entry)
+
+        # The dates are shared with the cache but the lists are copies so
+        # that the cached schedule cannot be modified through them
+        self._payment_dates = list(entry[0])
+        self._accrual_start_dates = list(entry[1])
+        self._accrual_end_dates = list(entry[2])
+
+    ###########################################################################
+
+    def _generate_cds_dates(self):
+        """ Generate the CDS payment and accrual dates from the CDS terms. """
 
         frequency = annual_frequency(self._freq_type)
         calendar = Calendar(self._cal_type)
@@ -583,11 +645,12 @@ class CDS:
         tmat = (self._maturity_date - value_date) / gDaysInYear
 
         libor_curve = issuer_curve._libor_curve
+        ibor_coeffs, ibor_method = _ibor_curve_coeffs(libor_curve)
 
         v = _protection_leg_pv_numba(teff,
                                      tmat,
-                                     libor_curve._times,
-                                     libor_curve._dfs,
+                                     ibor_coeffs,
+                                     ibor_method,
                                      issuer_curve._times,
                                      issuer_curve._values,
                                      contract_recovery_rate,
@@ -625,12 +688,14 @@ class CDS:
         year_fracs = self._accrual_factors
         teff = (eff - value_date) / gDaysInYear
 
+        ibor_coeffs, ibor_method = _ibor_curve_coeffs(libor_curve)
+
         valueRPV01 = _risky_pv01_numba(teff,
                                        accrual_factorPCDToNow,
                                        np.array(paymentTimes),
                                        np.array(year_fracs),
-                                       libor_curve._times,
-                                       libor_curve._dfs,
+                                       ibor_coeffs,
+                                       ibor_method,
                                        issuer_curve._times,
                                        issuer_curve._values,
                                        pv01_method)
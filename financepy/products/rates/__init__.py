@@ -13,3 +13,5 @@ from .ibor_single_curve import *
 from .dual_curve import *
 from .swap_fixed_leg import *
 from .swap_float_leg import *
+from .curve_risk import *
+from .curve_history import *
@@ -0,0 +1,133 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from ...utils.error import FinError
+from ...market.curves.interpolator import InterpTypes
+
+from .ibor_single_curve import IborSingleCurve
+from .ois_curve import OISCurve
+
+###############################################################################
+
+
+def _build_curve(curve_type, value_date, depos, fras, swaps, interp_type,
+                 global_solve, initial_dfs):
+    """ Build one IborSingleCurve or OISCurve. """
+
+    if curve_type is IborSingleCurve:
+        return IborSingleCurve(value_date, depos, fras, swaps, interp_type,
+                               global_solve=global_solve,
+                               initial_dfs=initial_dfs)
+    else:
+        return OISCurve(value_date, depos, fras, swaps, interp_type,
+                        initial_dfs=initial_dfs)
+
+###############################################################################
+
+
+def _build_history_chunk(args):
+    """ Build the curves for a run of consecutive dates in order. Each curve
+    is warm started from the grid discount factors of the curve of the
+    previous date. If these do not fit the pillars of the new curve, which
+    can happen even when the numbers of instruments are unchanged as a
+    synthetic deposit is added when the deposits start after the valuation
+    date, the curve is built from a cold start. Returns lists of the grid
+    times and grid discount factors of each curve without the valuation date
+    pillar. """
+
+    (curve_type, value_dates, quotes, build_instruments, interp_type,
+     global_solve) = args
+
+    all_times = []
+    all_dfs = []
+    initial_dfs = None
+
+    for value_date, quote_vector in zip(value_dates, quotes):
+
+        depos, fras, swaps = build_instruments(value_date, quote_vector)
+
+        try:
+            curve = _build_curve(curve_type, value_date, depos, fras, swaps,
+                                 interp_type, global_solve, initial_dfs)
+        except FinError:
+            if initial_dfs is None:
+                raise
+            depos, fras, swaps = build_instruments(value_date, quote_vector)
+            curve = _build_curve(curve_type, value_date, depos, fras, swaps,
+                                 interp_type, global_solve, None)
+
+        initial_dfs = curve._dfs[1:].copy()
+        all_times.append(np.array(curve._times[1:]))
+        all_dfs.append(initial_dfs)
+
+    return all_times, all_dfs
+
+###############################################################################
+
+
+def build_curve_history(curve_type: type,
+                        value_dates: list,
+                        quotes: (list, np.ndarray),
+                        build_instruments,
+                        interp_type: InterpTypes = InterpTypes.FLAT_FWD_RATES,
+                        num_processes: int = 1,
+                        global_solve: bool = False):
+    """ Build an IborSingleCurve or OISCurve for each of a list of valuation
+    dates from a dates x quotes array of market quotes. The function
+    build_instruments(value_date, quote_vector) must return the deposits,
+    FRAs and swaps of one date as a tuple of three lists. The solve of each
+    date is warm started from the discount factors of the previous date. The
+    dates are split into num_processes runs of consecutive dates which are
+    built in parallel in separate processes, so build_instruments must be a
+    module level function that can be pickled. Returns the grid times and the
+    grid discount factors of the curves as two dates x pillars arrays which
+    exclude the valuation date pillar. Every date must have the same number
+    of calibration instruments. """
+
+    if curve_type is not IborSingleCurve and curve_type is not OISCurve:
+        raise FinError("Curve type must be IborSingleCurve or OISCurve.")
+
+    if curve_type is OISCurve and global_solve is True:
+        raise FinError("OISCurve does not have a global solver.")
+
+    if len(value_dates) == 0:
+        raise FinError("No valuation dates.")
+
+    if len(value_dates) != len(quotes):
+        raise FinError("Need one quote vector per valuation date.")
+
+    if num_processes < 1:
+        raise FinError("Number of processes must be at least one.")
+
+    num_processes = min(num_processes, len(value_dates))
+    chunks = np.array_split(np.arange(len(value_dates)), num_processes)
+
+    args = [(curve_type,
+             [value_dates[i] for i in chunk],
+             [quotes[i] for i in chunk],
+             build_instruments,
+             interp_type,
+             global_solve) for chunk in chunks]
+
+    if num_processes == 1:
+        results = [_build_history_chunk(args[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=num_processes) as executor:
+            results = list(executor.map(_build_history_chunk, args))
+
+    all_times = [t for chunk_times, _ in results for t in chunk_times]
+    all_dfs = [df for _, chunk_dfs in results for df in chunk_dfs]
+
+    num_pillars = len(all_dfs[0])
+    for dfs in all_dfs:
+        if len(dfs) != num_pillars:
+            raise FinError("Number of pillars is not the same on all dates.")
+
+    return np.array(all_times), np.array(all_dfs)
+
+###############################################################################
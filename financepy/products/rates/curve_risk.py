@@ -0,0 +1,209 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+
+from ...utils.error import FinError
+from ...utils.date import Date
+from ...utils.day_count import DayCount, DayCountTypes
+from ...utils.global_types import SwapTypes
+from ...utils.helpers import times_from_dates
+from ...market.curves.interpolator import _df_jacobian
+from ...market.curves.discount_curve import DiscountCurve
+
+from .ibor_deposit import IborDeposit
+from .ibor_fra import IborFRA
+from .ibor_swap import IborSwap
+from .ois import OIS
+
+###############################################################################
+
+
+def _fixed_leg_annuity(fixed_leg, value_date, curve):
+    """ Returns the derivative of the value of a fixed leg with respect to
+    its coupon. This is the PV of the accrual factors times the notional and
+    is negative for a paying leg. """
+
+    dates = [dt for dt in fixed_leg._payment_dates if dt > value_date]
+
+    if len(dates) == 0:
+        return 0.0
+
+    year_fracs = [yf for dt, yf in zip(fixed_leg._payment_dates,
+                                       fixed_leg._year_fracs)
+                  if dt > value_date]
+
+    dfs = curve.df(dates) / curve.df(value_date)
+    annuity = np.dot(year_fracs, dfs) * fixed_leg._notional
+
+    if fixed_leg._leg_type == SwapTypes.PAY:
+        annuity = -annuity
+
+    return annuity
+
+###############################################################################
+
+
+def _instrument_df_sensitivities(instrument, value_date, curve):
+    """ Returns the value of an instrument when the curve is used for both
+    discounting and the index, the notional, a list of dates with the
+    derivatives of the value with respect to the discount factors on these
+    dates and the derivative of the value with respect to the quoted rate of
+    the instrument. A date may appear more than once in which case the
+    derivatives add. """
+
+    if isinstance(instrument, IborDeposit):
+
+        depo = instrument
+        notional = depo._notional
+        dc = DayCount(depo._dc_type)
+        acc_factor = dc.year_frac(depo._start_date, depo._maturity_date)[0]
+        df_settle = curve.df(depo._start_date)
+        df_maturity = curve.df(depo._maturity_date)
+        flow = (1.0 + acc_factor * depo._deposit_rate) * notional
+        value = flow * df_maturity / df_settle
+        dates = [depo._start_date, depo._maturity_date]
+        grads = np.array([-value / df_settle, flow / df_settle])
+        rate_grad = acc_factor * notional * df_maturity / df_settle
+
+    elif isinstance(instrument, IborFRA):
+
+        fra = instrument
+        notional = fra._notional
+        dc = DayCount(fra._dc_type)
+        acc_factor = dc.year_frac(fra._start_date, fra._maturity_date)[0]
+        df1 = curve.df(fra._start_date)
+        df2 = curve.df(fra._maturity_date)
+        df_value = curve.df(value_date)
+        sign = -1.0 if fra._payFixedRate is True else 1.0
+        flow = 1.0 + acc_factor * fra._fraRate
+        value = sign * notional * (df1 - df2 * flow) / df_value
+        dates = [fra._start_date, fra._maturity_date, value_date]
+        grads = np.array([sign * notional / df_value,
+                          -sign * notional * flow / df_value,
+                          -value / df_value])
+        rate_grad = -sign * notional * acc_factor * df2 / df_value
+
+    elif isinstance(instrument, IborSwap):
+
+        swap = instrument
+        notional = swap._fixed_leg._notional
+        value, disc_dates, disc_grads, index_dates, index_grads = \
+            swap.df_sensitivities(value_date, curve, curve, None)
+        dates = disc_dates + index_dates
+        grads = np.concatenate((disc_grads, index_grads))
+        rate_grad = _fixed_leg_annuity(swap._fixed_leg, value_date, curve)
+
+    elif isinstance(instrument, OIS):
+
+        swap = instrument
+        notional = swap._fixed_leg._notional
+        value, dates, grads = swap.df_sensitivities(value_date, curve, None)
+        rate_grad = _fixed_leg_annuity(swap._fixed_leg, value_date, curve)
+
+    else:
+        raise FinError("Instrument type " + type(instrument).__name__
+                       + " is not supported.")
+
+    return value, notional, dates, grads, rate_grad
+
+###############################################################################
+
+
+def _pillar_sensitivities(instruments, value_date, curve):
+    """ Returns the values, notionals and quoted rate derivatives of a list
+    of instruments together with the matrix of derivatives of their values
+    with respect to the grid discount factors of the curve. The derivatives
+    with respect to the discount factors on the cash flow dates are chained
+    through the derivatives of the interpolated discount factors with respect
+    to the grid discount factors. All of the dates are converted and
+    interpolated in a single call. """
+
+    num_instruments = len(instruments)
+    values = np.zeros(num_instruments)
+    notionals = np.zeros(num_instruments)
+    rate_grads = np.zeros(num_instruments)
+    all_dates = []
+    all_grads = []
+
+    for i, instrument in enumerate(instruments):
+        values[i], notionals[i], dates, grads, rate_grads[i] = \
+            _instrument_df_sensitivities(instrument, value_date, curve)
+        all_dates.append(dates)
+        all_grads.append(grads)
+
+    dates = [dt for inst_dates in all_dates for dt in inst_dates]
+    times = times_from_dates(dates, curve._value_date,
+                             DayCountTypes.ACT_ACT_ISDA)
+    df_grads = _df_jacobian(np.asarray(times, dtype=np.float64),
+                            np.asarray(curve._times, dtype=np.float64),
+                            np.asarray(curve._dfs, dtype=np.float64),
+                            curve._interp_type.value)
+
+    pillar_grads = np.zeros((num_instruments, len(curve._times)))
+
+    start = 0
+    for i in range(0, num_instruments):
+        end = start + len(all_dates[i])
+        pillar_grads[i] = all_grads[i] @ df_grads[start:end]
+        start = end
+
+    return values, notionals, pillar_grads, rate_grads
+
+###############################################################################
+
+
+def _calibration_jacobian(curve):
+    """ Returns the residuals of the calibration instruments of a curve built
+    from deposits, FRAs and swaps, which are their values per unit notional
+    less one for deposits, the matrix of derivatives of the residuals with
+    respect to the grid discount factors and the derivatives of the residuals
+    with respect to the quoted rates. The column of the valuation date is
+    dropped as its discount factor is fixed at one. """
+
+    instruments = list(curve._usedDeposits) + list(curve._usedFRAs) + \
+        list(curve._usedSwaps)
+
+    values, notionals, pillar_grads, rate_grads = \
+        _pillar_sensitivities(instruments, curve._value_date, curve)
+
+    residuals = values / notionals
+    residuals[0:len(curve._usedDeposits)] -= 1.0
+    jac = pillar_grads[:, 1:] / notionals.reshape(-1, 1)
+
+    return residuals, jac, rate_grads / notionals
+
+###############################################################################
+
+
+def bucketed_par_dv01(trades: list,
+                      value_date: Date,
+                      curve: DiscountCurve):
+    """ Calculate the change in value of each of a list of IborSwap and OIS
+    trades for a one basis point rise in the quoted rate of each of the
+    calibration instruments of an IborSingleCurve or OISCurve. The curve is
+    used for both discounting and the index. The derivatives of the trades
+    with respect to the grid discount factors are chained through the inverse
+    of the Jacobian of the calibration instruments so no curve is rebuilt and
+    no trade is revalued. Returns a trades x calibration instruments array in
+    which the instruments are in the order deposits, FRAs and swaps. Summing
+    over the trades gives the bucketed par DV01 of the portfolio. The curve
+    must refit all of its calibration instruments, which for the non-local
+    cubic interpolation schemes means building it with the global solver. """
+
+    if len(trades) == 0:
+        raise FinError("No trades.")
+
+    # The Jacobian and quote derivatives are calculated once per curve
+    jac, quote_grads = curve._calibration_derivatives()
+
+    _, _, pillar_grads, _ = _pillar_sensitivities(trades, value_date, curve)
+
+    # dV/dq = - dV/dD J^-1 dR/dq which needs one solve for all trades
+    weights = np.linalg.solve(jac.T, pillar_grads[:, 1:].T).T
+    dv01 = -weights * quote_grads * 0.0001
+
+    return dv01
+
+###############################################################################
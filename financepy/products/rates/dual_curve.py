@@ -4,18 +4,26 @@
 
 import numpy as np
 from scipy import optimize
+from typing import Optional
 import copy
 
 from ...utils.error import FinError
 from ...utils.date import Date
-from ...utils.helpers import label_to_string
+from ...utils.day_count import DayCount, DayCountTypes
+from ...utils.helpers import label_to_string, times_from_dates
 from ...utils.helpers import check_argument_types, _func_name
 from ...utils.global_vars import gDaysInYear
 from ...market.curves.interpolator import InterpTypes, Interpolator
+from ...market.curves.interpolator import _df_jacobian
 from ...market.curves.discount_curve import DiscountCurve
 from ...products.rates.ibor_deposit import IborDeposit
 from ...products.rates.ibor_fra import IborFRA
 from ...products.rates.ibor_swap import IborSwap
+from ...products.rates.ibor_basis_swap import IborBasisSwap
+from ...products.rates.ois_basis_swap import OISBasisSwap
+from ...products.rates.ois_curve import OISCurve
+from ...products.rates.curve_risk import _instrument_df_sensitivities
+from ...products.rates.curve_risk import _calibration_jacobian
 
 swaptol = 1e-10
 
@@ -24,6 +32,51 @@ swaptol = 1e-10
 ###############################################################################
 
 
+def _index_leg(swap):
+    """ Returns the leg of a calibration swap whose index is the curve being
+    built. This is the floating leg of an IborSwap, the first leg of an
+    IborBasisSwap and the Ibor leg of an OISBasisSwap. """
+
+    if isinstance(swap, IborSwap):
+        return swap._float_leg
+    elif isinstance(swap, IborBasisSwap):
+        return swap._floatLeg1
+    elif isinstance(swap, OISBasisSwap):
+        return swap._floatIborLeg
+
+    raise FinError("Swap is not of type IborSwap, IborBasisSwap or "
+                   "OISBasisSwap")
+
+###############################################################################
+
+
+def _last_payment_date(swap):
+    """ Returns the last payment date of a calibration swap which is used as
+    its grid date. This is on the fixed leg of an IborSwap. """
+
+    if isinstance(swap, IborSwap):
+        return swap._fixed_leg._payment_dates[-1]
+
+    return _index_leg(swap)._payment_dates[-1]
+
+###############################################################################
+
+
+def _swap_value(swap, value_date, discount_curve, index_curve, basis_curve):
+    """ Value a calibration swap per unit notional. The other leg of a basis
+    swap is indexed to the basis curve. """
+
+    if isinstance(swap, IborSwap):
+        v_swap = swap.value(value_date, discount_curve, index_curve, None)
+    else:
+        v_swap = swap.value(value_date, discount_curve, index_curve,
+                            basis_curve)
+
+    return v_swap / _index_leg(swap)._notional
+
+###############################################################################
+
+
 def _f(df, *args):
     """ Root search objective function for swaps """
     discount_curve = args[0]
@@ -36,11 +89,8 @@ def _f(df, *args):
 
     # For discount that need a fit function, we fit it now
     index_curve._interpolator.fit(index_curve._times, index_curve._dfs)
-    v_swap = swap.value(value_date, discount_curve, index_curve, None)
-
-    notional = swap._fixed_leg._notional
-    v_swap /= notional
-    return v_swap
+    return _swap_value(swap, value_date, discount_curve, index_curve,
+                       index_curve._basis_curve)
 
 ###############################################################################
 
@@ -64,10 +114,94 @@ def _g(df, *args):
 ###############################################################################
 
 
+def _dual_df_sensitivities(instrument, index_curve):
+    """ Returns the value of a calibration instrument of an index curve on
+    the curve valuation date, its notional and a list of the curves that it
+    depends on. Each entry holds the curve, a list of dates and the
+    derivatives of the value with respect to the discount factors of the
+    curve on these dates. A date may appear more than once in which case the
+    derivatives add. """
+
+    value_date = index_curve._value_date
+    discount_curve = index_curve._discount_curve
+    basis_curve = index_curve._basis_curve
+
+    if basis_curve is None:
+        basis_curve = discount_curve
+
+    if isinstance(instrument, IborDeposit):
+
+        value, notional, dates, grads, _ = \
+            _instrument_df_sensitivities(instrument, value_date, index_curve)
+        return value, notional, [(index_curve, dates, grads)]
+
+    elif isinstance(instrument, IborFRA):
+
+        fra = instrument
+        notional = fra._notional
+        dc = DayCount(fra._dc_type)
+        acc_factor = dc.year_frac(fra._start_date, fra._maturity_date)[0]
+        df_index1 = index_curve.df(fra._start_date)
+        df_index2 = index_curve.df(fra._maturity_date)
+        df_discount2 = discount_curve.df(fra._maturity_date)
+        df_value = discount_curve.df(value_date)
+        sign = -1.0 if fra._payFixedRate is True else 1.0
+        scale = sign * notional * df_discount2 / df_value
+        value = scale * (df_index1 / df_index2 - 1.0 - acc_factor *
+                         fra._fraRate)
+        index_grads = np.array([scale / df_index2,
+                                -scale * df_index1 / df_index2**2])
+        discount_grads = np.array([value / df_discount2, -value / df_value])
+        return value, notional, [(index_curve,
+                                  [fra._start_date, fra._maturity_date],
+                                  index_grads),
+                                 (discount_curve,
+                                  [fra._maturity_date, value_date],
+                                  discount_grads)]
+
+    elif isinstance(instrument, IborSwap):
+
+        swap = instrument
+        value, disc_dates, disc_grads, index_dates, index_grads = \
+            swap.df_sensitivities(value_date, discount_curve, index_curve)
+        return value, swap._fixed_leg._notional, \
+            [(discount_curve, disc_dates, disc_grads),
+             (index_curve, index_dates, index_grads)]
+
+    index_leg = _index_leg(instrument)
+
+    if isinstance(instrument, IborBasisSwap):
+        basis_leg = instrument._floatLeg2
+    else:
+        basis_leg = instrument._floatOISLeg
+
+    value1, disc_dates1, disc_grads1, index_dates1, index_grads1 = \
+        index_leg.df_sensitivities(value_date, discount_curve, index_curve)
+
+    value2, disc_dates2, disc_grads2, index_dates2, index_grads2 = \
+        basis_leg.df_sensitivities(value_date, discount_curve, basis_curve)
+
+    return value1 + value2, index_leg._notional, \
+        [(discount_curve, disc_dates1 + disc_dates2,
+          np.concatenate((disc_grads1, disc_grads2))),
+         (index_curve, index_dates1, index_grads1),
+         (basis_curve, index_dates2, index_grads2)]
+
+###############################################################################
+
+
 class IborDualCurve(DiscountCurve):
     """ Constructs an index curve as implied by the prices of Ibor
     deposits, FRAs and IRS. Discounting is assumed to be at a discount rate
-    that is an input and usually derived from OIS rates. """
+    that is an input and usually derived from OIS rates.
+
+    The swaps may also include Ibor-Ibor and Ibor-OIS basis swaps. The first
+    leg of an IborBasisSwap and the Ibor leg of an OISBasisSwap are indexed
+    to this curve and the other leg is indexed to a basis curve, such as the
+    curve of another Ibor tenor. The OIS leg of an OISBasisSwap is indexed
+    to the basis curve too so this must then be an OISCurve. An OIS discount
+    curve and several Ibor curves which depend on each other can then be
+    solved together using joint_solve. """
 
 ###############################################################################
 
@@ -78,7 +212,9 @@ class IborDualCurve(DiscountCurve):
                  ibor_fras: list,
                  ibor_swaps: list,
                  interp_type: InterpTypes = InterpTypes.FLAT_FWD_RATES,
-                 check_refit: bool = False):  # Set to True to test it works
+                 check_refit: bool = False,  # Set to True to test it works
+                 basis_curve: Optional[DiscountCurve] = None,
+                 bootstrap: bool = True):
         """ Create an instance of a Ibor curve given a valuation date and
         a set of ibor deposits, ibor FRAs and ibor_swaps. Some of these may
         be left None and the algorithm will just use what is provided. An
@@ -87,15 +223,34 @@ class IborDualCurve(DiscountCurve):
         flat forwards between these coupon dates.
 
         The curve will assign a discount factor of 1.0 to the valuation date.
+        The basis curve is the index curve of the other leg of any basis
+        swaps. If it is None then the discount curve is used. It must be an
+        OISCurve if there are any OISBasisSwaps.
+
+        If bootstrap is False the grid discount factors are only seeded from
+        the quotes of the instruments and the curve must then be solved using
+        joint_solve. Curves which depend on each other can then be created in
+        any order.
         """
 
         check_argument_types(getattr(self, _func_name(), None), locals())
 
         self._value_date = value_date
         self._discount_curve = discount_curve
+        self._basis_curve = basis_curve
         self._validate_inputs(ibor_deposits, ibor_fras, ibor_swaps)
+
+        if basis_curve is not None and isinstance(basis_curve, OISCurve) is \
+                False:
+            for swap in self._usedSwaps:
+                if isinstance(swap, OISBasisSwap):
+                    raise FinError("Basis curve must be an OISCurve as it "
+                                   "is the index of the OIS leg of an "
+                                   "OISBasisSwap")
+
         self._interp_type = interp_type
         self._check_refit = check_refit
+        self._bootstrap = bootstrap
         self._build_curve()
 
 ###############################################################################
@@ -103,7 +258,47 @@ class IborDualCurve(DiscountCurve):
     def _build_curve(self):
         """ Build curve based on interpolation. """
 
-        self._build_curve_using_1d_solver()
+        if self._bootstrap is True:
+            self._build_curve_using_1d_solver()
+        else:
+            self._build_curve_from_quotes()
+
+###############################################################################
+
+    def _build_curve_from_quotes(self):
+        """ Set the grid discount factors from the quotes of the instruments
+        without any solve as the starting point of joint_solve. Deposits,
+        FRAs and IborSwaps give a flat curve at their quoted rate out to their
+        maturity. Basis swaps quote a spread so the discount factor of the
+        discount curve is used at their maturity. """
+
+        self._interpolator = Interpolator(self._interp_type)
+
+        grid_times = [0.0]
+        grid_dfs = [1.0]
+
+        for depo in self._usedDeposits:
+            tmat = (depo._maturity_date - self._value_date) / gDaysInYear
+            grid_times.append(tmat)
+            grid_dfs.append(np.exp(-depo._deposit_rate * tmat))
+
+        for fra in self._usedFRAs:
+            tmat = (fra._maturity_date - self._value_date) / gDaysInYear
+            grid_times.append(tmat)
+            grid_dfs.append(np.exp(-fra._fraRate * tmat))
+
+        for swap in self._usedSwaps:
+            maturity_date = _last_payment_date(swap)
+            tmat = (maturity_date - self._value_date) / gDaysInYear
+            grid_times.append(tmat)
+            if isinstance(swap, IborSwap):
+                grid_dfs.append(np.exp(-swap._fixed_leg._cpn * tmat))
+            else:
+                grid_dfs.append(self._discount_curve.df(maturity_date))
+
+        self._times = np.array(grid_times)
+        self._dfs = np.array(grid_dfs, dtype=np.float64)
+        self._interpolator.fit(self._times, self._dfs)
 
 ###############################################################################
 
@@ -187,8 +382,10 @@ class IborDualCurve(DiscountCurve):
 
             for swap in ibor_swaps:
 
-                if isinstance(swap, IborSwap) is False:
-                    raise FinError("Swap is not of type IborSwap")
+                if isinstance(swap, (IborSwap, IborBasisSwap,
+                                     OISBasisSwap)) is False:
+                    raise FinError("Swap is not of type IborSwap, "
+                                   "IborBasisSwap or OISBasisSwap")
 
                 startDt = swap._effective_date
                 if startDt < self._value_date:
@@ -215,9 +412,12 @@ class IborDualCurve(DiscountCurve):
                 prev_dt = next_dt
 
             # Swaps must have same cash flows for bootstrap to work
-            longestSwap = ibor_swaps[-1]
-            longestSwapCpnDates = longestSwap._fixed_leg._payment_dates
-            for swap in ibor_swaps[0:-1]:
+            fixed_swaps = [swap for swap in ibor_swaps
+                           if isinstance(swap, IborSwap)]
+            if len(fixed_swaps) > 0:
+                longestSwap = fixed_swaps[-1]
+                longestSwapCpnDates = longestSwap._fixed_leg._payment_dates
+            for swap in fixed_swaps[0:-1]:
                 swapCpnDates = swap._fixed_leg._payment_dates
                 num_flows = len(swapCpnDates)
                 for iFlow in range(0, num_flows):
@@ -278,7 +478,7 @@ class IborDualCurve(DiscountCurve):
 
         # Need the floating leg basis for the curve
         if len(self._usedSwaps) > 0:
-            self._dc_type = ibor_swaps[0]._float_leg._dc_type
+            self._dc_type = _index_leg(ibor_swaps[0])._dc_type
         else:
             self._dc_type = None
 
@@ -338,7 +538,7 @@ class IborDualCurve(DiscountCurve):
         for swap in self._usedSwaps:
             # I use the lastPaymentDate in case a date has been adjusted fwd
             # over a holiday as the maturity date is usually not adjusted CHECK
-            maturity_date = swap._fixed_leg._payment_dates[-1]
+            maturity_date = _last_payment_date(swap)
             tmat = (maturity_date - self._value_date) / gDaysInYear
 
             self._times = np.append(self._times, tmat)
@@ -515,9 +715,8 @@ class IborDualCurve(DiscountCurve):
 
         for swap in self._usedSwaps:
             # We value it as of the start date of the swap
-            v = swap.value(swap._effective_date, self._discount_curve,
-                           self, None)
-            v = v / swap._fixed_leg._notional
+            v = _swap_value(swap, swap._effective_date,
+                            self._discount_curve, self, self._basis_curve)
             if abs(v) > swapTol:
                 print("Swap with maturity " + str(swap._maturity_date)
                       + " Not Repriced. Has Value", v)
@@ -562,3 +761,125 @@ class IborDualCurve(DiscountCurve):
         print(self)
 
 ###############################################################################
+
+
+def joint_solve(discount_curve: DiscountCurve,
+                index_curves: list,
+                max_iter: int = 50):
+    """ Solve for the grid discount factors of a discount curve, such as an
+    OISCurve, and of a list of IborDualCurves together. Each index curve may
+    be discounted on the discount curve and its basis swaps may be indexed
+    to other curves in the list. The discount factors of the curves are the
+    starting point for a Newton-Raphson which uses the block Jacobian of all
+    of the calibration instruments with respect to the grid discount factors
+    of all of the curves. The index curves need not be bootstrapped first as
+    they can be created with bootstrap set to False, which seeds them from
+    the quotes of their instruments. Any curve
+    which an instrument depends on but which is not in the list is held
+    fixed. The curves are updated in place. This refits the market exactly
+    for any interpolation scheme, including the non-local cubic splines for
+    which a sequential bootstrap does not.
+
+    Returns the Jacobian of the calibration instrument values per unit
+    notional with respect to the grid discount factors, excluding the one at
+    each valuation date. The rows are the instruments of the discount curve
+    followed by those of each index curve and the columns are the grid
+    points of each curve in the same order. The off-diagonal blocks hold the
+    cross-curve sensitivities. """
+
+    curves = [discount_curve] + list(index_curves)
+
+    offsets = [0]
+    for curve in curves:
+        offsets.append(offsets[-1] + len(curve._times) - 1)
+
+    for _ in range(0, max_iter):
+
+        residuals, jac = _joint_calibration_jacobian(curves, offsets)
+
+        if np.max(np.abs(residuals)) < swaptol:
+            return jac
+
+        step = np.linalg.solve(jac, -residuals)
+
+        for k, curve in enumerate(curves):
+            curve._dfs = curve._dfs.copy()
+            curve._dfs[1:] += step[offsets[k]:offsets[k + 1]]
+            curve._interpolator.fit(curve._times, curve._dfs)
+
+    raise FinError("Joint curve solve did not converge.")
+
+###############################################################################
+
+
+def _joint_calibration_jacobian(curves, offsets):
+    """ Returns the residuals of the calibration instruments of a discount
+    curve followed by a list of index curves together with their block
+    Jacobian with respect to the grid discount factors of all of the curves.
+    The dates of each curve are converted and interpolated in one call. """
+
+    discount_curve = curves[0]
+    curve_index = {id(curve): k for k, curve in enumerate(curves)}
+
+    discount_residuals, discount_jac, _ = \
+        _calibration_jacobian(discount_curve)
+
+    residuals = list(discount_residuals)
+    num_instruments = len(residuals)
+
+    # For each curve the rows, dates and derivatives of every instrument
+    curve_rows = [[] for _ in curves]
+    curve_dates = [[] for _ in curves]
+    curve_grads = [[] for _ in curves]
+
+    for curve in curves[1:]:
+
+        instruments = list(curve._usedDeposits) + list(curve._usedFRAs) + \
+            list(curve._usedSwaps)
+
+        for i, instrument in enumerate(instruments):
+
+            value, notional, blocks = \
+                _dual_df_sensitivities(instrument, curve)
+
+            residual = value / notional
+            if i < len(curve._usedDeposits):
+                residual -= 1.0
+
+            residuals.append(residual)
+
+            for block_curve, dates, grads in blocks:
+                k = curve_index.get(id(block_curve))
+                if k is not None and len(dates) > 0:
+                    curve_rows[k].append(num_instruments)
+                    curve_dates[k].append(dates)
+                    curve_grads[k].append(np.asarray(grads) / notional)
+
+            num_instruments += 1
+
+    jac = np.zeros((num_instruments, offsets[-1]))
+    jac[0:len(discount_residuals), offsets[0]:offsets[1]] = discount_jac
+
+    for k, curve in enumerate(curves):
+
+        if len(curve_rows[k]) == 0:
+            continue
+
+        dates = [dt for block_dates in curve_dates[k] for dt in block_dates]
+        times = times_from_dates(dates, curve._value_date,
+                                 DayCountTypes.ACT_ACT_ISDA)
+        df_grads = _df_jacobian(np.asarray(times, dtype=np.float64),
+                                np.asarray(curve._times, dtype=np.float64),
+                                np.asarray(curve._dfs, dtype=np.float64),
+                                curve._interp_type.value)
+
+        start = 0
+        for row, grads in zip(curve_rows[k], curve_grads[k]):
+            end = start + len(grads)
+            jac[row, offsets[k]:offsets[k + 1]] += \
+                grads @ df_grads[start:end, 1:]
+            start = end
+
+    return np.array(residuals), jac
+
+###############################################################################
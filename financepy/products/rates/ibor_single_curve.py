@@ -9,6 +9,7 @@ from scipy.interpolate import CubicSpline
 from scipy.interpolate import PchipInterpolator
 
 import copy
+from typing import Optional
 
 from ...utils.error import FinError
 from ...utils.date import Date
@@ -20,6 +21,7 @@ from ...market.curves.discount_curve import DiscountCurve
 from ...products.rates.ibor_deposit import IborDeposit
 from ...products.rates.ibor_fra import IborFRA
 from ...products.rates.ibor_swap import IborSwap
+from ...products.rates.curve_risk import _calibration_jacobian
 
 swaptol = 1e-10
 
@@ -137,7 +139,17 @@ class IborSingleCurve(DiscountCurve):
     dates. This approach is non-linear and so requires a solver. Consequently
     it is slower. Its advantage is that we can switch interpolation schemes
     to provide a smoother or other functional curve shape which may have a more
-    economically justifiable shape. However the root search makes it slower."""
+    economically justifiable shape. However the root search makes it slower.
+
+    3) The third solves for all of the grid discount factors at once using a
+    Newton-Raphson iteration with the Jacobian of the instrument values with
+    respect to the grid discount factors. This is analytic for all schemes
+    except PCHIP whose slope limiter is not linear in the grid values so its
+    derivatives are central differences of the refitted interpolator. This
+    refits the market exactly for any interpolation scheme, including the
+    non-local cubic splines for which a sequential bootstrap changes the fit
+    to earlier instruments. The Jacobian is kept for use in risk
+    calculations."""
 
 ###############################################################################
 
@@ -147,7 +159,9 @@ class IborSingleCurve(DiscountCurve):
                  ibor_fras: list,
                  ibor_swaps: list,
                  interp_type: InterpTypes = InterpTypes.FLAT_FWD_RATES,
-                 check_refit: bool = False):  # Set to True to test it works
+                 check_refit: bool = False,  # Set to True to test it works
+                 global_solve: bool = False,
+                 initial_dfs: Optional[np.ndarray] = None):
         """ Create an instance of a FinIbor curve given a valuation date and
         a set of ibor deposits, ibor FRAs and ibor_swaps. Some of these may
         be left None and the algorithm will just use what is provided. An
@@ -158,15 +172,38 @@ class IborSingleCurve(DiscountCurve):
         The curve will assign a discount factor of 1.0 to the valuation date.
         If no instrument is starting on the valuation date, the curve is then
         assumed to be flat out to the first instrument using its zero rate.
+
+        If global_solve is True all of the grid discount factors are solved
+        for together using a Newton-Raphson with the Jacobian of the
+        instrument values rather than by a sequential bootstrap. The Jacobian
+        is analytic except for the PCHIP schemes where central differences
+        are used.
+
+        The solver can be warm started by passing the grid discount factors
+        of a similar curve, such as that of the previous day, as initial_dfs.
+        There must be one per calibration instrument in the order deposits,
+        FRAs and swaps.
         """
 
         check_argument_types(getattr(self, _func_name(), None), locals())
 
         self._value_date = value_date
         self._validate_inputs(ibor_deposits, ibor_fras, ibor_swaps)
+
+        if initial_dfs is not None:
+            num_instruments = len(self._usedDeposits) + \
+                len(self._usedFRAs) + len(self._usedSwaps)
+            if len(initial_dfs) != num_instruments:
+                raise FinError("Need one initial discount factor per "
+                               "calibration instrument.")
+
         self._interp_type = interp_type
         self._check_refit = check_refit
+        self._global_solve = global_solve
+        self._initial_dfs = initial_dfs
         self._interpolator = None
+        self._jacobian = None
+        self._quote_grads = None
         self._build_curve()
 
 ###############################################################################
@@ -174,7 +211,10 @@ class IborSingleCurve(DiscountCurve):
     def _build_curve(self):
         """ Build curve based on interpolation. """
 
-        self._build_curve_using_1d_solver()
+        if self._global_solve is True:
+            self._build_curve_using_global_solver()
+        else:
+            self._build_curve_using_1d_solver()
 
 ###############################################################################
 
@@ -371,13 +411,32 @@ class IborSingleCurve(DiscountCurve):
         self._dfs = np.array([])
 
         # time zero is now.
-        tmat = 0.0
-        df_mat = 1.0
         self._times = np.append(self._times, 0.0)
-        self._dfs = np.append(self._dfs, df_mat)
+        self._dfs = np.append(self._dfs, 1.0)
         self._interpolator.fit(self._times, self._dfs)
 
-        for depo in self._usedDeposits:
+        self._bootstrap_from(0)
+
+        if self._check_refit is True:
+            self._check_refits(1e-10, swaptol, 1e-5)
+
+###############################################################################
+
+    def _bootstrap_from(self,
+                        start_index: int):
+        """ Solve for the discount factors of the instruments in the order
+        deposits, FRAs and swaps starting at the instrument with the start
+        index. Each instrument adds one grid point so the curve must already
+        hold the grid times and discount factors of the instruments before
+        it. These are left unchanged. """
+
+        num_depos = len(self._usedDeposits)
+        num_fras = len(self._usedFRAs)
+
+        tmat = self._times[-1]
+        df_mat = self._dfs[-1]
+
+        for depo in self._usedDeposits[start_index:]:
             dfSettle = self.df(depo._start_date)
             df_mat = depo._maturity_df() * dfSettle
             tmat = (depo._maturity_date - self._value_date) / gDaysInYear
@@ -385,9 +444,13 @@ class IborSingleCurve(DiscountCurve):
             self._dfs = np.append(self._dfs, df_mat)
             self._interpolator.fit(self._times, self._dfs)
 
-        oldtmat = tmat
+        oldtmat = 0.0
+        if num_depos > 0:
+            last_depo = self._usedDeposits[-1]
+            oldtmat = (last_depo._maturity_date - self._value_date) / \
+                gDaysInYear
 
-        for fra in self._usedFRAs:
+        for fra in self._usedFRAs[max(start_index - num_depos, 0):]:
 
             tset = (fra._start_date - self._value_date) / gDaysInYear
             tmat = (fra._maturity_date - self._value_date) / gDaysInYear
@@ -402,12 +465,15 @@ class IborSingleCurve(DiscountCurve):
             else:
                 self._times = np.append(self._times, tmat)
                 self._dfs = np.append(self._dfs, df_mat)
+                df_mat = self._initial_df(len(self._times) - 1, df_mat)
                 argtuple = (self, self._value_date, fra)
                 df_mat = optimize.newton(_g, x0=df_mat, fprime=None,
-                                        args=argtuple, tol=swaptol,
-                                        maxiter=50, fprime2=None)
+                                         args=argtuple, tol=swaptol,
+                                         maxiter=50, fprime2=None)
 
-        for swap in self._usedSwaps:
+        swap_start = max(start_index - num_depos - num_fras, 0)
+
+        for swap in self._usedSwaps[swap_start:]:
             # I use the lastPaymentDate in case a date has been adjusted fwd
             # over a holiday as the maturity date is usually not adjusted CHECK
             maturity_date = swap._fixed_leg._payment_dates[-1]
@@ -415,12 +481,180 @@ class IborSingleCurve(DiscountCurve):
 
             self._times = np.append(self._times, tmat)
             self._dfs = np.append(self._dfs, df_mat)
+            df_mat = self._initial_df(len(self._times) - 1, df_mat)
 
             argtuple = (self, self._value_date, swap)
 
             df_mat = optimize.newton(_f, x0=df_mat, fprime=None, args=argtuple,
-                                    tol=swaptol, maxiter=50, fprime2=None,
-                                    full_output=False)
+                                     tol=swaptol, maxiter=50, fprime2=None,
+                                     full_output=False)
+
+###############################################################################
+
+    def _build_curve_using_global_solver(self):
+        """ Construct the discount curve by solving for the discount factors
+        at the maturity dates of all of the instruments at once. The starting
+        point assumes a flat curve at each instrument's quoted rate out to its
+        maturity. This is then refined using Newton-Raphson steps with the
+        Jacobian of the instrument values, which is analytic except for the
+        PCHIP schemes. """
+
+        self._interpolator = Interpolator(self._interp_type)
+
+        grid_times = [0.0]
+        grid_rates = [0.0]
+
+        for depo in self._usedDeposits:
+            tmat = (depo._maturity_date - self._value_date) / gDaysInYear
+            grid_times.append(tmat)
+            grid_rates.append(depo._deposit_rate)
+
+        for fra in self._usedFRAs:
+            tmat = (fra._maturity_date - self._value_date) / gDaysInYear
+            grid_times.append(tmat)
+            grid_rates.append(fra._fraRate)
+
+        for swap in self._usedSwaps:
+            maturity_date = swap._fixed_leg._payment_dates[-1]
+            tmat = (maturity_date - self._value_date) / gDaysInYear
+            grid_times.append(tmat)
+            grid_rates.append(swap._fixed_leg._cpn)
+
+        self._times = np.array(grid_times)
+        self._dfs = np.exp(-np.array(grid_rates) * self._times)
+
+        if self._initial_dfs is not None:
+            self._dfs[1:] = self._initial_dfs
+
+        self._interpolator.fit(self._times, self._dfs)
+
+        self._newton_solve()
+
+        if self._check_refit is True:
+            self._check_refits(1e-10, swaptol, 1e-5)
+
+###############################################################################
+
+    def _newton_solve(self,
+                      max_iter: int = 50):
+        """ Refine the grid discount factors, other than that at the valuation
+        date, using Newton-Raphson steps until every instrument reprices. The
+        Jacobian at the solution is stored. """
+
+        for _ in range(0, max_iter):
+
+            residuals, jac, quote_grads = _calibration_jacobian(self)
+
+            if np.max(np.abs(residuals)) < swaptol:
+                self._jacobian = jac
+                self._quote_grads = quote_grads
+                return
+
+            step = np.linalg.solve(jac, -residuals)
+            self._dfs = self._dfs.copy()
+            self._dfs[1:] += step
+            self._interpolator.fit(self._times, self._dfs)
+
+        raise FinError("Global curve solve did not converge.")
+
+###############################################################################
+
+    def _calibration_derivatives(self):
+        """ Returns the Jacobian of the calibration instruments and the
+        derivatives of their values per unit notional with respect to their
+        quoted rates. Both come from one pass over the instruments and are
+        kept until the curve changes. """
+
+        if self._jacobian is None:
+            _, self._jacobian, self._quote_grads = _calibration_jacobian(self)
+
+        return self._jacobian, self._quote_grads
+
+###############################################################################
+
+    def jacobian(self):
+        """ Returns the matrix of derivatives of the calibration instrument
+        values per unit notional with respect to the grid discount factors of
+        the curve, excluding the discount factor of one at the valuation date.
+        The rows are the instruments in the order deposits, FRAs and swaps
+        and the columns are the grid points which follow the same order. This
+        is calculated at the current discount factors if it was not kept by
+        the global solver. """
+
+        return self._calibration_derivatives()[0]
+
+###############################################################################
+
+    def _initial_df(self,
+                    index: int,
+                    df_guess: float):
+        """ Returns the starting point of the solve for the discount factor at
+        a grid point. This is the warm start discount factor if these were
+        supplied and the guess otherwise. """
+
+        if self._initial_dfs is None:
+            return df_guess
+
+        return self._initial_dfs[index - 1]
+
+###############################################################################
+
+    def update_quote(self,
+                     instrument_index: int,
+                     new_rate: float):
+        """ Change the quoted rate of one of the calibration instruments and
+        rebuild the curve. The index counts the instruments in the order
+        deposits, FRAs and swaps, including any synthetic deposit added to
+        reach the valuation date. Only the part of the curve from the grid
+        point of that instrument onwards is solved again. The discount factors
+        before it do not depend on the quote and are reused. This gives the
+        same curve as a full rebuild with the new quote. If the curve was
+        built with the global solver, the Newton iteration is restarted from
+        the current discount factors instead. The instrument is copied so that
+        the object passed in by the user is not changed. """
+
+        num_depos = len(self._usedDeposits)
+        num_fras = len(self._usedFRAs)
+        num_instruments = num_depos + num_fras + len(self._usedSwaps)
+
+        if instrument_index < 0 or instrument_index >= num_instruments:
+            raise FinError("Instrument index out of range")
+
+        if instrument_index < num_depos:
+            depo = copy.deepcopy(self._usedDeposits[instrument_index])
+            depo._deposit_rate = new_rate
+            self._usedDeposits = list(self._usedDeposits)
+            self._usedDeposits[instrument_index] = depo
+        elif instrument_index < num_depos + num_fras:
+            i = instrument_index - num_depos
+            fra = copy.deepcopy(self._usedFRAs[i])
+            fra._fraRate = new_rate
+            self._usedFRAs = list(self._usedFRAs)
+            self._usedFRAs[i] = fra
+        else:
+            i = instrument_index - num_depos - num_fras
+            swap = copy.deepcopy(self._usedSwaps[i])
+            swap._fixed_leg._cpn = new_rate
+            swap._fixed_leg.generate_payments()
+            self._usedSwaps = list(self._usedSwaps)
+            self._usedSwaps[i] = swap
+
+        self._jacobian = None
+        self._quote_grads = None
+
+        if self._global_solve is True:
+            # The previous solution is a good starting point for the Newton
+            self._newton_solve()
+            if self._check_refit is True:
+                self._check_refits(1e-10, swaptol, 1e-5)
+            return
+
+        # Grid point zero is the valuation date so instrument i sets point i+1
+        self._times = self._times[0:instrument_index + 1]
+        self._dfs = self._dfs[0:instrument_index + 1]
+        self._interpolator.fit(self._times, self._dfs)
+
+        self._bootstrap_from(instrument_index)
 
         if self._check_refit is True:
             self._check_refits(1e-10, swaptol, 1e-5)
@@ -11,6 +11,7 @@ from ...utils.day_count import DayCountTypes
 from ...utils.frequency import FrequencyTypes, annual_frequency
 from ...utils.calendar import CalendarTypes, DateGenRuleTypes
 from ...utils.calendar import Calendar, BusDayAdjustTypes
+from ...utils.calendar import to_calendar
 from ...utils.helpers import check_argument_types, label_to_string
 from ...utils.math import ONE_MILLION
 from ...utils.global_types import SwapTypes
@@ -48,7 +49,7 @@ class IborSwap:
                  float_spread: float = 0.0,
                  float_freq_type: FrequencyTypes = FrequencyTypes.QUARTERLY,
                  float_dc_type: DayCountTypes = DayCountTypes.THIRTY_E_360,
-                 cal_type: CalendarTypes = CalendarTypes.WEEKEND,
+                 cal_type: (CalendarTypes, Calendar) = CalendarTypes.WEEKEND,
                  bd_type: BusDayAdjustTypes = BusDayAdjustTypes.FOLLOWING,
                  dg_type: DateGenRuleTypes = DateGenRuleTypes.BACKWARD):
         """ Create an interest rate swap contract giving the contract start
@@ -68,7 +69,7 @@ class IborSwap:
             self._termination_date = effective_date.add_tenor(
                 term_date_or_tenor)
 
-        calendar = Calendar(cal_type)
+        calendar = to_calendar(cal_type)
         self._maturity_date = calendar.adjust(self._termination_date,
                                               bd_type)
 
@@ -136,6 +137,38 @@ class IborSwap:
 
     ###########################################################################
 
+    def df_sensitivities(self,
+                         value_date: Date,
+                         discount_curve: DiscountCurve,
+                         index_curve: DiscountCurve = None,
+                         firstFixingRate=None):
+        """ Returns the value of the swap together with its derivatives with
+        respect to discount factors. These are given as a list of dates with
+        the derivatives with respect to the discount curve and a list of dates
+        with the derivatives with respect to the index curve. When a single
+        curve is used for both the two sets of derivatives should be added. A
+        date may appear more than once in which case the derivatives add. """
+
+        if index_curve is None:
+            index_curve = discount_curve
+
+        fixed_value, fixed_dates, fixed_grads = \
+            self._fixed_leg.df_sensitivities(value_date, discount_curve)
+
+        float_value, float_dates, float_grads, index_dates, index_grads = \
+            self._float_leg.df_sensitivities(value_date,
+                                             discount_curve,
+                                             index_curve,
+                                             firstFixingRate)
+
+        value = fixed_value + float_value
+        disc_dates = fixed_dates + float_dates
+        disc_grads = np.concatenate((fixed_grads, float_grads))
+
+        return value, disc_dates, disc_grads, index_dates, index_grads
+
+    ###########################################################################
+
     def pv01(self, value_date, discount_curve):
         """ Calculate the value of 1 basis point coupon on the fixed leg. """
 
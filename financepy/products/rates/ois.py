@@ -10,6 +10,7 @@ from ...utils.day_count import DayCountTypes
 from ...utils.frequency import FrequencyTypes
 from ...utils.calendar import CalendarTypes,  DateGenRuleTypes
 from ...utils.calendar import Calendar, BusDayAdjustTypes
+from ...utils.calendar import to_calendar
 from ...utils.helpers import check_argument_types, label_to_string
 from ...utils.math import ONE_MILLION
 from ...utils.global_types import SwapTypes
@@ -73,7 +74,7 @@ class OIS:
                  float_spread: float = 0.0,
                  float_freq_type: FrequencyTypes = FrequencyTypes.ANNUAL,
                  float_dc_type: DayCountTypes = DayCountTypes.THIRTY_E_360,
-                 cal_type: CalendarTypes = CalendarTypes.WEEKEND,
+                 cal_type: (CalendarTypes, Calendar) = CalendarTypes.WEEKEND,
                  bd_type: BusDayAdjustTypes = BusDayAdjustTypes.FOLLOWING,
                  dg_type: DateGenRuleTypes = DateGenRuleTypes.BACKWARD):
         """ Create an overnight index swap contract giving the contract start
@@ -93,7 +94,7 @@ class OIS:
             self._termination_date = effective_date.add_tenor(
                 term_date_or_tenor)
 
-        calendar = Calendar(cal_type)
+        calendar = to_calendar(cal_type)
         self._maturity_date = calendar.adjust(self._termination_date,
                                               bd_type)
 
@@ -154,6 +155,32 @@ class OIS:
         value = fixed_leg_value + float_leg_value
         return value
 
+##########################################################################
+
+    def df_sensitivities(self,
+                         value_date: Date,
+                         ois_curve: DiscountCurve,
+                         first_fixing_rate=None):
+        """ Returns the value of the swap together with a list of dates and
+        the derivatives of the value with respect to the discount factors of
+        the OIS curve on these dates. A date may appear more than once in
+        which case the derivatives add. """
+
+        fixed_value, fixed_dates, fixed_grads = \
+            self._fixed_leg.df_sensitivities(value_date, ois_curve)
+
+        float_value, float_dates, float_grads, index_dates, index_grads = \
+            self._float_leg.df_sensitivities(value_date,
+                                             ois_curve,
+                                             ois_curve,
+                                             first_fixing_rate)
+
+        value = fixed_value + float_value
+        dates = fixed_dates + float_dates + index_dates
+        grads = np.concatenate((fixed_grads, float_grads, index_grads))
+
+        return value, dates, grads
+
 ##########################################################################
 
     def pv01(self, value_date, discount_curve):
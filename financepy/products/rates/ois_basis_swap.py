@@ -8,6 +8,7 @@ from ...utils.day_count import DayCountTypes
 from ...utils.frequency import FrequencyTypes
 from ...utils.calendar import CalendarTypes, DateGenRuleTypes
 from ...utils.calendar import Calendar, BusDayAdjustTypes
+from ...utils.calendar import to_calendar
 from ...utils.helpers import check_argument_types, label_to_string
 from ...utils.math import ONE_MILLION
 from ...utils.global_types import SwapTypes
@@ -41,7 +42,7 @@ class OISBasisSwap:
                  oisSpread: float = 0.0,
                  oisPaymentLag: int = 0,
                  notional: float = ONE_MILLION,
-                 cal_type: CalendarTypes = CalendarTypes.WEEKEND,
+                 cal_type: (CalendarTypes, Calendar) = CalendarTypes.WEEKEND,
                  bd_type: BusDayAdjustTypes = BusDayAdjustTypes.FOLLOWING,
                  dg_type: DateGenRuleTypes = DateGenRuleTypes.BACKWARD):
         """ Create a Ibor basis swap contract giving the contract start
@@ -61,13 +62,15 @@ class OISBasisSwap:
             self._termination_date = effective_date.add_tenor(
                 term_date_or_tenor)
 
-        calendar = Calendar(cal_type)
+        calendar = to_calendar(cal_type)
         self._maturity_date = calendar.adjust(self._termination_date,
                                               bd_type)
 
         if effective_date > self._maturity_date:
             raise FinError("Start date after maturity date")
 
+        self._effective_date = effective_date
+
         oisType = SwapTypes.PAY
         if iborType == SwapTypes.PAY:
             oisType = SwapTypes.RECEIVE
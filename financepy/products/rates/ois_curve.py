@@ -3,19 +3,26 @@
 ##############################################################################
 
 import numpy as np
+from numba import njit, float64, int64
 from scipy import optimize
 import copy
+from typing import Optional
 
 from ...utils.error import FinError
 from ...utils.date import Date
-from ...utils.helpers import label_to_string
+from ...utils.helpers import label_to_string, times_from_dates
 from ...utils.helpers import check_argument_types, _func_name
 from ...utils.global_vars import gDaysInYear
+from ...utils.global_types import SwapTypes
+from ...utils.day_count import DayCount, DayCountTypes
 from ...market.curves.interpolator import InterpTypes, Interpolator
+from ...market.curves.interpolator import _fit_coeffs, _vinterpolate_coeffs
+from ...market.curves.interpolator import _df_jacobian_column
 from ...market.curves.discount_curve import DiscountCurve
 
 from ...products.rates.ibor_deposit import IborDeposit
 from ...products.rates.ois import OIS
+from ...products.rates.curve_risk import _calibration_jacobian
 
 swaptol = 1e-10
 
@@ -50,21 +57,127 @@ def _fois(oir, *args):
 ###############################################################################
 
 
-def _f(df, *args):
-    """ Root search objective function for OIS """
+def _ois_cash_flows(swap, curve):
+    """ Precompute the cash flows of an OIS per unit notional for valuation
+    at the curve valuation date. The fixed coupons, floating spread payments
+    and principals are returned as amounts paid at the flow times. The
+    floating leg forward payments are returned as the amounts which multiply
+    (df_start / df_end - 1) * df_pay for each floating period. All of the
+    times are returned in one array which holds the flow times followed by
+    the start, end and payment times of the floating periods. """
+
+    value_date = curve._value_date
+    fixed_leg = swap._fixed_leg
+    float_leg = swap._float_leg
+    notional = fixed_leg._notional
+
+    flow_dates = []
+    flow_amounts = []
+
+    fixed_sign = -1.0 if fixed_leg._leg_type == SwapTypes.PAY else 1.0
+
+    for dt, payment in zip(fixed_leg._payment_dates, fixed_leg._payments):
+        if dt > value_date:
+            flow_dates.append(dt)
+            flow_amounts.append(fixed_sign * payment / notional)
+
+    if fixed_leg._payment_dates[-1] > value_date:
+        flow_dates.append(fixed_leg._payment_dates[-1])
+        flow_amounts.append(fixed_sign * fixed_leg._principal)
+
+    float_sign = -1.0 if float_leg._leg_type == SwapTypes.PAY else 1.0
+    index_day_counter = DayCount(curve._dc_type)
+
+    num_payments = len(float_leg._payment_dates)
+    notionals = float_leg._notional_array
+    if not len(notionals):
+        notionals = [float_leg._notional] * num_payments
+
+    start_dates = []
+    end_dates = []
+    pay_dates = []
+    fwd_amounts = []
+
+    for i, dt in enumerate(float_leg._payment_dates):
+        if dt > value_date:
+            start_dt = float_leg._startAccruedDates[i]
+            end_dt = float_leg._endAccruedDates[i]
+            index_alpha = index_day_counter.year_frac(start_dt, end_dt)[0]
+            amount = float_sign * float_leg._year_fracs[i] * notionals[i]
+            amount = amount / notional
+            start_dates.append(start_dt)
+            end_dates.append(end_dt)
+            pay_dates.append(dt)
+            fwd_amounts.append(amount / index_alpha)
+            flow_dates.append(dt)
+            flow_amounts.append(amount * float_leg._spread)
+
+    if len(pay_dates) > 0:
+        flow_dates.append(pay_dates[-1])
+        flow_amounts.append(float_sign * float_leg._principal *
+                            notionals[-1] / notional)
+
+    dates = flow_dates + start_dates + end_dates + pay_dates
+    times = times_from_dates(dates, value_date, DayCountTypes.ACT_ACT_ISDA)
+
+    return (np.asarray(times, dtype=np.float64),
+            np.array(flow_amounts, dtype=np.float64),
+            np.array(fwd_amounts, dtype=np.float64))
 
-    curve = args[0]
-    value_date = args[1]
-    swap = args[2]
-    num_points = len(curve._times)
-    curve._dfs[num_points - 1] = df
+###############################################################################
 
-    # For discount that need a fit function, we fit it now
-    curve._interpolator.fit(curve._times, curve._dfs)
-    v_swap = swap.value(value_date, curve, None)
-    notional = swap._fixed_leg._notional
-    v_swap /= notional
-    return v_swap
+
+@njit(float64(float64, float64[:], float64[:], int64, float64[:], float64[:],
+              float64[:]), fastmath=True, cache=True)
+def _ois_pillar_df(df_guess, times, dfs, method, flow_times, flow_amounts,
+                   fwd_amounts):
+    """ Solve for the discount factor at the last grid point which gives an
+    OIS a value of zero using Newton-Raphson. The OIS is described by the
+    arrays built by _ois_cash_flows so each iteration only refits the
+    interpolator and evaluates the cash flows. The derivative of the OIS
+    value is found from the derivatives of the discount factors at the flow
+    times with respect to the last grid discount factor. These are analytic
+    except for the PCHIP schemes where they are central differences. The last
+    discount factor in dfs is set to the solution. """
+
+    num_flows = flow_amounts.size
+    num_periods = fwd_amounts.size
+    last = times.size - 1
+    x = df_guess
+
+    for _ in range(0, 50):
+
+        dfs[last] = x
+        coeffs = _fit_coeffs(times, dfs, method)
+        d = _vinterpolate_coeffs(flow_times, coeffs, method)
+        dd = _df_jacobian_column(flow_times, times, dfs, method, last)
+
+        v = 0.0
+        dv = 0.0
+
+        for k in range(0, num_flows):
+            v += flow_amounts[k] * d[k]
+            dv += flow_amounts[k] * dd[k]
+
+        for k in range(0, num_periods):
+            ks = num_flows + k
+            ke = ks + num_periods
+            kp = ke + num_periods
+            c = fwd_amounts[k]
+            ratio = d[ks] / d[ke]
+            v += c * (ratio - 1.0) * d[kp]
+            dv += c * d[kp] / d[ke] * dd[ks]
+            dv -= c * ratio * d[kp] / d[ke] * dd[ke]
+            dv += c * (ratio - 1.0) * dd[kp]
+
+        step = v / dv
+        x = x - step
+
+        if abs(step) < swaptol:
+            dfs[last] = x
+            return x
+
+    raise FinError("OIS discount factor solver did not converge.")
 
 ###############################################################################
 
@@ -107,7 +220,8 @@ class OISCurve(DiscountCurve):
                  ois_fras: list,
                  ois_swaps: list,
                  interp_type: InterpTypes = InterpTypes.FLAT_FWD_RATES,
-                 check_refit: bool = False):  # Set to True to test it works
+                 check_refit: bool = False,  # Set to True to test it works
+                 initial_dfs: Optional[np.ndarray] = None):
         """ Create an instance of an overnight index rate swap curve given a
         valuation date and a set of OIS rates. Some of these may
         be left None and the algorithm will just use what is provided. An
@@ -116,15 +230,31 @@ class OISCurve(DiscountCurve):
         flat forwards between these coupon dates.
 
         The curve will assign a discount factor of 1.0 to the valuation date.
+
+        The solver can be warm started by passing the grid discount factors
+        of a similar curve, such as that of the previous day, as initial_dfs.
+        There must be one per calibration instrument in the order deposits,
+        FRAs and swaps.
         """
 
         check_argument_types(getattr(self, _func_name(), None), locals())
 
         self._value_date = value_date
         self._validate_inputs(ois_deposits, ois_fras, ois_swaps)
+
+        if initial_dfs is not None:
+            num_instruments = len(self._usedDeposits) + \
+                len(self._usedFRAs) + len(self._usedSwaps)
+            if len(initial_dfs) != num_instruments:
+                raise FinError("Need one initial discount factor per "
+                               "calibration instrument.")
+
         self._interp_type = interp_type
         self._check_refit = check_refit
+        self._initial_dfs = initial_dfs
         self._interpolator = None
+        self._jacobian = None
+        self._quote_grads = None
         self._build_curve()
 
 ###############################################################################
@@ -134,6 +264,20 @@ class OISCurve(DiscountCurve):
 
         self._build_curve_using_1d_solver()
 
+###############################################################################
+
+    def _initial_df(self,
+                    index: int,
+                    df_guess: float):
+        """ Returns the starting point of the solve for the discount factor at
+        a grid point. This is the warm start discount factor if these were
+        supplied and the guess otherwise. """
+
+        if self._initial_dfs is None:
+            return df_guess
+
+        return self._initial_dfs[index - 1]
+
 ###############################################################################
 
     def _validate_inputs(self,
@@ -314,7 +458,8 @@ class OISCurve(DiscountCurve):
         """ Construct the discount curve using a bootstrap approach. This is
         the non-linear slower method that allows the user to choose a number
         of interpolation approaches between the swap rates and other rates. It
-        involves the use of a solver. """
+        involves the use of a solver. For each OIS the cash flows are computed
+        once and the solver is compiled so that no OIS is revalued. """
 
         self._interpolator = Interpolator(self._interp_type)
         self._times = np.array([])
@@ -352,6 +497,7 @@ class OISCurve(DiscountCurve):
             else:
                 self._times = np.append(self._times, tmat)
                 self._dfs = np.append(self._dfs, df_mat)
+                df_mat = self._initial_df(len(self._times) - 1, df_mat)
                 argtuple = (self, self._value_date, fra)
                 df_mat = optimize.newton(_g, x0=df_mat, fprime=None,
                                         args=argtuple, tol=swaptol,
@@ -365,12 +511,15 @@ class OISCurve(DiscountCurve):
 
             self._times = np.append(self._times, tmat)
             self._dfs = np.append(self._dfs, df_mat)
+            df_mat = self._initial_df(len(self._times) - 1, df_mat)
 
-            argtuple = (self, self._value_date, swap)
+            flow_times, flow_amounts, fwd_amounts = _ois_cash_flows(swap, self)
 
-            df_mat = optimize.newton(_f, x0=df_mat, fprime=None, args=argtuple,
-                                    tol=swaptol, maxiter=50, fprime2=None,
-                                    full_output=False)
+            df_mat = _ois_pillar_df(df_mat, self._times, self._dfs,
+                                    self._interp_type.value, flow_times,
+                                    flow_amounts, fwd_amounts)
+
+            self._interpolator.fit(self._times, self._dfs)
 
         if self._check_refit is True:
             self._check_refits(1e-10, swaptol, 1e-5)
@@ -518,6 +667,30 @@ class OISCurve(DiscountCurve):
         if self._check_refit is True:
             self._check_refits(1e-10, swaptol, 1e-5)
 
+###############################################################################
+
+    def _calibration_derivatives(self):
+        """ Returns the Jacobian of the calibration instruments and the
+        derivatives of their values per unit notional with respect to their
+        quoted rates. Both come from one pass over the instruments and are
+        kept. """
+
+        if self._jacobian is None:
+            _, self._jacobian, self._quote_grads = _calibration_jacobian(self)
+
+        return self._jacobian, self._quote_grads
+
+###############################################################################
+
+    def jacobian(self):
+        """ Returns the matrix of derivatives of the calibration instrument
+        values per unit notional with respect to the grid discount factors of
+        the curve, excluding the discount factor of one at the valuation date.
+        The rows are the instruments in the order deposits, FRAs and swaps
+        and the columns are the grid points which follow the same order. """
+
+        return self._calibration_derivatives()[0]
+
 ###############################################################################
 
     def _check_refits(self, depoTol, fraTol, swapTol):
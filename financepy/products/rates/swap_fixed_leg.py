@@ -2,6 +2,8 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
+import numpy as np
+
 from ...utils.error import FinError
 from ...utils.date import Date
 from ...utils.math import ONE_MILLION
@@ -9,6 +11,7 @@ from ...utils.day_count import DayCount, DayCountTypes
 from ...utils.frequency import FrequencyTypes
 from ...utils.calendar import CalendarTypes,  DateGenRuleTypes
 from ...utils.calendar import Calendar, BusDayAdjustTypes
+from ...utils.calendar import to_calendar
 from ...utils.schedule import Schedule
 from ...utils.helpers import format_table, label_to_string, check_argument_types
 from ...utils.global_types import SwapTypes
@@ -32,7 +35,7 @@ class SwapFixedLeg:
                  notional: float = ONE_MILLION,
                  principal: float = 0.0,
                  payment_lag: int = 0,
-                 cal_type: CalendarTypes = CalendarTypes.WEEKEND,
+                 cal_type: (CalendarTypes, Calendar) = CalendarTypes.WEEKEND,
                  bd_type: BusDayAdjustTypes = BusDayAdjustTypes.FOLLOWING,
                  dg_type: DateGenRuleTypes = DateGenRuleTypes.BACKWARD,
                  end_of_month: bool = False):
@@ -47,7 +50,7 @@ class SwapFixedLeg:
         else:
             self._termination_date = effective_date.add_tenor(end_date)
 
-        calendar = Calendar(cal_type)
+        calendar = to_calendar(cal_type)
 
         self._maturity_date = calendar.adjust(self._termination_date,
                                               bd_type)
@@ -114,7 +117,7 @@ class SwapFixedLeg:
         prev_dt = scheduleDates[0]
 
         day_counter = DayCount(self._dc_type)
-        calendar = Calendar(self._cal_type)
+        calendar = to_calendar(self._cal_type)
 
         for next_dt in scheduleDates[1:]:
 
@@ -191,6 +194,45 @@ class SwapFixedLeg:
 
         return legPV
 
+##########################################################################
+
+    def df_sensitivities(self,
+                         value_date: Date,
+                         discount_curve: DiscountCurve):
+        """ Returns the value of the leg as calculated by value together with
+        the dates of the discount factors that it depends on and the
+        derivative of the value with respect to each of these discount
+        factors. A date may appear more than once in which case the
+        derivatives add. This is used to build analytic Jacobians. """
+
+        notional = self._notional
+        dfValue = discount_curve.df(value_date)
+
+        dates = [dt for dt in self._payment_dates if dt > value_date]
+        amounts = np.array([self._payments[i]
+                            for i, dt in enumerate(self._payment_dates)
+                            if dt > value_date])
+
+        if len(dates) == 0:
+            return 0.0, [value_date], np.zeros(1)
+
+        dfs = discount_curve.df(dates)
+        grads = amounts / dfValue
+
+        if self._payment_dates[-1] > value_date:
+            grads[-1] += self._principal * notional / dfValue
+
+        legPV = np.sum(grads * dfs)
+
+        dates.append(value_date)
+        grads = np.append(grads, -legPV / dfValue)
+
+        if self._leg_type == SwapTypes.PAY:
+            legPV = legPV * (-1.0)
+            grads = grads * (-1.0)
+
+        return legPV, dates, grads
+
 ##########################################################################
 
     def print_payments(self):
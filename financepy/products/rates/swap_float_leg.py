@@ -2,6 +2,8 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
+import numpy as np
+
 from ...utils.error import FinError
 from ...utils.date import Date
 from ...utils.math import ONE_MILLION
@@ -9,6 +11,7 @@ from ...utils.day_count import DayCount, DayCountTypes
 from ...utils.frequency import FrequencyTypes
 from ...utils.calendar import CalendarTypes,  DateGenRuleTypes
 from ...utils.calendar import Calendar, BusDayAdjustTypes
+from ...utils.calendar import to_calendar
 from ...utils.schedule import Schedule
 from ...utils.helpers import format_table, label_to_string, check_argument_types
 from ...utils.global_types import SwapTypes
@@ -32,7 +35,7 @@ class SwapFloatLeg:
                  notional: float = ONE_MILLION,
                  principal: float = 0.0,
                  payment_lag: int = 0,
-                 cal_type: CalendarTypes = CalendarTypes.WEEKEND,
+                 cal_type: (CalendarTypes, Calendar) = CalendarTypes.WEEKEND,
                  bd_type: BusDayAdjustTypes = BusDayAdjustTypes.FOLLOWING,
                  dg_type: DateGenRuleTypes = DateGenRuleTypes.BACKWARD,
                  end_of_month: bool = False):
@@ -47,7 +50,7 @@ class SwapFloatLeg:
         else:
             self._termination_date = effective_date.add_tenor(end_date)
 
-        calendar = Calendar(cal_type)
+        calendar = to_calendar(cal_type)
 
         self._maturity_date = calendar.adjust(self._termination_date,
                                               bd_type)
@@ -108,7 +111,7 @@ class SwapFloatLeg:
         prev_dt = scheduleDates[0]
 
         day_counter = DayCount(self._dc_type)
-        calendar = Calendar(self._cal_type)
+        calendar = to_calendar(self._cal_type)
 
         # All of the lists end up with the same length
         for next_dt in scheduleDates[1:]:
@@ -222,6 +225,92 @@ class SwapFloatLeg:
 
         return legPV
 
+##########################################################################
+
+    def df_sensitivities(self,
+                         value_date: Date,
+                         discount_curve: DiscountCurve,
+                         index_curve: DiscountCurve,
+                         firstFixingRate: float = None):
+        """ Returns the value of the leg as calculated by value together with
+        the derivatives of the value with respect to the discount factors it
+        depends on. These are returned as a list of discounting dates with the
+        derivatives with respect to the discount curve and a list of index
+        dates with the derivatives with respect to the index curve. A date may
+        appear more than once in which case the derivatives add. """
+
+        if discount_curve is None:
+            raise FinError("Discount curve is None")
+
+        if index_curve is None:
+            index_curve = discount_curve
+
+        num_payments = len(self._payment_dates)
+
+        if not len(self._notional_array):
+            self._notional_array = [self._notional] * num_payments
+
+        index_day_counter = DayCount(index_curve._dc_type)
+
+        pay_indices = [i for i in range(0, num_payments)
+                       if self._payment_dates[i] > value_date]
+
+        if len(pay_indices) == 0:
+            return 0.0, [value_date], np.zeros(1), [], np.zeros(0)
+
+        dfValue = discount_curve.df(value_date)
+        pay_dates = [self._payment_dates[i] for i in pay_indices]
+        dfPmnts = discount_curve.df(pay_dates) / dfValue
+
+        index_dates = []
+        index_grads = []
+        disc_grads = np.zeros(len(pay_indices))
+        legPV = 0.0
+
+        for k, iPmnt in enumerate(pay_indices):
+
+            startAccruedDt = self._startAccruedDates[iPmnt]
+            endAccruedDt = self._endAccruedDates[iPmnt]
+            pay_alpha = self._year_fracs[iPmnt]
+            notional = self._notional_array[iPmnt]
+
+            if k == 0 and firstFixingRate is not None:
+
+                fwd_rate = firstFixingRate
+
+            else:
+
+                index_alpha = index_day_counter.year_frac(startAccruedDt,
+                                                          endAccruedDt)[0]
+
+                df_start = index_curve.df(startAccruedDt)
+                dfEnd = index_curve.df(endAccruedDt)
+                fwd_rate = (df_start / dfEnd - 1.0) / index_alpha
+
+                scale = pay_alpha * notional * dfPmnts[k] / index_alpha
+                index_dates += [startAccruedDt, endAccruedDt]
+                index_grads += [scale / dfEnd,
+                                -scale * df_start / (dfEnd * dfEnd)]
+
+            pmntAmount = (fwd_rate + self._spread) * pay_alpha * notional
+            legPV += pmntAmount * dfPmnts[k]
+            disc_grads[k] = pmntAmount / dfValue
+
+        paymentPV = self._principal * dfPmnts[-1] * self._notional_array[-1]
+        legPV += paymentPV
+        disc_grads[-1] += self._principal * self._notional_array[-1] / dfValue
+
+        disc_dates = pay_dates + [value_date]
+        disc_grads = np.append(disc_grads, -legPV / dfValue)
+        index_grads = np.array(index_grads)
+
+        if self._leg_type == SwapTypes.PAY:
+            legPV = legPV * (-1.0)
+            disc_grads = disc_grads * (-1.0)
+            index_grads = index_grads * (-1.0)
+
+        return legPV, disc_dates, disc_grads, index_dates, index_grads
+
 ##########################################################################
 
     def print_payments(self):
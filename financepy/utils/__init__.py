@@ -1,6 +1,7 @@
 from .calendar import *
 from .currency import *
 from .date import *
+from .date_array import *
 from .day_count import *
 from .frequency import *
 from .global_vars import *
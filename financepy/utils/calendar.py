@@ -9,10 +9,14 @@
 
 import datetime
 from enum import Enum
-from .date import Date
-from .error import FinError
 
-# from numba import njit, jit, int64, boolean
+from numba import njit
+import numpy as np
+
+from .date import Date, date_to_excel_serial, excel_serial_to_date
+from .date import days_in_month
+from .date_array import DateArray
+from .error import FinError
 
 easterMondayDay = [98, 90, 103, 95, 114, 106, 91, 111, 102, 87,
                    107, 99, 83, 103, 95, 115, 99, 91, 111, 96, 87,
@@ -76,6 +80,137 @@ class DateGenRuleTypes(Enum):
     FORWARD = 1
     BACKWARD = 2
 
+
+class JointCalendarTypes(Enum):
+    UNION = 1  # a holiday in any of the calendars is a holiday
+    INTERSECTION = 2  # only a holiday in all of the calendars is a holiday
+
+###############################################################################
+
+
+###############################################################################
+# BUSINESS DAY BITMAPS
+###############################################################################
+# Evaluating the holiday rules of a calendar for every date is slow. Instead we
+# evaluate them once per calendar type, the first time they are needed, for
+# every day in the range covered by the Easter Monday table and store the
+# result as a packed bitmap with one bit per day which is set if the day is a
+# business day. Business day queries then become a bit lookup. Dates outside
+# the bitmap range fall back to evaluating the holiday rules directly.
+###############################################################################
+
+gBitmapStartYear = 1901
+gBitmapEndYear = 1900 + len(easterMondayDay)
+gBitmapStartSerial = date_to_excel_serial(1, 1, gBitmapStartYear)
+gBitmapNumDays = date_to_excel_serial(31, 12, gBitmapEndYear) \
+    - gBitmapStartSerial + 1
+
+gBusinessDayBitmaps = {}
+
+# For each calendar type we also keep the cumulative number of business days
+# before each day in the bitmap range and the index of every business day in
+# the range. Together these make it possible to count and to jump a number of
+# business days without stepping through the days one at a time.
+gBusinessDayCounts = {}
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _is_business_index(bitmap, idx):
+    """ Look up the bit for day idx in a packed business day bitmap. """
+    return (bitmap[idx >> 3] >> (7 - (idx & 7))) & 1 == 1
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _adjust_index(idx, bitmap, num_days, bd_type):
+    """ Adjust the day with index idx in the bitmap to a business day using
+    the value of a BusDayAdjustTypes. Returns -1 if the adjustment would leave
+    the bitmap range. """
+
+    if bd_type == 1 or _is_business_index(bitmap, idx):
+        return idx
+
+    step = 1
+    if bd_type == 4 or bd_type == 5:
+        step = -1
+
+    new_idx = idx
+    while not _is_business_index(bitmap, new_idx):
+        new_idx += step
+        if new_idx < 0 or new_idx >= num_days:
+            return -1
+
+    # For modified conventions we reverse direction if we changed month
+    if bd_type == 3 or bd_type == 5:
+
+        _, m_start, _ = excel_serial_to_date(idx + gBitmapStartSerial)
+        _, m_end, _ = excel_serial_to_date(new_idx + gBitmapStartSerial)
+
+        if m_start != m_end:
+            new_idx = idx
+            while not _is_business_index(bitmap, new_idx):
+                new_idx -= step
+                if new_idx < 0 or new_idx >= num_days:
+                    return -1
+
+    return new_idx
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _add_business_days_index(idx, cum_bus_days, bus_day_indices,
+                             num_bus_days):
+    """ Move num_bus_days business days from the day with index idx in the
+    bitmap range using the cumulative business day count. Returns -1 if this
+    would leave the bitmap range. """
+
+    if num_bus_days == 0:
+        return idx
+
+    # Position in the list of all business days of the business day we want
+    if num_bus_days > 0:
+        k = cum_bus_days[idx + 1] + num_bus_days - 1
+    else:
+        k = cum_bus_days[idx] + num_bus_days
+
+    if k < 0 or k >= len(bus_day_indices):
+        return -1
+
+    return bus_day_indices[k]
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _adjust_indices(indices, bitmap, num_days, bd_type):
+    """ Vectorised version of _adjust_index. """
+
+    n = len(indices)
+    new_indices = np.empty(n, dtype=np.int64)
+    for i in range(0, n):
+        new_indices[i] = _adjust_index(indices[i], bitmap, num_days, bd_type)
+    return new_indices
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _add_business_days_indices(indices, cum_bus_days, bus_day_indices,
+                               num_bus_days):
+    """ Vectorised version of _add_business_days_index. """
+
+    n = len(indices)
+    new_indices = np.empty(n, dtype=np.int64)
+    for i in range(0, n):
+        new_indices[i] = _add_business_days_index(indices[i], cum_bus_days,
+                                                  bus_day_indices,
+                                                  num_bus_days[i])
+    return new_indices
+
 ###############################################################################
 
 
@@ -100,14 +235,18 @@ class Calendar:
     ###########################################################################
 
     def adjust(self,
-               dt: Date,
+               dt: (Date, DateArray),
                bd_type: BusDayAdjustTypes):
         """ Adjust a payment date if it falls on a holiday according to the
-        specified business day convention. """
+        specified business day convention. If a DateArray is passed in then
+        all of its dates are adjusted and a DateArray is returned. """
 
         if type(bd_type) != BusDayAdjustTypes:
             raise FinError("Invalid type passed. Need Finbd_type")
 
+        if isinstance(dt, DateArray):
+            return self._adjust_date_array(dt, bd_type)
+
         # If calendar type is NONE then every day is a business day
         if self._cal_type == CalendarTypes.NONE:
             return dt
@@ -115,7 +254,24 @@ class Calendar:
         if bd_type == BusDayAdjustTypes.NONE:
             return dt
 
-        elif bd_type == BusDayAdjustTypes.FOLLOWING:
+        idx = int(dt._excel_date) - gBitmapStartSerial
+
+        if idx >= 0 and idx < gBitmapNumDays:
+
+            bitmap = self._business_day_bitmap()
+
+            if _is_business_index(bitmap, idx):
+                return dt
+
+            new_idx = _adjust_index(idx, bitmap, gBitmapNumDays,
+                                    bd_type.value)
+
+            if new_idx >= 0:
+                d, m, y = excel_serial_to_date(new_idx + gBitmapStartSerial)
+                return Date(d, m, y)
+
+        # Otherwise we apply the holiday rules one day at a time
+        if bd_type == BusDayAdjustTypes.FOLLOWING:
 
             # step forward until we find a business day
             while self.is_business_day(dt) is False:
@@ -179,19 +335,60 @@ class Calendar:
 
         return dt
 
+###############################################################################
+
+    def _adjust_date_array(self,
+                           dates: DateArray,
+                           bd_type: BusDayAdjustTypes):
+        """ Adjust all of the dates in a DateArray using the business day
+        bitmap. """
+
+        if self._cal_type == CalendarTypes.NONE or \
+                bd_type == BusDayAdjustTypes.NONE:
+            return dates
+
+        indices = dates.serials.astype(np.int64) - gBitmapStartSerial
+
+        new_indices = _adjust_indices(indices, self._business_day_bitmap(),
+                                      gBitmapNumDays, bd_type.value)
+
+        if len(new_indices) > 0 and (np.any(indices < 0) or
+                                     np.any(indices >= gBitmapNumDays) or
+                                     np.any(new_indices < 0)):
+            return DateArray.from_dates([self.adjust(dt, bd_type)
+                                         for dt in dates])
+
+        return DateArray(new_indices + gBitmapStartSerial)
+
 ###############################################################################
 
     def add_business_days(self,
-                          start_date: Date,
+                          start_date: (Date, DateArray),
                           numDays: int):
         """ Returns a new date that is numDays business days after Date.
-        All holidays in the chosen calendar are assumed not business days. """
+        All holidays in the chosen calendar are assumed not business days.
+        If a DateArray is passed in then numDays can also be an array with
+        one value per date and a DateArray is returned. """
 
-        # TODO: REMOVE DATETIME DEPENDENCE HERE ???
+        if isinstance(start_date, DateArray):
+            return self._add_business_days_date_array(start_date, numDays)
 
         if isinstance(numDays, int) is False:
             raise FinError("Num days must be an integer")
 
+        idx = int(start_date._excel_date) - gBitmapStartSerial
+
+        if idx >= 0 and idx < gBitmapNumDays:
+
+            cum_bus_days, bus_day_indices = self._business_day_counts()
+            new_idx = _add_business_days_index(idx, cum_bus_days,
+                                               bus_day_indices, numDays)
+
+            if new_idx >= 0:
+                d, m, y = excel_serial_to_date(new_idx + gBitmapStartSerial)
+                return Date(d, m, y)
+
+        # Otherwise we apply the holiday rules one day at a time
         dt = datetime.date(start_date._y, start_date._m, start_date._d)
         d = dt.day
         m = dt.month
@@ -215,12 +412,116 @@ class Calendar:
 
         return newDt
 
+###############################################################################
+
+    def _add_business_days_date_array(self,
+                                      dates: DateArray,
+                                      numDays: (int, np.ndarray)):
+        """ Move all of the dates in a DateArray by a number of business days
+        using the business day bitmap. """
+
+        numDays = np.asarray(numDays)
+
+        if np.any(numDays != np.round(numDays)):
+            raise FinError("Num days must be an integer")
+
+        numDays = np.broadcast_to(numDays.astype(np.int64),
+                                  dates.serials.shape)
+
+        indices = dates.serials.astype(np.int64) - gBitmapStartSerial
+
+        if len(indices) > 0 and (np.any(indices < 0) or
+                                 np.any(indices >= gBitmapNumDays)):
+            return DateArray.from_dates([self.add_business_days(dt, int(n))
+                                         for dt, n in zip(dates, numDays)])
+
+        cum_bus_days, bus_day_indices = self._business_day_counts()
+        new_indices = _add_business_days_indices(indices, cum_bus_days,
+                                                 bus_day_indices, numDays)
+
+        if np.any(new_indices < 0):
+            return DateArray.from_dates([self.add_business_days(dt, int(n))
+                                         for dt, n in zip(dates, numDays)])
+
+        return DateArray(new_indices + gBitmapStartSerial)
+
+###############################################################################
+
+    def business_days_between(self,
+                              start_date: (Date, DateArray),
+                              end_date: (Date, DateArray)):
+        """ Returns the number of business days from the start date up to but
+        not including the end date. This is negative if the end date is before
+        the start date. Either date can be a DateArray in which case an array
+        of business day counts is returned. """
+
+        start_is_array = isinstance(start_date, DateArray)
+        end_is_array = isinstance(end_date, DateArray)
+
+        if start_is_array or end_is_array:
+
+            if start_is_array:
+                start_serials = start_date.serials.astype(np.int64)
+            else:
+                start_serials = np.array([int(start_date._excel_date)])
+
+            if end_is_array:
+                end_serials = end_date.serials.astype(np.int64)
+            else:
+                end_serials = np.array([int(end_date._excel_date)])
+
+            start_serials, end_serials = np.broadcast_arrays(start_serials,
+                                                             end_serials)
+
+            i1 = start_serials - gBitmapStartSerial
+            i2 = end_serials - gBitmapStartSerial
+
+            if np.any(np.minimum(i1, i2) < 0) or \
+                    np.any(np.maximum(i1, i2) > gBitmapNumDays):
+                raise FinError("Dates must be between " +
+                               str(gBitmapStartYear) + " and " +
+                               str(gBitmapEndYear))
+
+            cum_bus_days, _ = self._business_day_counts()
+            return cum_bus_days[i2] - cum_bus_days[i1]
+
+        i1 = int(start_date._excel_date) - gBitmapStartSerial
+        i2 = int(end_date._excel_date) - gBitmapStartSerial
+
+        if min(i1, i2) >= 0 and max(i1, i2) <= gBitmapNumDays:
+            cum_bus_days, _ = self._business_day_counts()
+            return int(cum_bus_days[i2] - cum_bus_days[i1])
+
+        # Otherwise we count the business days one at a time
+        sign = 1
+        if i2 < i1:
+            start_date, end_date = end_date, start_date
+            sign = -1
+
+        num_days = 0
+        dt = Date(start_date._d, start_date._m, start_date._y)
+        while dt < end_date:
+            if self.is_business_day(dt):
+                num_days += 1
+            dt = dt.add_days(1)
+
+        return sign * num_days
+
 ###############################################################################
 
     def is_business_day(self,
-                        dt: Date):
+                        dt: (Date, DateArray)):
         """ Determines if a date is a business day according to the specified
-        calendar. If it is it returns True, otherwise False. """
+        calendar. If it is it returns True, otherwise False. If a DateArray is
+        passed in then a boolean array is returned. """
+
+        if isinstance(dt, DateArray):
+            return self._is_business_day_date_array(dt)
+
+        idx = int(dt._excel_date) - gBitmapStartSerial
+
+        if idx >= 0 and idx < gBitmapNumDays:
+            return _is_business_index(self._business_day_bitmap(), idx)
 
         # For all calendars so far, SAT and SUN are not business days
         # If this ever changes I will need to add a filter here.
@@ -232,6 +533,97 @@ class Calendar:
         else:
             return True
 
+###############################################################################
+
+    def _is_business_day_date_array(self,
+                                    dates: DateArray):
+        """ Vectorised business day test of all the dates in a DateArray. """
+
+        indices = dates.serials.astype(np.int64) - gBitmapStartSerial
+
+        if len(indices) > 0 and (np.any(indices < 0) or
+                                 np.any(indices >= gBitmapNumDays)):
+            return np.array([self.is_business_day(dt) for dt in dates],
+                            dtype=bool)
+
+        bitmap = self._business_day_bitmap()
+        bits = (bitmap[indices >> 3] >> (7 - (indices & 7))) & 1
+        return bits == 1
+
+###############################################################################
+
+    def _calendar_key(self):
+        """ Key under which the business day bitmap and counts are cached. """
+        return self._cal_type
+
+###############################################################################
+
+    def _business_day_bitmap(self):
+        """ Returns the packed business day bitmap for this calendar type. It
+        is built the first time it is needed and then shared by all calendars
+        of the same type. """
+
+        bitmap = gBusinessDayBitmaps.get(self._calendar_key())
+
+        if bitmap is None:
+            bitmap = self._build_business_day_bitmap()
+            gBusinessDayBitmaps[self._calendar_key()] = bitmap
+
+        return bitmap
+
+###############################################################################
+
+    def _business_day_counts(self):
+        """ Returns an array with the cumulative number of business days before
+        each day in the bitmap range and an array with the index in the range
+        of every business day. These are built from the bitmap the first time
+        they are needed and shared by all calendars of the same type. """
+
+        counts = gBusinessDayCounts.get(self._calendar_key())
+
+        if counts is None:
+            bitmap = self._business_day_bitmap()
+            is_business_day = np.unpackbits(bitmap)[0:gBitmapNumDays]
+            cum_bus_days = np.zeros(gBitmapNumDays + 1, dtype=np.int64)
+            np.cumsum(is_business_day, out=cum_bus_days[1:])
+            bus_day_indices = np.flatnonzero(is_business_day)
+            counts = (cum_bus_days, bus_day_indices)
+            gBusinessDayCounts[self._calendar_key()] = counts
+
+        return counts
+
+###############################################################################
+
+    def _build_business_day_bitmap(self):
+        """ Evaluate the holiday rules for every day in the bitmap range and
+        pack the results into an array with one bit per day. """
+
+        is_business_day = np.zeros(gBitmapNumDays, dtype=bool)
+
+        idx = 0
+        for y in range(gBitmapStartYear, gBitmapEndYear + 1):
+
+            day_in_year = 0
+
+            for m in range(1, 13):
+
+                for d in range(1, days_in_month(m, y) + 1):
+
+                    day_in_year += 1
+                    weekday = (idx + gBitmapStartSerial + 5) % 7
+
+                    if weekday != Date.SAT and weekday != Date.SUN:
+                        self._y = y
+                        self._m = m
+                        self._d = d
+                        self._day_in_year = day_in_year
+                        self._weekday = weekday
+                        is_business_day[idx] = not self._holiday()
+
+                    idx += 1
+
+        return np.packbits(is_business_day)
+
 ###############################################################################
 
     def is_holiday(self,
@@ -249,7 +641,14 @@ class Calendar:
         self._d = dt._d
         self._day_in_year = day_in_year
         self._weekday = weekday
-        self._dt = dt
+
+        return self._holiday()
+
+###############################################################################
+
+    def _holiday(self):
+        """ Apply the holiday rules of the calendar to the date that has been
+        stored in the calendar. """
 
         if self._cal_type == CalendarTypes.NONE:
             return self.holiday_none()
@@ -290,7 +689,7 @@ class Calendar:
     def holiday_weekend(self):
         """ Weekends by themselves are a holiday. """
 
-        if self._dt.is_weekend():
+        if self._weekday == Date.SAT or self._weekday == Date.SUN:
             return True
         else:
             return False
@@ -1109,3 +1508,101 @@ class Calendar:
         return s
 
 ###############################################################################
+
+
+class JointCalendar(Calendar):
+    """ Class to manage a calendar that combines the holidays of several
+    regional calendars, for example for a cross-currency swap whose payment
+    dates must be business days in two financial centres. With a UNION a day is
+    a holiday if it is a holiday in any of the calendars and with an
+    INTERSECTION it is a holiday only if it is a holiday in all of them. The
+    combined business day bitmap is built once per combination so adjusting
+    dates costs the same as for a single calendar. """
+
+    def __init__(self,
+                 cal_types: list,
+                 join_type: JointCalendarTypes = JointCalendarTypes.UNION):
+        """ Create a joint calendar from a list of calendar types and the
+        rule used to combine their holidays. """
+
+        if len(cal_types) == 0:
+            raise FinError("Need at least one calendar type")
+
+        for cal_type in cal_types:
+            if cal_type not in CalendarTypes:
+                raise FinError(
+                    "Need to pass FinCalendarType and not " +
+                    str(cal_type))
+
+        if join_type not in JointCalendarTypes:
+            raise FinError("Need to pass JointCalendarTypes and not " +
+                           str(join_type))
+
+        # The order of the calendars does not matter so we sort and remove
+        # duplicates to share the cached bitmap between equivalent calendars
+        cal_types = sorted(set(cal_types), key=lambda cal_type: cal_type.value)
+
+        self._cal_types = tuple(cal_types)
+        self._join_type = join_type
+        self._calendars = [Calendar(cal_type) for cal_type in cal_types]
+        self._cal_type = None
+
+    ###########################################################################
+
+    def _calendar_key(self):
+        """ Key under which the business day bitmap and counts are cached. """
+        return (self._cal_types, self._join_type)
+
+    ###########################################################################
+
+    def _build_business_day_bitmap(self):
+        """ Combine the packed bitmaps of the calendars. A day is a business
+        day in a UNION if it is a business day in all of the calendars. """
+
+        bitmaps = [calendar._business_day_bitmap()
+                   for calendar in self._calendars]
+
+        if self._join_type == JointCalendarTypes.UNION:
+            return np.bitwise_and.reduce(bitmaps)
+        else:
+            return np.bitwise_or.reduce(bitmaps)
+
+    ###########################################################################
+
+    def is_holiday(self,
+                   dt: Date):
+        """ Determines if a date is a holiday in the joint calendar. """
+
+        holidays = [calendar.is_holiday(dt) for calendar in self._calendars]
+
+        if self._join_type == JointCalendarTypes.UNION:
+            return any(holidays)
+        else:
+            return all(holidays)
+
+    ###########################################################################
+
+    def __str__(self):
+        s = self._join_type.name + "(" + \
+            ", ".join([cal_type.name for cal_type in self._cal_types]) + ")"
+        return s
+
+    ###########################################################################
+
+    def __repr__(self):
+        return self.__str__()
+
+###############################################################################
+
+
+def to_calendar(cal_type):
+    """ Return the calendar for a calendar type. A calendar object, such as a
+    JointCalendar for the payment dates of a cross-currency swap, is returned
+    as it is. This lets schedules and products take either. """
+
+    if isinstance(cal_type, Calendar):
+        return cal_type
+
+    return Calendar(cal_type)
+
+###############################################################################
@@ -2,7 +2,6 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
-from collections.abc import Iterable
 from functools import partial
 
 from numba import njit
@@ -101,84 +100,83 @@ def parse_date(date_str, date_format):
     return dt_obj.day, dt_obj.month, dt_obj.year
 
 ###############################################################################
-# CREATE DATE COUNTER
+# EXCEL SERIAL DATE CONVERSION
+###############################################################################
+# The internal representation of a date is the number of days since 31 Dec
+# 1899 so that 1 Jan 1900 is day 1. This agrees with Excel BUT TAKES INTO
+# ACCOUNT THE FACT THAT EXCEL MISTAKENLY CALLS 1900 A LEAP YEAR. For us,
+# agreement with Excel is more important than this leap year error and in any
+# case, we will not usually be calculating day differences with start dates
+# before 28 Feb 1900. Note that Excel inherited this "BUG" from LOTUS 1-2-3.
+# The conversions are closed-form so there is no lookup table to build and no
+# limit on the range of years.
 ###############################################################################
 
+# Excel serial of 1 Jan 1970 and offset of 1 Mar 0000 from 1 Jan 1970 as used
+# by the civil calendar algorithm for the proleptic Gregorian calendar
+EXCEL_SERIAL_OF_UNIX_EPOCH = 25569
+DAYS_FROM_CIVIL_EPOCH = 719468
 
-gDateCounterList = None
-gStartYear = 1900
-gEndYear = 2100
-
-
-def calculate_list():
-    """ Calculate list of dates so that we can do quick lookup to get the
-    number of dates since 1 Jan 1900 (inclusive) BUT TAKING INTO ACCOUNT THE
-    FACT THAT EXCEL MISTAKENLY CALLS 1900 A LEAP YEAR. For us, agreement with
-    Excel is more important than this leap year error and in any case, we will
-    not usually be calculating day differences with start dates before 28 Feb
-    1900. Note that Excel inherited this "BUG" from LOTUS 1-2-3. """
 
-    day_counter = 0
-    max_days = 0
+@njit(fastmath=True, cache=True)
+def date_to_excel_serial(d, m, y):
+    """ Convert a day, month and year to the Excel serial date. Dates before 1
+    Mar 1900 are shifted back one day as Excel counts 29 Feb 1900, which has
+    the serial 60 so that this is the inverse of excel_serial_to_date. """
 
-    global gDateCounterList
-    global gStartYear
-    global gEndYear
+    if d == 29 and m == 2 and y == 1900:
+        return 60
 
-    gDateCounterList = []
+    if m <= 2:
+        y -= 1
+        mp = m + 9
+    else:
+        mp = m - 3
 
-    idx = -1  # the first element will be idx=0
+    era = y // 400
+    yoe = y - era * 400
+    doy = (153 * mp + 2) // 5 + d - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    serial = era * 146097 + doe - DAYS_FROM_CIVIL_EPOCH
+    serial += EXCEL_SERIAL_OF_UNIX_EPOCH
 
-    for yy in range(1900, gEndYear+1):
+    if serial < 61:
+        serial -= 1
 
-        # DO NOT CHANGE THIS FOR AGREEMENT WITH EXCEL WHICH ASSUMES THAT 1900
-        # WAS A LEAP YEAR AND THAT 29 FEB 1900 ACTUALLY HAPPENED. A LOTUS BUG.
-        if yy == 1900:
-            leap_year = True
-        else:
-            leap_year = is_leap_year(yy)
+    return serial
 
-        for mm in range(1, 13):
+###############################################################################
 
-            if leap_year is True:
-                max_days = monthDaysLeapYear[mm-1]
-            else:
-                max_days = monthDaysNotLeapYear[mm-1]
 
-            for _ in range(1, max_days+1):
-                idx += 1
-                day_counter += 1
-                if yy >= gStartYear:
-                    gDateCounterList.append(day_counter)
+@njit(fastmath=True, cache=True)
+def excel_serial_to_date(serial):
+    """ Reverse mapping from the Excel serial date to a (d, m, y) tuple. The
+    serial 60 is mapped to the non-existent date 29 Feb 1900 as in Excel. """
 
-            for _ in range(max_days, 31):
-                idx += 1
-                if yy >= gStartYear:
-                    gDateCounterList.append(-999)
+    if serial == 60:
+        return (29, 2, 1900)
 
-###############################################################################
-# The index in these functions is not the excel date index used as the
-# internal representation of the date but the index of that date in the
-# padded date object used to store the dates in a way that allows for a
-# quick lookup. Do not confuse them as you will find they are out by months
-###############################################################################
+    if serial < 60:
+        serial += 1
 
+    z = serial - EXCEL_SERIAL_OF_UNIX_EPOCH + DAYS_FROM_CIVIL_EPOCH
+    era = z // 146097
+    doe = z - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
 
-@njit(fastmath=True, cache=True)
-def date_index(d, m, y):
-    idx = (y-gStartYear) * 12 * 31 + (m-1) * 31 + (d-1)
-    return idx
+    d = doy - (153 * mp + 2) // 5 + 1
 
-###############################################################################
+    if mp < 10:
+        m = mp + 3
+    else:
+        m = mp - 9
 
+    y = yoe + era * 400
+    if m <= 2:
+        y += 1
 
-@njit(fastmath=True, cache=True)
-def date_from_index(idx):
-    """ Reverse mapping from index to date. Take care with numba as it can do
-    weird rounding on the integer. Seems OK now. """
-    y = int(gStartYear + idx/12/31)
-    m = 1 + int((idx - (y-gStartYear) * 12 * 31) / 31)
-    d = 1 + idx - (y-gStartYear) * 12 * 31 - (m-1) * 31
     return (d, m, y)
 
 ###############################################################################
@@ -193,16 +191,64 @@ def weekday(day_count):
 
 
 def vectorisation_helper(func):
+    """ Allow a Date to be compared with a list or tuple of Dates, returning
+    a list or tuple of results. Anything that is not a Date, list or tuple is
+    left to the other operand so that a DateArray can handle the operation. """
+
     def wrapper(self_, other):
-        if isinstance(other, Iterable):
+        if isinstance(other, Date):
+            return func(self_, other)
+        if isinstance(other, (list, tuple)):
             # Store the type of other, then cast the output to be the same type
             output_type = type(other)
             f = partial(func, self_)
             return output_type(map(f, other))
-        return func(self_, other)
+        return NotImplemented
     return wrapper
 
 ###############################################################################
+# DATE INTERNING
+###############################################################################
+# As dates are immutable the same Date object can be shared by all of the
+# trades that use it. Interning the payment and fixing dates of a large book
+# means that each distinct date is held in memory only once. Dates made by
+# add_tenor and by schedule generation are interned. The pool is bounded and
+# dates that arrive after it is full are returned unchanged.
+###############################################################################
+
+
+gDateInternPool = {}
+gDateInternPoolSize = 100000
+
+
+def intern_date(dt):
+    """ Return the shared instance of a date from the intern pool, adding the
+    date to the pool if it is not yet there and there is room for it. """
+
+    key = dt._excel_date
+
+    shared_dt = gDateInternPool.get(key)
+    if shared_dt is not None:
+        return shared_dt
+
+    if len(gDateInternPool) < gDateInternPoolSize:
+        gDateInternPool[key] = dt
+
+    return dt
+
+
+def set_date_intern_pool_size(max_size: int):
+    """ Function that sets the maximum number of dates in the intern pool. """
+    global gDateInternPoolSize
+    gDateInternPoolSize = max_size
+
+
+def clear_date_intern_pool():
+    """ Remove all dates from the intern pool. """
+    gDateInternPool.clear()
+
+###############################################################################
+
 
 class Date():
     """ A date class to manage dates that is simple to use and includes a
@@ -216,6 +262,11 @@ class Date():
     SAT = 5
     SUN = 6
 
+    # A Date is immutable so its attributes are held in slots and not in a
+    # per-instance dictionary. This keeps large numbers of dates compact.
+    __slots__ = ('_d', '_m', '_y', '_hh', '_mm', '_ss', '_excel_date',
+                 '_weekday')
+
     ###########################################################################
 
     def __init__(self, d, m, y, hh=0, mm=0, ss=0):
@@ -228,34 +279,17 @@ class Date():
         start_date = Date(1, 1, 2018)
         """
 
-        global gStartYear
-        global gEndYear
-
         # If the date has been entered as y, m, d we flip it to d, m, y
         # This message should be removed after a few releases
-        if d >= gStartYear and d < gEndYear and y > 0 and y <= 31:
+        if d >= 1900 and y > 0 and y <= 31:
             raise FinError(
                 "Date arguments must now be in the order Date(dd, mm, yyyy)")
 
-        if gDateCounterList is None:
-            calculate_list()
-
         if y < 1900:
             raise FinError("Year cannot be before 1900")
 
-        # Resize date list dynamically if required
-        if y < gStartYear:
-            gStartYear = y
-            calculate_list()
-
-        if y > gEndYear:
-            gEndYear = y
-            calculate_list()
-
-        if y < gStartYear or y > gEndYear:
-            raise FinError(
-                "Date: year " + str(y) + " should be " + str(gStartYear) +
-                " to " + str(gEndYear))
+        if m < 1 or m > 12:
+            raise FinError("Date: Month must be 1-12.")
 
         if d < 1:
             raise FinError("Date: Leap year. Day not valid.")
@@ -280,24 +314,22 @@ class Date():
         if ss < 0 or ss > 59:
             raise FinError("Seconds must be in range 0-59")
 
-        self._y = y
-        self._m = m
-        self._d = d
-
-        self._hh = hh
-        self._mm = mm
-        self._ss = ss
-
-        self._excel_date = 0  # This is a float as it includes intraday time
+        excel_date = date_to_excel_serial(d, m, y)
 
-        # update the excel date used for doing lots of financial calculations
-        self._refresh()
+        # This is a float as it includes intraday time
+        dayFraction = hh/24.0
+        dayFraction += mm/24.0/60.0
+        dayFraction += ss/24.0/60.0/60.0
 
-        dayFraction = self._hh/24.0
-        dayFraction += self._mm/24.0/60.0
-        dayFraction += self._ss/24.0/60.0/60.0
-
-        self._excel_date += dayFraction  # This is a float as it includes intraday time
+        set_attr = object.__setattr__
+        set_attr(self, '_y', y)
+        set_attr(self, '_m', m)
+        set_attr(self, '_d', d)
+        set_attr(self, '_hh', hh)
+        set_attr(self, '_mm', mm)
+        set_attr(self, '_ss', ss)
+        set_attr(self, '_excel_date', excel_date + dayFraction)
+        set_attr(self, '_weekday', weekday(excel_date))
 
     ###########################################################################
 
@@ -324,23 +356,41 @@ class Date():
             return cls(d, m, y)
 
         if isinstance(date, np.datetime64):
-            timestamp = ((date - np.datetime64('1970-01-01T00:00:00'))
-                 / np.timedelta64(1, 's'))
+            days = int(date.astype('datetime64[D]').astype(np.int64))
+            serial = days + EXCEL_SERIAL_OF_UNIX_EPOCH
 
-            date = datetime.datetime.utcfromtimestamp(timestamp)
-            d, m, y = date.day, date.month, date.year
+            # Excel counts 29 Feb 1900 so earlier dates move back a day
+            if serial <= 60:
+                serial -= 1
+
+            d, m, y = excel_serial_to_date(serial)
             return cls(d, m, y)
 
     ###########################################################################
-    def _refresh(self):
-        """ Update internal representation of date as number of days since the
-        1st Jan 1900. This is same as Excel convention. """
+    def __setattr__(self, name, value):
+        raise FinError("Date is immutable. Create a new Date instead.")
 
-        idx = date_index(self._d, self._m, self._y)
-        daysSinceFirstJan1900 = gDateCounterList[idx]
-        wd = weekday(daysSinceFirstJan1900)
-        self._excel_date = daysSinceFirstJan1900
-        self._weekday = wd
+    def __delattr__(self, name):
+        raise FinError("Date is immutable. Create a new Date instead.")
+
+    ###########################################################################
+
+    def __reduce__(self):
+        """ Rebuild the date from its constructor arguments when pickling as
+        the slots cannot be set on an immutable object. """
+        return (Date, (self._d, self._m, self._y,
+                       self._hh, self._mm, self._ss))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    ###########################################################################
+
+    def __hash__(self):
+        return hash(self._excel_date)
 
     ###########################################################################
 
@@ -461,18 +511,11 @@ class Date():
         """ Returns a new date that is numDays after the Date. I also make
         it possible to go backwards a number of days. """
 
-        idx = date_index(self._d, self._m, self._y)
-
-        step = +1
-        if numDays < 0:
-            step = -1
-
-        while numDays != 0:
-            idx += step
-            if gDateCounterList[idx] > 0:
-                numDays -= step
+        if int(numDays) != numDays:
+            raise FinError("Number of days must be an integer")
 
-        (d, m, y) = date_from_index(idx)
+        serial = date_to_excel_serial(self._d, self._m, self._y)
+        (d, m, y) = excel_serial_to_date(serial + int(numDays))
         newDt = Date(d, m, y)
         return newDt
 
@@ -820,7 +863,7 @@ class Date():
                 for _ in range(0, abs(num_periods)):
                     newDate = newDate.add_months(math.copysign(12, num_periods))
 
-            newDates.append(newDate)
+            newDates.append(intern_date(newDate))
 
         if listFlag is True:
             return newDates
@@ -0,0 +1,498 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import datetime
+
+from numba import njit
+import numpy as np
+
+from .error import FinError
+from .date import Date, date_to_excel_serial, excel_serial_to_date
+from .date import EXCEL_SERIAL_OF_UNIX_EPOCH
+
+###############################################################################
+# Kernels that work directly on arrays of Excel serial dates. These apply the
+# closed-form conversions in date.py to every element, including the Excel
+# treatment of 29 Feb 1900 as a real date with serial 60.
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _days_in_month(m, y):
+    """ Number of days in month m (1-12) of year y. """
+
+    if m == 2:
+        if (y % 4 == 0 and y % 100 != 0) or (y % 400 == 0):
+            return 29
+        return 28
+    elif m == 4 or m == 6 or m == 9 or m == 11:
+        return 30
+    return 31
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _dmy_to_serials(d, m, y):
+    """ Convert arrays of day, month and year to Excel serial dates. """
+
+    n = len(d)
+    serials = np.empty(n, dtype=np.int32)
+
+    for i in range(0, n):
+        serials[i] = date_to_excel_serial(d[i], m[i], y[i])
+
+    return serials
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _serials_to_dmy(serials):
+    """ Convert an array of Excel serial dates into arrays of day, month and
+    year. """
+
+    n = len(serials)
+    d = np.empty(n, dtype=np.int32)
+    m = np.empty(n, dtype=np.int32)
+    y = np.empty(n, dtype=np.int32)
+
+    for i in range(0, n):
+        d[i], m[i], y[i] = excel_serial_to_date(serials[i])
+
+    return d, m, y
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _add_months(d, m, y, num_months):
+    """ Shift arrays of dates by a number of months per date. If the day of
+    the month does not exist in the new month it is moved back to the end of
+    that month, which is the same rule as Date.add_months. """
+
+    n = len(d)
+    dd = np.empty(n, dtype=np.int32)
+    mm = np.empty(n, dtype=np.int32)
+    yy = np.empty(n, dtype=np.int32)
+
+    for i in range(0, n):
+        months = (m[i] - 1) + num_months[i]
+        yy[i] = y[i] + months // 12
+        mm[i] = months % 12 + 1
+        dd[i] = min(d[i], _days_in_month(mm[i], yy[i]))
+
+    return dd, mm, yy
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _eom_days(m, y):
+    """ Last day of the month for arrays of months and years. """
+
+    n = len(m)
+    days = np.empty(n, dtype=np.int32)
+
+    for i in range(0, n):
+        days[i] = _days_in_month(m[i], y[i])
+
+    return days
+
+###############################################################################
+
+
+def _unix_days_to_serials(days: np.ndarray):
+    """ Convert days since 1 Jan 1970 into Excel serial dates. Dates before
+    1 Mar 1900 are moved back a day as Excel counts 29 Feb 1900 as a date. """
+
+    # The conversion is done in place in a single int32 copy of the days
+    serials = days.astype(np.int32)
+    serials += EXCEL_SERIAL_OF_UNIX_EPOCH
+    serials[serials <= 60] -= 1
+    return serials
+
+###############################################################################
+
+
+def _serials_to_unix_days(serials: np.ndarray):
+    """ Convert Excel serial dates into days since 1 Jan 1970. This is the
+    inverse of _unix_days_to_serials. """
+
+    days = serials.astype(np.int64) - EXCEL_SERIAL_OF_UNIX_EPOCH
+    return np.where(serials <= 60, days + 1, days)
+
+###############################################################################
+
+
+def _parse_tenor(tenor: str):
+    """ Split a tenor string such as '3M' or '-10Y' into a period type and a
+    number of periods. """
+
+    if isinstance(tenor, str) is False:
+        raise FinError("Tenor must be a string e.g. '5Y'")
+
+    ten_str = tenor.upper()
+
+    if ten_str == "ON" or ten_str == "TN":
+        return "D", 1
+
+    period_type = ten_str[-1]
+
+    if period_type not in ("D", "W", "M", "Y"):
+        raise FinError("Unknown tenor type in " + tenor)
+
+    return period_type, int(ten_str[0:-1])
+
+###############################################################################
+
+
+class DateArray():
+    """ A vector of dates held as a NumPy array of integer Excel serial dates.
+    This provides the date arithmetic of the Date class across the whole array
+    at once so that large numbers of dates such as cashflow schedules can be
+    generated without creating one Python object per date. Intraday times are
+    not supported. """
+
+    ###########################################################################
+
+    def __init__(self,
+                 serials: (list, np.ndarray)):
+        """ Create a DateArray from a list or NumPy array of Excel serial dates
+        where 1 Jan 1900 is day 1. Use from_dates or from_dmy to create it
+        from Date objects or from day, month and year arrays. """
+
+        serials = np.asarray(serials)
+
+        if serials.ndim != 1:
+            raise FinError("DateArray serials must be a one-dimensional array")
+
+        if len(serials) > 0 and np.any(serials < 1):
+            raise FinError("DateArray serials must be on or after 1 Jan 1900")
+
+        self._serials = serials.astype(np.int32, copy=False)
+        self._dmy = None
+
+    ###########################################################################
+
+    @classmethod
+    def from_dates(cls,
+                   dates: list):
+        """ Create a DateArray from a list of Date objects. Any intraday time
+        on the dates is dropped. """
+
+        serials = np.empty(len(dates), dtype=np.int32)
+
+        for i, dt in enumerate(dates):
+            if isinstance(dt, Date) is False:
+                raise FinError("DateArray can only be created from Dates")
+            serials[i] = int(dt._excel_date)
+
+        return cls(serials)
+
+    ###########################################################################
+
+    @classmethod
+    def from_dmy(cls,
+                 d: np.ndarray,
+                 m: np.ndarray,
+                 y: np.ndarray):
+        """ Create a DateArray from arrays of day of month, month and year.
+        The argument order follows the Date constructor. """
+
+        d = np.asarray(d, dtype=np.int64)
+        m = np.asarray(m, dtype=np.int64)
+        y = np.asarray(y, dtype=np.int64)
+
+        if len(d) != len(m) or len(d) != len(y):
+            raise FinError("Day, month and year arrays must have same size")
+
+        if np.any(y < 1900):
+            raise FinError("Year cannot be before 1900")
+
+        if np.any(m < 1) or np.any(m > 12):
+            raise FinError("Month must be 1-12")
+
+        if np.any(d < 1) or np.any(d > _eom_days(m, y)):
+            raise FinError("Day not valid for month")
+
+        obj = cls(_dmy_to_serials(d, m, y))
+        obj._dmy = (d.astype(np.int32), m.astype(np.int32),
+                    y.astype(np.int32))
+        return obj
+
+    ###########################################################################
+
+    @classmethod
+    def from_datetime64(cls,
+                        dates: np.ndarray):
+        """ Create a DateArray from a NumPy datetime64 array such as a Pandas
+        date column. Arrays with a unit of days are read through an integer
+        view and converted into a single new array of int32 serials. Arrays
+        with a finer unit are first floored to the day which needs one more
+        copy. """
+
+        dates = np.asarray(dates)
+
+        if np.issubdtype(dates.dtype, np.datetime64) is False:
+            raise FinError("Dates must be a NumPy datetime64 array")
+
+        if np.any(np.isnat(dates)):
+            raise FinError("Dates cannot contain NaT")
+
+        if dates.dtype != np.dtype("datetime64[D]"):
+            dates = dates.astype("datetime64[D]")
+
+        return cls(_unix_days_to_serials(dates.view(np.int64)))
+
+    ###########################################################################
+
+    @classmethod
+    def from_strings(cls,
+                     date_strings: (list, np.ndarray),
+                     format_string: str = None):
+        """ Create a DateArray from a list or array of date strings. ISO dates
+        such as '2023-11-20' are parsed in a single vectorised NumPy call.
+        Other layouts can be given as a format_string as used by
+        Date.from_string and are parsed without creating Date objects. """
+
+        if format_string is None:
+            try:
+                dates = np.asarray(date_strings).astype("datetime64[D]")
+            except ValueError:
+                raise FinError("Date strings must be ISO dates YYYY-MM-DD")
+            return cls.from_datetime64(dates)
+
+        d = np.empty(len(date_strings), dtype=np.int64)
+        m = np.empty(len(date_strings), dtype=np.int64)
+        y = np.empty(len(date_strings), dtype=np.int64)
+
+        for i, date_string in enumerate(date_strings):
+            dt = datetime.datetime.strptime(date_string, format_string)
+            d[i], m[i], y[i] = dt.day, dt.month, dt.year
+
+        return cls.from_dmy(d, m, y)
+
+    ###########################################################################
+
+    def to_datetime64(self):
+        """ Returns the dates as a NumPy datetime64[D] array which can be put
+        straight into a Pandas dataframe. """
+
+        return _serials_to_unix_days(self._serials).view("datetime64[D]")
+
+    ###########################################################################
+
+    def to_dates(self):
+        """ Returns the dates as a list of Date objects. """
+
+        d, m, y = self._get_dmy()
+        return [Date(int(d[i]), int(m[i]), int(y[i]))
+                for i in range(0, len(self._serials))]
+
+    ###########################################################################
+
+    def _get_dmy(self):
+        """ Day, month and year arrays are calculated lazily and cached as the
+        array is immutable. """
+
+        if self._dmy is None:
+            self._dmy = _serials_to_dmy(self._serials)
+
+        return self._dmy
+
+    ###########################################################################
+
+    @property
+    def serials(self):
+        """ The Excel serial dates. The returned array is read-only. """
+        serials = self._serials.view()
+        serials.flags.writeable = False
+        return serials
+
+    @property
+    def day(self):
+        return self._get_dmy()[0]
+
+    @property
+    def month(self):
+        return self._get_dmy()[1]
+
+    @property
+    def year(self):
+        return self._get_dmy()[2]
+
+    @property
+    def weekday(self):
+        """ Day of week of each date where Monday is 0 and Sunday is 6 in
+        agreement with Date.MON to Date.SUN. """
+        return (self._serials + 5) % 7
+
+    ###########################################################################
+
+    def is_weekend(self):
+        """ Returns a boolean array which is True where a date falls on a
+        weekend. """
+
+        return self.weekday >= Date.SAT
+
+    ###########################################################################
+
+    def is_eom(self):
+        """ Returns a boolean array which is True where a date falls on a
+        month end. """
+
+        d, m, y = self._get_dmy()
+        return d == _eom_days(m, y)
+
+    ###########################################################################
+
+    def eom(self):
+        """ Returns a DateArray of the last date of the month of each date. """
+
+        _, m, y = self._get_dmy()
+        return DateArray.from_dmy(_eom_days(m, y), m, y)
+
+    ###########################################################################
+
+    def add_days(self,
+                 num_days: (int, np.ndarray)):
+        """ Returns a new DateArray with every date moved num_days forward. The
+        number of days can also be an array with one value per date. Use a
+        negative number of days to go backwards. """
+
+        num_days = np.asarray(num_days)
+
+        if np.any(num_days != np.round(num_days)):
+            raise FinError("Number of days must be an integer")
+
+        return DateArray(self._serials + num_days.astype(np.int32))
+
+    ###########################################################################
+
+    def add_months(self,
+                   num_months: (int, np.ndarray)):
+        """ Returns a new DateArray with every date moved num_months forward.
+        The number of months can also be an array with one value per date. If
+        the day does not exist in the new month it is moved back to the end
+        of the month, as in Date.add_months. """
+
+        num_months = np.asarray(num_months)
+
+        if np.any(num_months != np.round(num_months)):
+            raise FinError("Must only pass integers or float integers.")
+
+        num_months = np.broadcast_to(num_months.astype(np.int64),
+                                     self._serials.shape)
+
+        d, m, y = self._get_dmy()
+        dd, mm, yy = _add_months(d, m, y, num_months)
+        return DateArray.from_dmy(dd, mm, yy)
+
+    ###########################################################################
+
+    def add_years(self,
+                  num_years: (int, np.ndarray)):
+        """ Returns a new DateArray with every date moved a whole number of
+        years forward. """
+
+        return self.add_months(np.asarray(num_years) * 12)
+
+    ###########################################################################
+
+    def add_tenor(self,
+                  tenor: str):
+        """ Returns a new DateArray with every date moved by a tenor given as
+        a string consisting of a number and one of the letters d, w, m or y.
+        The dates are not calendar adjusted. Years are added one at a time so
+        that the result agrees with Date.add_tenor around leap years. """
+
+        period_type, num_periods = _parse_tenor(tenor)
+
+        if period_type == "D":
+            return self.add_days(num_periods)
+        elif period_type == "W":
+            return self.add_days(7 * num_periods)
+        elif period_type == "M":
+            return self.add_months(num_periods)
+
+        step = 12 if num_periods >= 0 else -12
+        new_dates = self
+        for _ in range(0, abs(num_periods)):
+            new_dates = new_dates.add_months(step)
+
+        return new_dates
+
+    ###########################################################################
+
+    def _other_serials(self, other):
+        """ Serial dates of the other operand in a comparison. """
+
+        if isinstance(other, DateArray):
+            return other._serials
+        elif isinstance(other, Date):
+            return other._excel_date
+        elif isinstance(other, list):
+            return DateArray.from_dates(other)._serials
+
+        raise FinError("Cannot compare DateArray with " + str(type(other)))
+
+    def __eq__(self, other):
+        return self._serials == self._other_serials(other)
+
+    def __ne__(self, other):
+        return self._serials != self._other_serials(other)
+
+    def __lt__(self, other):
+        return self._serials < self._other_serials(other)
+
+    def __le__(self, other):
+        return self._serials <= self._other_serials(other)
+
+    def __gt__(self, other):
+        return self._serials > self._other_serials(other)
+
+    def __ge__(self, other):
+        return self._serials >= self._other_serials(other)
+
+    def __sub__(self, other):
+        """ Number of days between each pair of dates. """
+        return self._serials - self._other_serials(other)
+
+    def __rsub__(self, other):
+        return self._other_serials(other) - self._serials
+
+    # Equality is elementwise so a DateArray cannot be hashed
+    __hash__ = None
+
+    ###########################################################################
+
+    def __len__(self):
+        return len(self._serials)
+
+    def __getitem__(self, key):
+        """ Integer indexing returns a Date, slicing returns a DateArray. """
+
+        if isinstance(key, (int, np.integer)):
+            d, m, y = self._get_dmy()
+            return Date(int(d[key]), int(m[key]), int(y[key]))
+
+        return DateArray(self._serials[key])
+
+    def __iter__(self):
+        d, m, y = self._get_dmy()
+        for i in range(0, len(self._serials)):
+            yield Date(int(d[i]), int(m[i]), int(y[i]))
+
+    ###########################################################################
+
+    def __repr__(self):
+        return "DateArray(" + str(self.to_dates()) + ")"
+
+    ###########################################################################
+
+    def _print(self):
+        print(self)
+
+###############################################################################
@@ -2,11 +2,16 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
+from numba import njit
+import numpy as np
+
 from .date import Date, monthDaysLeapYear, monthDaysNotLeapYear, datediff
-from .date import is_leap_year
+from .date import is_leap_year, date_to_excel_serial
+from .date_array import DateArray
 from .error import FinError
 from .frequency import FrequencyTypes, annual_frequency
 from .global_vars import gDaysInYear
+from .calendar import Calendar, CalendarTypes
 
 from enum import Enum
 
@@ -42,6 +47,8 @@ def is_last_day_of_feb(dt: Date):
 #    ACT_365F = 7  # Denominator is always Fixed at 365, even in a leap year
 #    ACT_360 = 8
 #    ACT_365L = 9  # the 29 Feb is counted if it is in the date range
+#    BUS_252 = 11  # Business days in the period divided by 252 (Brazil)
+#                  # using the holidays of the calendar passed to DayCount
 ###############################################################################
 
 
@@ -57,6 +64,170 @@ class DayCountTypes(Enum):
     ACT_360 = 8
     ACT_365L = 9
     SIMPLE = 10  # actual divided by gDaysInYear
+    BUS_252 = 11  # business days divided by 252
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _is_leap(y):
+    return (y % 4 == 0 and y % 100 != 0) or (y % 400 == 0)
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _is_last_day_of_feb(d, m, y):
+    if m != 2:
+        return False
+    if _is_leap(y):
+        return d == 29
+    return d == 28
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _year_fracs(dc_type,
+                d1, m1, y1, t1,  # Start of period day, month, year and serial
+                d2, m2, y2, t2,  # End of period day, month, year and serial
+                y3, t3,  # Year and serial of end of coupon period
+                freq,  # Annual frequency
+                is_termination_date):
+    """ Vectorised year fractions for arrays of start and end dates. This
+    follows the scalar DayCount.year_frac exactly for every day count type
+    except BUS_252 which needs a calendar. The dc_type is the value of the
+    DayCountTypes enum and the serials t1, t2 and t3 include intraday time. """
+
+    n = len(t1)
+    acc_factors = np.empty(n)
+    nums = np.empty(n)
+    dens = np.empty(n)
+
+    for i in range(0, n):
+
+        dd1 = d1[i]
+        mm1 = m1[i]
+        dd2 = d2[i]
+        mm2 = m2[i]
+
+        num = 0.0
+        den = 0.0
+        acc_factor = 0.0
+
+        if dc_type == 1 or dc_type == 2 or dc_type == 3 or dc_type == 4:
+
+            if dd1 == 31:
+                dd1 = 30
+
+            if dc_type == 1:  # THIRTY_360_BOND
+                if dd2 == 31 and dd1 == 30:
+                    dd2 = 30
+            elif dc_type == 2:  # THIRTY_E_360
+                if dd2 == 31:
+                    dd2 = 30
+            elif dc_type == 3:  # THIRTY_E_360_ISDA
+                if _is_last_day_of_feb(d1[i], m1[i], y1[i]):
+                    dd1 = 30
+                if dd2 == 31:
+                    dd2 = 30
+                if _is_last_day_of_feb(d2[i], m2[i], y2[i]) and \
+                        not is_termination_date:
+                    dd2 = 30
+            else:  # THIRTY_E_PLUS_360
+                if dd2 == 31:
+                    mm2 = mm2 + 1
+                    dd2 = 1
+
+            num = 360 * (y2[i] - y1[i]) + 30 * (mm2 - mm1) + (dd2 - dd1)
+            den = 360.0
+            acc_factor = num / den
+
+        elif dc_type == 5 or dc_type == 0:  # ACT_ACT_ISDA or ZERO
+
+            denom1 = 366.0 if _is_leap(y1[i]) else 365.0
+            denom2 = 366.0 if _is_leap(y2[i]) else 365.0
+
+            if y1[i] == y2[i]:
+                num = t2[i] - t1[i]
+                den = denom1
+                acc_factor = num / denom1
+            else:
+                start_next_year = date_to_excel_serial(1, 1, y1[i] + 1)
+                start_end_year = date_to_excel_serial(1, 1, y2[i])
+                days_year1 = int(start_next_year - t1[i])
+                days_year2 = int(t2[i] - start_end_year)
+                num = days_year1 + days_year2
+                den = denom1 + denom2
+                acc_factor = days_year1 / denom1 + days_year2 / denom2 + \
+                    (y2[i] - y1[i] - 1.0)
+
+        elif dc_type == 6:  # ACT_ACT_ICMA
+
+            num = t2[i] - t1[i]
+            den = freq * (t3[i] - t1[i])
+            acc_factor = num / den
+
+        elif dc_type == 7:  # ACT_365F
+
+            num = t2[i] - t1[i]
+            den = 365.0
+            acc_factor = num / den
+
+        elif dc_type == 8:  # ACT_360
+
+            num = t2[i] - t1[i]
+            den = 360.0
+            acc_factor = num / den
+
+        elif dc_type == 9:  # ACT_365L
+
+            num = t2[i] - t1[i]
+            den = 365.0
+
+            if freq == 1:
+                if _is_leap(y1[i]):
+                    feb29 = date_to_excel_serial(29, 2, y1[i])
+                elif _is_leap(y3[i]):
+                    feb29 = date_to_excel_serial(29, 2, y3[i])
+                else:
+                    feb29 = 1
+                if feb29 > t1[i] and feb29 <= t3[i]:
+                    den = 366.0
+            else:
+                if _is_leap(y3[i]):
+                    den = 366.0
+
+            acc_factor = num / den
+
+        elif dc_type == 10:  # SIMPLE
+
+            num = t2[i] - t1[i]
+            den = gDaysInYear
+            acc_factor = num / den
+
+        acc_factors[i] = acc_factor
+        nums[i] = num
+        dens[i] = den
+
+    return acc_factors, nums, dens
+
+###############################################################################
+
+
+def _date_fields(dt, n):
+    """ Arrays of day, month, year and serial (including intraday time) for a
+    Date or a DateArray, broadcast to size n. """
+
+    if isinstance(dt, DateArray):
+        ones = np.ones(n, dtype=np.int64)
+        return (dt.day * ones, dt.month * ones, dt.year * ones,
+                dt.serials * np.ones(n))
+
+    return (np.full(n, dt._d, dtype=np.int64),
+            np.full(n, dt._m, dtype=np.int64),
+            np.full(n, dt._y, dtype=np.int64),
+            np.full(n, dt._excel_date))
 
 ###############################################################################
 
@@ -66,20 +237,28 @@ class DayCount:
     specified day count convention. """
 
     def __init__(self,
-                 dccType: DayCountTypes):
-        """ Create Day Count convention by passing in the Day Count Type. """
+                 dccType: DayCountTypes,
+                 cal_type: CalendarTypes = None):
+        """ Create Day Count convention by passing in the Day Count Type. The
+        calendar type is only used by BUS_252 to count business days and it
+        must be given for BUS_252. There is no Brazilian calendar in
+        CalendarTypes so the holidays of the calendar passed in are used. """
 
         if dccType not in DayCountTypes:
             raise FinError("Need to pass FinDayCountType")
 
+        if dccType == DayCountTypes.BUS_252 and cal_type is None:
+            raise FinError("BUS_252 day count needs a calendar type")
+
         self._type = dccType
+        self._cal_type = cal_type
 
 ###############################################################################
 
     def year_frac(self,
-                  dt1: Date,  # Start of coupon period
-                  dt2: Date,  # Settlement (for bonds) or period end(swaps)
-                  dt3: Date = None,  # End of coupon period for accrued
+                  dt1: (Date, DateArray),  # Start of coupon period
+                  dt2: (Date, DateArray),  # Settlement or period end(swaps)
+                  dt3: (Date, DateArray) = None,  # End of coupon period
                   freq_type: FrequencyTypes = FrequencyTypes.ANNUAL,
                   isTerminationDate: bool = False):  # Is dt2 a termination date
         """ This method performs two functions:
@@ -104,8 +283,17 @@ class DayCount:
         https://en.wikipedia.org/wiki/Day_count_convention
         and
         http://data.cbonds.info/files/cbondscalc/Calculator.pdf
+
+        If any of the dates is a DateArray then the year fractions for all of
+        the dates are calculated in one call and the accrual factors, the
+        numerators and the denominators are returned as arrays.
         """
 
+        if isinstance(dt1, DateArray) or isinstance(dt2, DateArray) or \
+                isinstance(dt3, DateArray):
+            return self._year_fracs(dt1, dt2, dt3, freq_type,
+                                    isTerminationDate)
+
         d1 = dt1._d
         m1 = dt1._m
         y1 = dt1._y
@@ -282,11 +470,70 @@ class DayCount:
             acc_factor = num / den
             return (acc_factor, num, den)
 
+        elif self._type == DayCountTypes.BUS_252:
+
+            # Business days from dt1 (inclusive) to dt2 (exclusive) as used
+            # for Brazilian interest rate products
+            calendar = Calendar(self._cal_type)
+            num = calendar.business_days_between(dt1, dt2)
+            den = 252
+            acc_factor = num / den
+            return (acc_factor, num, den)
+
         else:
 
             raise FinError(str(self._type) +
                            " is not one of DayCountTypes")
 
+###############################################################################
+
+    def _year_fracs(self,
+                    dt1: (Date, DateArray),
+                    dt2: (Date, DateArray),
+                    dt3: (Date, DateArray),
+                    freq_type: FrequencyTypes,
+                    isTerminationDate: bool):
+        """ Vectorised year fractions for dates held in DateArrays. """
+
+        n = max([len(dt) for dt in (dt1, dt2, dt3)
+                 if isinstance(dt, DateArray)])
+
+        for dt in (dt1, dt2, dt3):
+            if isinstance(dt, DateArray) and len(dt) != n:
+                raise FinError("DateArrays must all have the same size")
+
+        if self._type == DayCountTypes.BUS_252:
+            calendar = Calendar(self._cal_type)
+            num = calendar.business_days_between(dt1, dt2) * np.ones(n)
+            den = np.full(n, 252.0)
+            return (num / den, num, den)
+
+        freq = annual_frequency(freq_type)
+
+        if self._type == DayCountTypes.ACT_ACT_ICMA:
+            if dt3 is None or freq is None:
+                raise FinError("ACT_ACT_ICMA requires three dates and a freq")
+
+        if self._type == DayCountTypes.ACT_365L and dt3 is None:
+            if freq == 1:
+                raise FinError("ACT_365L with annual freq requires three dates")
+            dt3 = dt2
+
+        d1, m1, y1, t1 = _date_fields(dt1, n)
+        d2, m2, y2, t2 = _date_fields(dt2, n)
+
+        if dt3 is None:
+            y3, t3 = y2, t2
+        else:
+            _, _, y3, t3 = _date_fields(dt3, n)
+
+        return _year_fracs(self._type.value,
+                           d1, m1, y1, t1,
+                           d2, m2, y2, t2,
+                           y3, t3,
+                           freq,
+                           isTerminationDate)
+
 ###############################################################################
 
     def __repr__(self):
@@ -77,6 +77,7 @@ class FinSolverTypes(Enum):
     CONJUGATE_GRADIENT = 0
     NELDER_MEAD = 1
     NELDER_MEAD_NUMBA = 2
+    LEVENBERG_MARQUARDT = 3
 
 
 ###############################################################################
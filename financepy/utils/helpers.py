@@ -3,12 +3,16 @@
 ##############################################################################
 
 import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
+from collections import OrderedDict
 from numba import njit, float64
-from typing import Union
+from typing import Union, ForwardRef
 from prettytable import PrettyTable
 
 from .date import Date
+from .date_array import DateArray
 from .global_vars import gDaysInYear, gSmall
 from .error import FinError
 from .day_count import DayCountTypes, DayCount
@@ -78,50 +82,225 @@ def pv01_times(t: float,
 ###############################################################################
 
 
-def times_from_dates(dt: (Date, list),
+class LRUCache:
+    """ A bounded least recently used cache. Once it holds max_size entries
+    adding a new entry removes the entry that was used least recently. The
+    cache can be shared between threads. """
+
+    def __init__(self,
+                 max_size: int = 10000):
+        """ Create a cache that holds up to max_size entries. A size of zero
+        switches caching off. """
+
+        self._max_size = max_size
+        self._entries = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    ###########################################################################
+
+    def _entry_size(self, key, entry):
+        """ The amount of the maximum size that is used by an entry. """
+
+        return 1
+
+    ###########################################################################
+
+    def _remove_oldest(self, max_size):
+        """ Remove the least recently used entries until the cache is no
+        larger than max_size. """
+
+        while self._size > max_size and len(self._entries) > 0:
+            key, entry = self._entries.popitem(last=False)
+            self._size -= self._entry_size(key, entry)
+
+    ###########################################################################
+
+    def get(self, key):
+        """ Return the cached entry for the key or None if there is none. """
+
+        with self._lock:
+
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self._misses += 1
+                return None
+
+            self._hits += 1
+            self._entries.move_to_end(key)
+            return entry
+
+    ###########################################################################
+
+    def put(self, key, entry):
+        """ Add an entry, removing the least recently used if full. """
+
+        with self._lock:
+
+            if self._max_size <= 0:
+                return
+
+            old_entry = self._entries.pop(key, None)
+            if old_entry is not None:
+                self._size -= self._entry_size(key, old_entry)
+
+            self._entries[key] = entry
+            self._size += self._entry_size(key, entry)
+            self._remove_oldest(self._max_size)
+
+    ###########################################################################
+
+    def clear(self):
+        """ Remove all entries and reset the hit and miss counters. """
+
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self._hits = 0
+            self._misses = 0
+
+    ###########################################################################
+
+    def set_max_size(self,
+                     max_size: int):
+        """ Change the maximum size of the cache. """
+
+        with self._lock:
+            self._max_size = max_size
+            self._remove_oldest(max(max_size, 0))
+
+    ###########################################################################
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def misses(self):
+        return self._misses
+
+    def __len__(self):
+        return len(self._entries)
+
+    ###########################################################################
+
+    def __repr__(self):
+        s = label_to_string("OBJECT TYPE", type(self).__name__)
+        s += label_to_string("MAX SIZE", self._max_size)
+        s += label_to_string("SIZE", len(self._entries))
+        s += label_to_string("HITS", self._hits)
+        s += label_to_string("MISSES", self._misses, "")
+        return s
+
+###############################################################################
+
+
+class TimesCache(LRUCache):
+    """ A least recently used cache of the times returned by times_from_dates.
+    One entry can hold the times of a long vector of dates so the cache is
+    bounded by the total number of bytes of its keys and times rather than by
+    its number of entries. """
+
+    def __init__(self,
+                 max_bytes: int = 64 * 1024 * 1024):
+        """ Create a cache that holds up to max_bytes of dates and times. A
+        size of zero switches caching off. """
+
+        super().__init__(max_bytes)
+
+    ###########################################################################
+
+    def _entry_size(self, key, entry):
+        """ The number of bytes of the serial dates and the times. """
+
+        return len(key[2]) + entry.nbytes
+
+###############################################################################
+
+
+gTimesCache = TimesCache()
+
+###############################################################################
+
+
+def times_from_dates(dt: (Date, list, tuple, DateArray, np.ndarray),
                      value_date: Date,
-                     day_count_type: DayCountTypes = None):
+                     day_count_type: DayCountTypes = None,
+                     use_cache: bool = True):
     """ If a single date is passed in then return the year from valuation date
     but if a whole vector of dates is passed in then convert to a vector of
     times from the valuation date. The output is always a numpy vector of times
-    which has only one element if the input is only one date. """
+    which has only one element if the input is only one date. A vector of
+    dates can be a list or tuple of Dates, a DateArray or a NumPy int32 array
+    of Excel serial dates as held by a DateArray and all of its times are
+    calculated in one vectorised pass. Results for vectors of dates are
+    memoised in gTimesCache on the valuation date, day count and dates unless
+    use_cache is False. """
 
     if isinstance(value_date, Date) is False:
         raise FinError("Valuation date is not a Date")
 
-    if day_count_type is None:
-        dcCounter = None
-    else:
-        dcCounter = DayCount(day_count_type)
-
+    # A single date is quicker to calculate than to look up
     if isinstance(dt, Date):
-        num_dates = 1
-        times = [None]
-        if dcCounter is None:
-            times[0] = (dt - value_date) / gDaysInYear
+        if day_count_type is None:
+            return (dt - value_date) / gDaysInYear
         else:
-            times[0] = dcCounter.year_frac(value_date, dt)[0]
+            return DayCount(day_count_type).year_frac(value_date, dt)[0]
 
-        return times[0]
+    if isinstance(dt, (list, tuple)) and len(dt) > 0 and \
+            isinstance(dt[0], Date):
+        serials = np.array([x._excel_date for x in dt])
+    elif isinstance(dt, DateArray):
+        serials = dt.serials
+    elif isinstance(dt, np.ndarray):
+        if dt.dtype != np.int32 or dt.ndim != 1:
+            raise FinError("You passed an ndarray instead of dates. Only a "
+                           "vector of int32 Excel serial dates is accepted.")
+        serials = dt
+    else:
+        raise FinError("Discount factor must take dates.")
 
-    elif isinstance(dt, list) and isinstance(dt[0], Date):
-        num_dates = len(dt)
-        times = []
-        for i in range(0, num_dates):
-            if dcCounter is None:
-                t = (dt[i] - value_date) / gDaysInYear
-            else:
-                t = dcCounter.year_frac(value_date, dt[i])[0]
-            times.append(t)
+    key = (value_date._excel_date, day_count_type, serials.tobytes())
 
-        return np.array(times)
+    if use_cache:
+        times = gTimesCache.get(key)
+        if times is not None:
+            return times.copy()
 
-    elif isinstance(dt, np.ndarray):
-        raise FinError("You passed an ndarray instead of dates.")
+    if isinstance(dt, (list, tuple)) and np.any(serials != np.round(serials)):
+        # Dates with an intraday time cannot be held in a DateArray
+        times = np.array([times_from_dates(x, value_date, day_count_type,
+                                           False) for x in dt])
+    elif day_count_type is None:
+        times = (serials - value_date._excel_date) / gDaysInYear
     else:
-        raise FinError("Discount factor must take dates.")
+        dates = dt if isinstance(dt, DateArray) else DateArray(serials)
+        times = DayCount(day_count_type).year_frac(value_date, dates)[0]
 
-    return None
+    if use_cache:
+        gTimesCache.put(key, times.copy())
+
+    return times
+
+###############################################################################
+
+
+def set_times_cache_size(max_bytes: int):
+    """ Set the maximum number of bytes of memoised results of
+    times_from_dates. A size of zero switches the cache off. """
+
+    gTimesCache.set_max_size(max_bytes)
+
+###############################################################################
+
+
+def clear_times_cache():
+    """ Remove all memoised results of times_from_dates. """
+
+    gTimesCache.clear()
 
 ###############################################################################
 
@@ -386,8 +565,16 @@ def format_table(header: (list, tuple),
 ###############################################################################
 
 
-def to_usable_type(t):
-    """ Convert a type such that it can be used with `isinstance` """
+def to_usable_type(t, namespace=None):
+    """ Convert a type such that it can be used with `isinstance`. A class
+    given by name, such as that of a method's own class, is looked up in the
+    namespace. """
+    if isinstance(t, ForwardRef):
+        t = t.__forward_arg__
+
+    if isinstance(t, str) and namespace is not None:
+        return namespace[t]
+
     if hasattr(t, '__origin__'):
         origin = t.__origin__
         # t comes from the `typing` module
@@ -395,13 +582,13 @@ def to_usable_type(t):
             return (list, np.ndarray)
         elif origin is Union:
             types = t.__args__
-            return tuple(to_usable_type(tp) for tp in types)
+            return tuple(to_usable_type(tp, namespace) for tp in types)
     else:
         # t is a normal type
         if t is float:
             return (int, float, np.float64)
         if isinstance(t, tuple):
-            return tuple(to_usable_type(tp) for tp in t)
+            return tuple(to_usable_type(tp, namespace) for tp in t)
 
     return t
 
@@ -502,7 +689,7 @@ def check_argument_types(func, values):
 
         if valueName in values:
             value = values[valueName]
-            usableType = to_usable_type(annotationType)
+            usableType = to_usable_type(annotationType, func.__globals__)
 
         if (not isinstance(value, usableType)):
 
@@ -519,3 +706,25 @@ def check_argument_types(func, values):
             raise FinError("Argument Type Error")
 
 ###############################################################################
+
+
+def parallel_map(func, *iterables, num_processes: int = 1, executor=None):
+    """ Return the list of the values of func at the items of the iterables.
+    These are computed by the executor if one is given. This lets a caller
+    reuse one pool of processes or threads across many calls. Otherwise they
+    are computed in a new pool of num_processes processes if this is more
+    than one, else in turn. A pool is not used for a single item. """
+
+    iterables = [list(items) for items in iterables]
+    n = min(len(items) for items in iterables)
+
+    if n > 1 and executor is not None:
+        return list(executor.map(func, *iterables))
+
+    if n > 1 and num_processes > 1:
+        with ProcessPoolExecutor(max_workers=num_processes) as ex:
+            return list(ex.map(func, *iterables))
+
+    return list(map(func, *iterables))
+
+###############################################################################
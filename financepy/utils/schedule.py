@@ -2,14 +2,15 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
-
 from .error import FinError
-from .date import Date
+from .date import Date, intern_date
 from .calendar import (Calendar, CalendarTypes)
+from .calendar import to_calendar
 from .calendar import (BusDayAdjustTypes, DateGenRuleTypes)
 from .frequency import (annual_frequency, FrequencyTypes)
 from .helpers import label_to_string
 from .helpers import check_argument_types
+from .helpers import LRUCache
 
 
 ###############################################################################
@@ -17,6 +18,21 @@ from .helpers import check_argument_types
 ###############################################################################
 
 
+class ScheduleCache(LRUCache):
+    """ A bounded least recently used cache of generated schedules. Books of
+    swaps, bonds and CDS often contain many trades with identical terms and
+    so identical schedules. The cache is keyed on the terms that determine the
+    schedule and holds the adjusted dates as a tuple which is shared between
+    schedules. This is safe as dates are immutable. """
+
+###############################################################################
+
+
+gScheduleCache = ScheduleCache()
+
+###############################################################################
+
+
 class Schedule:
     """ A schedule is a set of dates generated according to ISDA standard
     rules which starts on the next date after the effective date and runs up to
@@ -29,7 +45,7 @@ class Schedule:
                  # This is UNADJUSTED (set flag to adjust it)
                  termination_date: Date,
                  freq_type: FrequencyTypes = FrequencyTypes.ANNUAL,
-                 cal_type: CalendarTypes = CalendarTypes.WEEKEND,
+                 cal_type: (CalendarTypes, Calendar) = CalendarTypes.WEEKEND,
                  bd_type: BusDayAdjustTypes = BusDayAdjustTypes.FOLLOWING,
                  dg_type: DateGenRuleTypes = DateGenRuleTypes.BACKWARD,
                  adjust_termination_date: bool = True,  # Default is to adjust
@@ -118,7 +134,8 @@ class Schedule:
     ###########################################################################
 
     def schedule_dates(self):
-        """ Returns a list of the schedule of Dates. """
+        """ Returns the schedule of Dates as a tuple that is shared with all
+        schedules with the same terms. """
 
         if self._adjusted_dates is None:
             self._generate()
@@ -130,9 +147,40 @@ class Schedule:
     def _generate(self):
         """ Generate schedule of dates according to specified date generation
         rules and also adjust these dates for holidays according to the
-        specified business day convention and the specified calendar. """
+        specified business day convention and the specified calendar. Dates
+        are taken from the schedule cache if a schedule with the same terms
+        has already been generated. """
+
+        key = (self._effective_date,
+               self._termination_date,
+               self._freq_type,
+               to_calendar(self._cal_type)._calendar_key(),
+               self._bd_type,
+               self._dg_type,
+               self._adjust_termination_date,
+               self._end_of_month)
+
+        entry = gScheduleCache.get(key)
+
+        if entry is None:
+            self._generate_dates()
+            entry = (tuple([intern_date(dt) for dt in self._adjusted_dates]),
+                     intern_date(self._termination_date))
+            gScheduleCache.put(key, entry)
+        else:
+            self._termination_date = entry[1]
+
+        # The tuple of dates is shared with the cache and all other schedules
+        # with the same terms so it must not be modified by callers
+        self._adjusted_dates = entry[0]
+        return self._adjusted_dates
+
+    ###########################################################################
+
+    def _generate_dates(self):
+        """ Generate the adjusted schedule dates from the schedule terms. """
 
-        calendar = Calendar(self._cal_type)
+        calendar = to_calendar(self._cal_type)
         frequency = annual_frequency(self._freq_type)
         num_months = int(12 / frequency)
 
@@ -0,0 +1,134 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+from numba import njit
+
+from .error import FinError
+
+###############################################################################
+# The steps are not compiled with fastmath as a failed step has an infinite
+# cost. The driver levenberg_marquardt is not cached by Numba as its compiled
+# code depends on the residual function which is passed to it.
+###############################################################################
+
+LM_LAMBDA_INIT = 1e-3
+LM_LAMBDA_MIN = 1e-12
+LM_LAMBDA_MAX = 1e12
+
+###############################################################################
+
+
+@njit(cache=True)
+def lm_step(res, jac, lam):
+    """ Return the Levenberg-Marquardt step for a vector of residuals and their
+    Jacobian matrix. This solves the Gauss-Newton equations with a damping
+    term equal to lam times the diagonal of J'J. """
+
+    n = jac.shape[1]
+
+    jtj = jac.T @ jac
+    grad = jac.T @ res
+
+    for i in range(0, n):
+        jtj[i, i] += lam * max(jtj[i, i], 1e-12)
+
+    return np.linalg.solve(jtj, -grad)
+
+###############################################################################
+
+
+@njit(cache=True)
+def lm_converged(cost, cost_new, step, x, tol):
+    """ Return True once the relative fall in the sum of squares of the
+    residuals or the largest relative change in x is below tol. """
+
+    if cost - cost_new <= tol * cost:
+        return True
+
+    return np.max(np.abs(step)) <= tol * (1.0 + np.max(np.abs(x)))
+
+###############################################################################
+
+
+@njit
+def _call(fun, x, args):
+    """ Call fun with the arguments unpacked. This cannot be done inside a try
+    block in compiled code. """
+
+    return fun(x, *args)
+
+###############################################################################
+
+
+@njit
+def levenberg_marquardt(fun, x0, args=(), tol=1e-10, max_iter=200):
+    """ Return the x which minimises the sum of squares of the residuals
+    returned by fun(x, *args), together with the number of evaluations of fun.
+    This must return the vector of residuals and their Jacobian matrix with
+    respect to x. A step at which fun raises is rejected. A FinError is raised
+    if the Jacobian is zero at x0 or if no step reduces the sum of squares, so
+    that the caller can fall back to another method. """
+
+    x = x0.copy()
+    res, jac = _call(fun, x, args)
+    cost = np.dot(res, res)
+    num_evals = 1
+
+    if cost == 0.0:
+        return x, num_evals
+
+    if not np.any(jac):
+        raise FinError("Jacobian is zero at the initial guess")
+
+    lam = LM_LAMBDA_INIT
+    num_steps = 0
+
+    for _ in range(0, max_iter):
+
+        accepted = False
+
+        while lam < LM_LAMBDA_MAX:
+
+            step = lm_step(res, jac, lam)
+            x_new = x + step
+
+            res_new = res
+            jac_new = jac
+            cost_new = np.inf
+            num_evals += 1
+
+            try:
+                res_new, jac_new = _call(fun, x_new, args)
+                cost_new = np.dot(res_new, res_new)
+            except Exception:
+                pass
+
+            if cost_new < cost:
+                accepted = True
+                break
+
+            lam = lam * 10.0
+
+        if accepted is False:
+            break
+
+        converged = lm_converged(cost, cost_new, step, x, tol)
+
+        x = x_new
+        res = res_new
+        jac = jac_new
+        cost = cost_new
+        lam = max(lam / 10.0, LM_LAMBDA_MIN)
+        num_steps += 1
+
+        if converged:
+            break
+
+    if num_steps == 0:
+        raise FinError("No step reduces the sum of squares")
+
+    return x, num_evals
+
+###############################################################################
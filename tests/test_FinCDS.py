@@ -18,6 +18,9 @@ from financepy.products.rates.ibor_swap import IborSwap
 from financepy.market.curves.interpolator import InterpTypes
 from financepy.utils.math import ONE_MILLION
 from financepy.products.credit.cds import CDS
+from financepy.products.credit.cds import _ibor_curve_coeffs
+from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
+from financepy.market.curves.interpolator import _uinterpolate_coeffs
 import time
 import numpy as np
 
@@ -476,3 +479,53 @@ def test_value_approx():
     assert round(v_approx[1], 4) == -187520.0342
     assert round(v_approx[2], 4) == 534.9973
     assert round(v_approx[3], 4) == 44.6327
+
+
+def test_ibor_curve_coeffs():
+    # The coefficients fitted by the Ibor curve are reused
+    ibor_curve = issuer_curve2._libor_curve
+    coeffs, method = _ibor_curve_coeffs(ibor_curve)
+    assert coeffs is ibor_curve._interpolator._coeffs
+    assert method == ibor_curve._interp_type.value
+
+    # They are only fitted for a curve without an interpolator
+    flat_curve = DiscountCurveFlat(value_date2, 0.02)
+    coeffs, method = _ibor_curve_coeffs(flat_curve)
+    assert method == InterpTypes.FLAT_FWD_RATES.value
+    assert abs(_uinterpolate_coeffs(5.0, coeffs, method) -
+               flat_curve._df(5.0)) < 1e-10
+
+    # Read-only coefficients such as those of a stored curve can be used
+    prot_pv = cds_contract2.protection_leg_pv(
+        value_date2, issuer_curve2, cdsRecovery)
+    ibor_curve._interpolator._coeffs.flags.writeable = False
+    try:
+        assert cds_contract2.protection_leg_pv(
+            value_date2, issuer_curve2, cdsRecovery) == prot_pv
+    finally:
+        ibor_curve._interpolator._coeffs = \
+            ibor_curve._interpolator._coeffs.copy()
+
+
+def test_cds_schedule_cache():
+    # CDS with the same terms share their cached payment dates
+    maturity_date = value_date2.next_cds_date(60)
+    cds_a = CDS(value_date2, maturity_date, 0.01)
+    cds_b = CDS(value_date2, maturity_date, 0.05)
+
+    assert cds_a._payment_dates == cds_b._payment_dates
+    assert cds_a._accrual_start_dates == cds_b._accrual_start_dates
+    assert cds_a._accrual_end_dates == cds_b._accrual_end_dates
+    assert all(d1 is d2 for d1, d2 in zip(cds_a._payment_dates,
+                                          cds_b._payment_dates))
+
+    # The lists are copies so they can be changed without affecting the cache
+    assert cds_a._payment_dates is not cds_b._payment_dates
+    cds_a._payment_dates.pop()
+    cds_c = CDS(value_date2, maturity_date, 0.01)
+    assert cds_c._payment_dates == cds_b._payment_dates
+
+    # The cached dates are the same as those generated without the cache
+    cds_b._generate_cds_dates()
+    assert cds_b._payment_dates == cds_c._payment_dates
+    assert cds_b._accrual_end_dates == cds_c._accrual_end_dates
@@ -3,8 +3,11 @@
 ###############################################################################
 
 from financepy.utils.calendar import Calendar, CalendarTypes
+from financepy.utils.calendar import BusDayAdjustTypes
+from financepy.utils.calendar import JointCalendar, JointCalendarTypes
 from financepy.utils.date import set_date_format, DateFormatTypes
 from financepy.utils.date import Date
+from financepy.utils.date_array import DateArray
 import sys
 
 # Between 3rd of January 2020 and 3rd of January 2030
@@ -36,3 +39,65 @@ def test_add_business_day():
 
         assert cal.add_business_days(start, num_days) == end, \
             f"Landed on incorrect business day using {cal_type}"
+
+
+def test_date_array_business_days():
+    dates = DateArray.from_dates([Date(24, 12, 2021), Date(25, 12, 2021),
+                                  Date(27, 12, 2021), Date(29, 4, 2022)])
+    cal = Calendar(CalendarTypes.UNITED_KINGDOM)
+
+    assert list(cal.is_business_day(dates)) == \
+        [cal.is_business_day(dt) for dt in dates]
+
+    for bd_type in BusDayAdjustTypes:
+        assert cal.adjust(dates, bd_type).to_dates() == \
+            [cal.adjust(dt, bd_type) for dt in dates]
+
+    assert cal.add_business_days(dates, 3).to_dates() == \
+        [cal.add_business_days(dt, 3) for dt in dates]
+
+
+def test_adjust_outside_bitmap_range():
+    cal = Calendar(CalendarTypes.WEEKEND)
+    assert cal.adjust(Date(5, 1, 2250), BusDayAdjustTypes.FOLLOWING) == \
+        Date(7, 1, 2250)
+
+
+def test_business_days_between():
+    cal = Calendar(CalendarTypes.UNITED_KINGDOM)
+    start = Date(3, 1, 2020)
+    end = Date(3, 1, 2030)
+    num_days = bus_days_in_decade[str(CalendarTypes.UNITED_KINGDOM)]
+
+    # The start date is a business day and the end date is not counted
+    assert cal.business_days_between(start, end) == num_days
+    assert cal.business_days_between(end, start) == -num_days
+
+    ends = DateArray.from_dates([Date(6, 1, 2020), Date(3, 1, 2030)])
+    assert list(cal.business_days_between(start, ends)) == [1, num_days]
+
+
+def test_joint_calendar():
+    uk = Calendar(CalendarTypes.UNITED_KINGDOM)
+    us = Calendar(CalendarTypes.UNITED_STATES)
+
+    union = JointCalendar([CalendarTypes.UNITED_KINGDOM,
+                           CalendarTypes.UNITED_STATES])
+    inter = JointCalendar([CalendarTypes.UNITED_KINGDOM,
+                           CalendarTypes.UNITED_STATES],
+                          JointCalendarTypes.INTERSECTION)
+
+    dt = Date(1, 1, 2021)
+    for _ in range(0, 400):
+        assert union.is_business_day(dt) == \
+            (uk.is_business_day(dt) and us.is_business_day(dt))
+        assert inter.is_business_day(dt) == \
+            (uk.is_business_day(dt) or us.is_business_day(dt))
+        dt = dt.add_days(1)
+
+    # 4 July 2022 is a US holiday and 29 August 2022 is a UK holiday
+    bd_type = BusDayAdjustTypes.FOLLOWING
+    assert union.adjust(Date(4, 7, 2022), bd_type) == Date(5, 7, 2022)
+    assert union.adjust(Date(29, 8, 2022), bd_type) == Date(30, 8, 2022)
+    assert inter.adjust(Date(4, 7, 2022), bd_type) == Date(4, 7, 2022)
+    assert union.add_business_days(Date(1, 7, 2022), 1) == Date(5, 7, 2022)
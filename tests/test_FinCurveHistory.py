@@ -0,0 +1,109 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+
+from financepy.market.curves.interpolator import InterpTypes
+
+from financepy.utils.global_types import SwapTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.date import Date
+from financepy.products.rates.ibor_swap import IborSwap
+from financepy.products.rates.ibor_deposit import IborDeposit
+from financepy.products.rates.ibor_single_curve import IborSingleCurve
+from financepy.products.rates.ois import OIS
+from financepy.products.rates.ois_curve import OISCurve
+from financepy.products.rates.curve_history import build_curve_history
+from financepy.products.rates.curve_history import _build_history_chunk
+
+tenors = ["1Y", "2Y", "3Y", "5Y", "7Y", "10Y"]
+value_dates = [Date(4, 6, 2018).add_weekdays(i) for i in range(0, 6)]
+quotes = np.array([[0.0140, 0.0150, 0.0165, 0.0172, 0.0180, 0.0190, 0.0200]])
+quotes = quotes + 0.0002 * np.arange(0, 6).reshape(-1, 1)
+
+
+def build_ibor_instruments(value_date, quote_vector):
+    settle_date = value_date.add_weekdays(2)
+    depos = [IborDeposit(settle_date, "6M", quote_vector[0],
+                         DayCountTypes.ACT_360)]
+    swaps = [IborSwap(settle_date, tenor, SwapTypes.PAY, rate,
+                      FrequencyTypes.SEMI_ANNUAL, DayCountTypes.THIRTY_E_360)
+             for tenor, rate in zip(tenors, quote_vector[1:])]
+    return depos, [], swaps
+
+
+def build_mixed_ibor_instruments(value_date, quote_vector):
+    # The deposit starts at the value date on some dates and at spot on the
+    # others, where it adds a synthetic deposit pillar
+    depos, fras, swaps = build_ibor_instruments(value_date, quote_vector)
+    if value_date._weekday % 2 == 0:
+        depos = [IborDeposit(value_date, "6M", quote_vector[0],
+                             DayCountTypes.ACT_360)]
+    return depos, fras, swaps
+
+
+def build_ois_instruments(value_date, quote_vector):
+    settle_date = value_date.add_weekdays(2)
+    depos = [IborDeposit(value_date, "1D", quote_vector[0],
+                         DayCountTypes.ACT_360)]
+    swaps = [OIS(settle_date, tenor, SwapTypes.PAY, rate,
+                 FrequencyTypes.ANNUAL, DayCountTypes.ACT_360)
+             for tenor, rate in zip(tenors, quote_vector[1:])]
+    return depos, [], swaps
+
+
+def test_ibor_history():
+    expected = []
+    for value_date, quote_vector in zip(value_dates, quotes):
+        depos, fras, swaps = build_ibor_instruments(value_date, quote_vector)
+        curve = IborSingleCurve(value_date, depos, fras, swaps)
+        expected.append(curve._dfs[1:])
+
+    for num_processes in [1, 2]:
+        times, dfs = build_curve_history(IborSingleCurve, value_dates, quotes,
+                                         build_ibor_instruments,
+                                         num_processes=num_processes)
+        # The deposit settles after the value date so adds a pillar
+        assert dfs.shape == (6, 8)
+        assert times.shape == (6, 8)
+        assert np.max(np.abs(dfs - np.array(expected))) < 1e-9
+
+    times, dfs = build_curve_history(IborSingleCurve, value_dates, quotes,
+                                     build_ibor_instruments,
+                                     global_solve=True)
+    assert np.max(np.abs(dfs - np.array(expected))) < 1e-9
+
+
+def test_ois_history():
+    expected = []
+    for value_date, quote_vector in zip(value_dates, quotes):
+        depos, fras, swaps = build_ois_instruments(value_date, quote_vector)
+        curve = OISCurve(value_date, depos, fras, swaps)
+        expected.append(curve._dfs[1:])
+
+    times, dfs = build_curve_history(OISCurve, value_dates, quotes,
+                                     build_ois_instruments, num_processes=2)
+    assert dfs.shape == (6, 7)
+    assert np.max(np.abs(dfs - np.array(expected))) < 1e-9
+
+
+def test_ibor_history_pillar_change():
+    expected = []
+    for value_date, quote_vector in zip(value_dates, quotes):
+        depos, fras, swaps = build_mixed_ibor_instruments(value_date,
+                                                          quote_vector)
+        curve = IborSingleCurve(value_date, depos, fras, swaps)
+        expected.append(curve._dfs[1:])
+
+    # The pillar count changes from date to date with the same number of
+    # instruments so the warm start must fall back to a cold start
+    assert len(set(len(dfs) for dfs in expected)) == 2
+
+    args = (IborSingleCurve, value_dates, quotes,
+            build_mixed_ibor_instruments, InterpTypes.FLAT_FWD_RATES, False)
+    times, dfs = _build_history_chunk(args)
+
+    for i in range(0, len(value_dates)):
+        assert np.max(np.abs(dfs[i] - expected[i])) < 1e-9
@@ -0,0 +1,133 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+
+from financepy.utils.global_types import SwapTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.date import Date
+from financepy.market.curves.interpolator import InterpTypes
+from financepy.products.rates.ibor_swap import IborSwap
+from financepy.products.rates.ibor_deposit import IborDeposit
+from financepy.products.rates.ibor_future import IborFuture
+from financepy.products.rates.ibor_single_curve import IborSingleCurve
+from financepy.products.rates.ois import OIS
+from financepy.products.rates.ois_curve import OISCurve
+from financepy.products.rates.curve_risk import bucketed_par_dv01
+import financepy.products.rates.curve_risk as curve_risk
+import financepy.products.rates.ibor_single_curve as ibor_single_curve
+
+value_date = Date(6, 6, 2018)
+settle_date = value_date.add_weekdays(2)
+
+
+def build_ibor_curve(bumps, interp_type):
+    depos = [IborDeposit(value_date, "6M", 0.0231 + bumps[0],
+                         DayCountTypes.ACT_360)]
+    fras = [IborFuture(value_date, 3).to_fra(97.35, -0.0015),
+            IborFuture(value_date, 4).to_fra(97.25, -0.0026)]
+    fras[0]._fraRate += bumps[1]
+    fras[1]._fraRate += bumps[2]
+
+    swaps = []
+    swap_rates = [0.0277, 0.0286, 0.0293, 0.0295, 0.0300, 0.0304]
+    for i, tenor in enumerate(["2Y", "3Y", "5Y", "7Y", "10Y", "20Y"]):
+        swap = IborSwap(settle_date, tenor, SwapTypes.PAY,
+                        swap_rates[i] + bumps[i + 3],
+                        FrequencyTypes.SEMI_ANNUAL,
+                        DayCountTypes.THIRTY_E_360)
+        swaps.append(swap)
+
+    # A sequential bootstrap does not refit every instrument with splines
+    global_solve = interp_type != InterpTypes.FLAT_FWD_RATES
+    return IborSingleCurve(value_date, depos, fras, swaps, interp_type,
+                           global_solve=global_solve)
+
+
+def build_ois_curve(bumps):
+    depos = [IborDeposit(value_date, "1D", 0.0140 + bumps[0],
+                         DayCountTypes.ACT_360)]
+
+    swaps = []
+    swap_rates = [0.0150, 0.0165, 0.0172, 0.0180, 0.0190, 0.0200]
+    for i, tenor in enumerate(["1Y", "2Y", "3Y", "5Y", "7Y", "10Y"]):
+        swap = OIS(settle_date, tenor, SwapTypes.PAY,
+                   swap_rates[i] + bumps[i + 1],
+                   FrequencyTypes.ANNUAL, DayCountTypes.ACT_360)
+        swaps.append(swap)
+
+    return OISCurve(value_date, depos, [], swaps)
+
+
+def bumped_dv01(build_curve, num_quotes, trades):
+    """ The bucketed DV01 found by bumping each quote and rebuilding. """
+    dv01 = np.zeros((len(trades), num_quotes))
+
+    for k in range(0, num_quotes):
+        bumps = np.zeros(num_quotes)
+        bumps[k] = 0.0001
+        up_curve = build_curve(bumps)
+        down_curve = build_curve(-bumps)
+        for i, trade in enumerate(trades):
+            dv01[i, k] = (trade.value(value_date, up_curve) -
+                          trade.value(value_date, down_curve)) / 2.0
+
+    return dv01
+
+
+def test_ibor_swap_portfolio():
+    trades = [IborSwap(settle_date, "4Y", SwapTypes.RECEIVE, 0.029,
+                       FrequencyTypes.SEMI_ANNUAL,
+                       DayCountTypes.THIRTY_E_360),
+              IborSwap(settle_date, "15Y", SwapTypes.PAY, 0.031,
+                       FrequencyTypes.SEMI_ANNUAL,
+                       DayCountTypes.THIRTY_E_360, notional=5000000)]
+
+    for interp_type in [InterpTypes.FLAT_FWD_RATES,
+                        InterpTypes.NATCUBIC_ZERO_RATES]:
+
+        def build_curve(bumps):
+            return build_ibor_curve(bumps, interp_type)
+
+        libor_curve = build_curve(np.zeros(9))
+        dv01 = bucketed_par_dv01(trades, value_date, libor_curve)
+        assert dv01.shape == (2, 9)
+
+        expected = bumped_dv01(build_curve, 9, trades)
+        assert np.max(np.abs(dv01 - expected)) < 0.01
+
+
+def test_ois_portfolio():
+    trades = [OIS(settle_date, "4Y", SwapTypes.RECEIVE, 0.018,
+                  FrequencyTypes.ANNUAL, DayCountTypes.ACT_360)]
+
+    ois_curve = build_ois_curve(np.zeros(7))
+    dv01 = bucketed_par_dv01(trades, value_date, ois_curve)
+
+    expected = bumped_dv01(build_ois_curve, 7, trades)
+    assert np.max(np.abs(dv01 - expected)) < 0.001
+
+    # With flat forwards a 4Y swap only has risk to the 3Y and 5Y swaps
+    assert np.all(np.abs(dv01[0, 5:]) < 1e-8)
+    assert dv01[0, 3] < 0.0 and dv01[0, 4] < 0.0
+
+
+def test_calibration_derivatives_computed_once(monkeypatch):
+    trades = [IborSwap(settle_date, "4Y", SwapTypes.RECEIVE, 0.029,
+                       FrequencyTypes.SEMI_ANNUAL,
+                       DayCountTypes.THIRTY_E_360)]
+
+    libor_curve = build_ibor_curve(np.zeros(9), InterpTypes.FLAT_FWD_RATES)
+    expected = bucketed_par_dv01(trades, value_date, libor_curve)
+
+    # Both the Jacobian and the quote derivatives are now kept on the curve
+    def fail(curve):
+        raise AssertionError("Calibration Jacobian was recalculated")
+
+    monkeypatch.setattr(curve_risk, "_calibration_jacobian", fail)
+    monkeypatch.setattr(ibor_single_curve, "_calibration_jacobian", fail)
+
+    dv01 = bucketed_par_dv01(trades, value_date, libor_curve)
+    assert np.max(np.abs(dv01 - expected)) == 0.0
@@ -0,0 +1,116 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+from financepy.utils.date import Date
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.global_types import SwapTypes
+from financepy.products.rates.ibor_deposit import IborDeposit
+from financepy.products.rates.ibor_swap import IborSwap
+from financepy.products.rates.ibor_single_curve import IborSingleCurve
+from financepy.market.curves.interpolator import InterpTypes
+from financepy.market.curves.discount_curve import DiscountCurve
+from financepy.market.curves.curve_store import CurveStore
+
+value_date = Date(6, 6, 2018)
+df_dates = [value_date.add_years(t) for t in [1, 2, 3, 5, 7, 10]]
+df_values = np.array([0.98, 0.955, 0.93, 0.88, 0.83, 0.75])
+test_dates = [value_date.add_months(m) for m in range(1, 140, 7)]
+
+interp_types = [InterpTypes.FLAT_FWD_RATES,
+                InterpTypes.NATCUBIC_ZERO_RATES,
+                InterpTypes.PCHIP_LOG_DISCOUNT]
+
+curves = [DiscountCurve(value_date, df_dates, df_values * (1.0 - 0.01 * i),
+                        interp_type)
+          for i, interp_type in enumerate(interp_types)]
+
+
+def price_in_worker(args):
+    store, i = args
+    return store.curve(i).df(test_dates)
+
+
+def test_shared_memory_store():
+    store = CurveStore(curves)
+
+    try:
+        attached = CurveStore.attach(store.name)
+        assert len(attached) == 3
+
+        for i, curve in enumerate(curves):
+            stored_curve = attached.curve(i)
+            assert stored_curve._value_date == value_date
+            assert stored_curve._interp_type == curve._interp_type
+            assert np.max(np.abs(stored_curve.df(test_dates) -
+                                 curve.df(test_dates))) < 1e-15
+
+        del stored_curve
+        attached.close()
+
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(price_in_worker,
+                                        [(store, i) for i in range(0, 3)]))
+
+        for i, curve in enumerate(curves):
+            assert np.max(np.abs(results[i] - curve.df(test_dates))) < 1e-15
+
+    finally:
+        store.close()
+        store.unlink()
+
+
+def test_memory_mapped_store(tmp_path):
+    filename = str(tmp_path / "curves.dat")
+    store = CurveStore(curves, filename)
+
+    attached = CurveStore.attach(filename)
+    for i, curve in enumerate(curves):
+        assert np.max(np.abs(attached.curve(i).df(test_dates) -
+                             curve.df(test_dates))) < 1e-15
+
+    store.unlink()
+
+
+def test_stored_ibor_curve_swap_value():
+    settle_date = value_date.add_weekdays(2)
+    depos = [IborDeposit(settle_date, "6M", 0.0231, DayCountTypes.ACT_360)]
+    swaps = [IborSwap(settle_date, tenor, SwapTypes.PAY, rate,
+                      FrequencyTypes.SEMI_ANNUAL, DayCountTypes.THIRTY_E_360)
+             for tenor, rate in zip(["2Y", "5Y", "10Y"],
+                                    [0.0277, 0.0293, 0.0300])]
+    libor_curve = IborSingleCurve(value_date, depos, [], swaps)
+
+    swap = IborSwap(settle_date, "7Y", SwapTypes.RECEIVE, 0.0285,
+                    FrequencyTypes.SEMI_ANNUAL, DayCountTypes.THIRTY_E_360)
+
+    store = CurveStore([libor_curve, curves[0]])
+
+    try:
+        stored_curve = store.curve(0)
+        assert stored_curve._dc_type == libor_curve._dc_type
+        assert store.curve(1)._freq_type == FrequencyTypes.CONTINUOUS
+        assert store.curve(1)._dc_type == DayCountTypes.ACT_ACT_ISDA
+
+        v = swap.value(value_date, libor_curve)
+        v_stored = swap.value(value_date, stored_curve)
+        assert abs(v - v_stored) < 1e-8
+
+        # The views into the store cannot be written to
+        with pytest.raises(ValueError):
+            stored_curve._dfs[1] = 0.5
+
+        with pytest.raises(ValueError):
+            stored_curve._interpolator._coeffs[2, 0] = 0.0
+
+        del stored_curve
+
+    finally:
+        store.close()
+        store.unlink()
@@ -5,6 +5,11 @@
 from financepy.utils.frequency import FrequencyTypes
 from financepy.utils.day_count import DayCount, DayCountTypes
 from financepy.utils.date import Date
+from financepy.utils.date_array import DateArray
+from financepy.utils.calendar import CalendarTypes
+from financepy.utils.error import FinError
+import numpy as np
+import pytest
 
 
 start = Date(1, 1, 2019)
@@ -90,3 +95,52 @@ def test_year_frace_SIMPLE():
     answer = day_count.year_frac(start, end, end, finFreq)
 
     assert round(answer[0], 4) == 0.3836
+
+
+def test_year_frace_BUS_252():
+    dc_type = DayCountTypes.BUS_252
+    day_count = DayCount(dc_type, CalendarTypes.WEEKEND)
+    answer = day_count.year_frac(start, end, end, finFreq)
+
+    assert answer[1] == 100
+    assert round(answer[0], 4) == 0.3968
+
+
+def test_BUS_252_needs_calendar():
+    with pytest.raises(FinError):
+        DayCount(DayCountTypes.BUS_252)
+
+
+def test_year_frac_date_array():
+    # Pairs of dates that cover month ends, February and leap years
+    starts = [Date(1, 1, 2019), Date(31, 1, 2019), Date(28, 2, 2019),
+              Date(29, 2, 2020), Date(31, 12, 2019), Date(15, 6, 2023),
+              Date(30, 11, 2021), Date(31, 8, 2024)]
+    ends = [Date(21, 5, 2019), Date(28, 2, 2019), Date(31, 3, 2019),
+            Date(31, 8, 2021), Date(31, 12, 2020), Date(15, 6, 2024),
+            Date(31, 5, 2022), Date(28, 2, 2025)]
+    coupons = [dt.add_years(1) for dt in starts]
+
+    dt1 = DateArray.from_dates(starts)
+    dt2 = DateArray.from_dates(ends)
+    dt3 = DateArray.from_dates(coupons)
+
+    for dc_type in DayCountTypes:
+        day_count = DayCount(dc_type, CalendarTypes.WEEKEND)
+        acc, num, den = day_count.year_frac(dt1, dt2, dt3, finFreq)
+
+        for i in range(0, len(starts)):
+            answer = day_count.year_frac(starts[i], ends[i], coupons[i],
+                                         finFreq)
+            assert abs(acc[i] - answer[0]) < 1e-12
+            assert num[i] == answer[1]
+            assert den[i] == answer[2]
+
+
+def test_year_frac_date_array_scalar_start():
+    day_count = DayCount(DayCountTypes.ACT_360)
+    dt2 = DateArray.from_dates([Date(1, 4, 2019), Date(1, 7, 2019)])
+    acc, num, den = day_count.year_frac(start, dt2)
+
+    assert np.all(num == np.array([90.0, 181.0]))
+    assert np.allclose(acc, num / 360.0)
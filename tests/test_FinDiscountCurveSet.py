@@ -0,0 +1,82 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+from financepy.market.curves.discount_curve import DiscountCurve
+from financepy.market.curves.discount_curve_set import DiscountCurveSet
+from financepy.market.curves.interpolator import InterpTypes
+from financepy.products.rates.ibor_swap import IborSwap
+from financepy.utils.global_types import SwapTypes
+from financepy.utils.date import Date
+from financepy.utils.date_array import DateArray
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.day_count import DayCountTypes
+import numpy as np
+
+
+value_date = Date(1, 1, 2020)
+df_dates = [value_date.add_years(t) for t in [0.5, 1, 2, 3, 5, 7, 10, 20]]
+times = np.array([(dt - value_date) / 365.0 for dt in df_dates])
+bumps = np.linspace(-0.01, 0.02, 7).reshape(-1, 1)
+df_values = np.exp(-(0.02 + 0.001 * times + bumps) * times)
+
+lookup_dates = [value_date.add_months(5 * i) for i in range(0, 60)]
+
+
+def test_df_matches_single_curves():
+    for interp_type in InterpTypes:
+        curve_set = DiscountCurveSet(value_date, df_dates, df_values,
+                                     interp_type)
+
+        dfs = curve_set.df(lookup_dates)
+        assert dfs.shape == (7, 60)
+
+        for i in range(0, curve_set.num_scenarios):
+            curve = DiscountCurve(value_date, df_dates, df_values[i],
+                                  interp_type)
+            assert np.allclose(dfs[i], curve.df(lookup_dates),
+                               rtol=1e-12, atol=0.0)
+            assert abs(curve_set.df(lookup_dates[7])[i] -
+                       curve.df(lookup_dates[7])) < 1e-12
+
+        assert np.allclose(curve_set.df(DateArray.from_dates(lookup_dates)),
+                           dfs)
+
+
+def test_rates():
+    curve_set = DiscountCurveSet(value_date, df_dates, df_values)
+    curve = curve_set.scenario(3)
+    dts = lookup_dates[1:10]
+
+    assert np.allclose(curve_set.zero_rate(dts)[3], curve.zero_rate(dts))
+    assert np.allclose(curve_set.fwd(dts)[3], curve.fwd(dts))
+    assert np.allclose(curve_set.fwd_rate(dts, "3M")[3],
+                       curve.fwd_rate(dts, "3M"))
+    assert np.allclose(curve_set.swap_rate(value_date, dts)[3],
+                       curve.swap_rate(value_date, dts))
+
+
+def test_from_curve():
+    curve = DiscountCurve(value_date, df_dates, df_values[0])
+    curve_set = DiscountCurveSet.from_curve(curve, df_dates, [0.0, 0.0001])
+
+    assert np.allclose(curve_set.df(lookup_dates)[0],
+                       curve.df(lookup_dates))
+
+    bumped = curve_set.bump(0.001)
+    assert np.allclose(bumped._df_values,
+                       curve_set._df_values * np.exp(-0.001 * times))
+
+
+def test_swap_value_under_scenarios():
+    curve_set = DiscountCurveSet(value_date, df_dates, df_values)
+
+    swap = IborSwap(value_date.add_days(2), "10Y", SwapTypes.PAY, 0.03,
+                    FrequencyTypes.SEMI_ANNUAL, DayCountTypes.THIRTY_E_360)
+
+    values = swap.value(value_date, curve_set)
+    assert values.shape == (7,)
+
+    for i in range(0, curve_set.num_scenarios):
+        value = swap.value(value_date, curve_set.scenario(i))
+        assert abs(values[i] - value) < 1e-6
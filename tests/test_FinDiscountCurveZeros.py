@@ -5,9 +5,14 @@
 from financepy.market.curves.discount_curve_zeros import DiscountCurveZeros
 from financepy.market.curves.interpolator import InterpTypes
 from financepy.utils.date import Date
+from financepy.utils.date_array import DateArray
 from financepy.utils.frequency import FrequencyTypes
 from financepy.utils.day_count import DayCountTypes
+from financepy.utils.helpers import times_from_dates, gTimesCache
+from financepy.utils.helpers import set_times_cache_size
+from financepy.utils.error import FinError
 import numpy as np
+import pytest
 
 
 def test_FinDiscountCurveZeros():
@@ -44,3 +49,77 @@ def test_FinDiscountCurveZeros():
     date = start_date.add_years(10)
     df = curve.df(date)
     assert round(df, 4) == 0.5584
+
+
+def test_FinDiscountCurveZeros_date_array():
+    start_date = Date(1, 1, 2018)
+    times = np.linspace(1.0, 10.0, 10)
+    dates = start_date.add_years(times)
+    zero_rates = np.linspace(5.0, 6.0, 10)/100
+
+    curve = DiscountCurveZeros(start_date,
+                               dates,
+                               zero_rates,
+                               FrequencyTypes.ANNUAL,
+                               DayCountTypes.ACT_ACT_ISDA,
+                               InterpTypes.FLAT_FWD_RATES)
+
+    lookup_dates = [start_date.add_months(3 * i) for i in range(0, 41)]
+    date_array = DateArray.from_dates(lookup_dates)
+
+    dfs = curve.df(date_array)
+    for i, dt in enumerate(lookup_dates):
+        assert abs(dfs[i] - curve.df(dt)) < 1e-12
+
+    serial_dfs = curve.df(date_array.serials)
+    assert np.allclose(serial_dfs, dfs)
+
+    list_dfs = curve.df(lookup_dates)
+    assert np.allclose(list_dfs, dfs)
+
+
+def test_times_from_dates_cache():
+    value_date = Date(1, 1, 2018)
+    dates = [value_date.add_months(i) for i in range(0, 12)]
+
+    gTimesCache.clear()
+    t1 = times_from_dates(dates, value_date, DayCountTypes.ACT_365F)
+    t1[0] = -1.0
+    t2 = times_from_dates(dates, value_date, DayCountTypes.ACT_365F)
+
+    assert gTimesCache.hits == 1
+    assert t2[0] == 0.0
+    assert abs(t2[-1] - 334.0 / 365.0) < 1e-12
+
+
+def test_times_from_dates_cache_bypass_and_bytes():
+    value_date = Date(1, 1, 2018)
+    dates = [value_date.add_months(i) for i in range(0, 12)]
+
+    # A single date is not cached
+    gTimesCache.clear()
+    times_from_dates(dates[3], value_date)
+    times_from_dates(dates[3], value_date)
+    assert len(gTimesCache) == 0
+    assert gTimesCache.hits == 0
+
+    # The cache is bounded by the bytes of the dates and the times
+    set_times_cache_size(200)
+    times_from_dates(dates, value_date)
+    assert len(gTimesCache) == 1
+    times_from_dates(dates[:6], value_date)
+    assert len(gTimesCache) == 1
+    set_times_cache_size(64 * 1024 * 1024)
+    gTimesCache.clear()
+
+
+def test_times_from_dates_float_array():
+    value_date = Date(1, 1, 2018)
+    serials = DateArray.from_dates([value_date.add_months(i)
+                                    for i in range(0, 12)]).serials
+
+    times = times_from_dates(serials, value_date)
+    assert abs(times[-1] - 334.0 / 365.0) < 1e-12
+
+    with pytest.raises(FinError):
+        times_from_dates(serials.astype(np.float64), value_date)
@@ -2,13 +2,23 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ###############################################################################
 
+from concurrent.futures import ProcessPoolExecutor
+
 import matplotlib.pyplot as plt
 
 from financepy.models.volatility_fns import VolFuncTypes
 from financepy.utils.date import Date
+from financepy.utils.error import FinError
+from financepy.utils.global_types import FinSolverTypes
+from financepy.models.volatility_fns import flat_smile_params
 from financepy.market.volatility.equity_vol_surface import EquityVolSurface
+from financepy.market.volatility.equity_vol_surface import _obj
+from financepy.market.volatility.equity_vol_surface import _obj_residuals
+from financepy.utils.solver_lm import levenberg_marquardt
 from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
 import numpy as np
+import pytest
+from scipy.optimize import minimize
 
 
 def test_equity_vol_surface():
@@ -67,5 +77,197 @@ def test_equity_vol_surface():
     expiry_date = expiry_dates[6]
     delta = 0.90
     vol = equitySurface.vol_from_delta_date(delta, expiry_date)
-    assert round(vol[0], 4) == 0.3498
-    assert round(vol[1], 4) == 2199.6665
+    assert round(vol[0], 4) == 0.3547
+    assert round(vol[1], 4) == 2186.1597
+
+    # Vectorised lookup including expiries outside the grid
+    test_dates = [value_date.add_days(10), Date(25, 2, 2021),
+                  Date(11, 7, 2021), Date(1, 6, 2022), Date(1, 6, 2024)]
+    test_strikes = np.array([3000.0, 3500.0, 3800.0, 4100.0, 4600.0])
+
+    vols = equitySurface.vol_from_strikes_dates(test_strikes, test_dates)
+    for k, dt, vol in zip(test_strikes, test_dates, vols):
+        assert abs(vol - equitySurface.vol_from_strike_date(k, dt)) < 1e-12
+
+    vols = equitySurface.vol_from_strikes_dates(test_strikes, test_dates[2])
+    for k, vol in zip(test_strikes, vols):
+        expected = equitySurface.vol_from_strike_date(k, test_dates[2])
+        assert abs(vol - expected) < 1e-12
+
+    # Calibration in parallel, either in new processes or in an executor
+    # shared between surfaces, gives the same parameters as in turn
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        for num_processes, ex in [(2, None), (3, None), (1, executor),
+                                  (1, executor)]:
+            parallelSurface = EquityVolSurface(value_date,
+                                               stock_price,
+                                               discount_curve,
+                                               dividend_curve,
+                                               expiry_dates,
+                                               strikes,
+                                               volSurface,
+                                               vol_functionType,
+                                               num_processes=num_processes,
+                                               executor=ex)
+
+            assert (parallelSurface._parameters ==
+                    equitySurface._parameters).all()
+
+
+def test_equity_vol_surface_levenberg_marquardt():
+    value_date = Date(11, 1, 2021)
+    stock_price = 3800.0
+
+    expiry_dates = [Date(11, 2, 2021), Date(11, 7, 2021), Date(11, 1, 2023)]
+    strikes = np.array([3037, 3418, 3608, 3703, 3798,
+                        3893, 3988, 4178, 4557])
+
+    volSurface = [[42.94, 31.30, 25.88, 22.94, 19.72, 16.90, 15.31, 17.54, 25.67],
+                  [31.41, 26.25, 23.51, 22.05, 20.61, 19.25, 18.03, 16.01, 15.90],
+                  [27.59, 24.33, 22.72, 21.93, 21.17, 20.43, 19.71, 18.36, 16.26]]
+    volSurface = np.array(volSurface) / 100.0
+
+    discount_curve = DiscountCurveFlat(value_date, 0.020)
+    dividend_curve = DiscountCurveFlat(value_date, 0.010)
+
+    # The fits are at least as good as with Nelder-Mead
+    for vol_functionType in [VolFuncTypes.CLARK5, VolFuncTypes.SVI,
+                             VolFuncTypes.SABR_BETA_HALF, VolFuncTypes.SSVI]:
+        errors = []
+        for solver_type in [FinSolverTypes.NELDER_MEAD,
+                            FinSolverTypes.LEVENBERG_MARQUARDT]:
+            surface = EquityVolSurface(value_date, stock_price,
+                                       discount_curve, dividend_curve,
+                                       expiry_dates, strikes, volSurface,
+                                       vol_functionType, solver_type)
+            fitted = surface.vol_from_strikes_dates(
+                np.tile(strikes, len(expiry_dates)),
+                np.repeat(expiry_dates, len(strikes)).tolist())
+            errors.append(np.sqrt(np.mean((fitted - volSurface.ravel())**2)))
+
+        assert errors[1] < errors[0] + 1e-6
+
+    # The SSVI and BBG fits do not start from all zero parameters at which
+    # the smile cannot be fitted
+    for vol_functionType in [VolFuncTypes.SSVI, VolFuncTypes.BBG]:
+        surface = EquityVolSurface(value_date, stock_price,
+                                   discount_curve, dividend_curve,
+                                   expiry_dates, strikes, volSurface,
+                                   vol_functionType,
+                                   FinSolverTypes.LEVENBERG_MARQUARDT)
+        fitted = surface.vol_from_strikes_dates(
+            np.tile(strikes, len(expiry_dates)),
+            np.repeat(expiry_dates, len(strikes)).tolist())
+        assert np.sqrt(np.mean((fitted - volSurface.ravel())**2)) < 0.02
+        assert np.all(np.any(surface._parameters, axis=1))
+
+
+def test_equity_vol_surface_levenberg_marquardt_evaluations():
+    # One expiry slice of the surface above
+    stock_price = 3800.0
+    t = 31.0 / 365.0
+    r = 0.020
+    q = 0.010
+    strikes = np.array([3037, 3418, 3608, 3703, 3798,
+                        3893, 3988, 4178, 4557], dtype=np.float64)
+    volSurface = np.array([[42.94, 31.30, 25.88, 22.94, 19.72,
+                            16.90, 15.31, 17.54, 25.67]]) / 100.0
+    f = stock_price * np.exp((r - q) * t)
+
+    # Each evaluation of the residuals and their Jacobian costs at most one
+    # more vol evaluation per parameter than an evaluation of the objective
+    for vol_functionType, num_params in [(VolFuncTypes.CLARK5, 5),
+                                         (VolFuncTypes.SVI, 5),
+                                         (VolFuncTypes.SABR_BETA_HALF, 3)]:
+        args = (stock_price, t, r, q, strikes, 0, volSurface,
+                vol_functionType.value)
+        x_init = flat_smile_params(vol_functionType.value, num_params, f,
+                                   volSurface[0][4], t)
+
+        x_lm, num_evals = levenberg_marquardt(_obj_residuals, x_init, args,
+                                              1e-10, 200)
+        opt = minimize(_obj, x_init, args, method="Nelder-Mead", tol=1e-6)
+
+        assert (1 + num_params) * num_evals < opt.nfev
+        assert _obj(x_lm, *args) < opt.fun + 1e-10
+
+
+def test_equity_vol_surface_recalibrate():
+    value_date = Date(11, 1, 2021)
+    stock_price = 3800.0
+
+    expiry_dates = [Date(11, 2, 2021), Date(11, 7, 2021), Date(11, 1, 2023)]
+    strikes = np.array([3037, 3418, 3608, 3703, 3798,
+                        3893, 3988, 4178, 4557])
+
+    volSurface = [[42.94, 31.30, 25.88, 22.94, 19.72, 16.90, 15.31, 17.54, 25.67],
+                  [31.41, 26.25, 23.51, 22.05, 20.61, 19.25, 18.03, 16.01, 15.90],
+                  [27.59, 24.33, 22.72, 21.93, 21.17, 20.43, 19.71, 18.36, 16.26]]
+    volSurface = np.array(volSurface) / 100.0
+
+    discount_curve = DiscountCurveFlat(value_date, 0.020)
+    dividend_curve = DiscountCurveFlat(value_date, 0.010)
+
+    surface = EquityVolSurface(value_date, stock_price,
+                               discount_curve, dividend_curve,
+                               expiry_dates, strikes, volSurface,
+                               VolFuncTypes.SVI,
+                               FinSolverTypes.LEVENBERG_MARQUARDT)
+
+    # Nothing is refitted if the quotes have not moved
+    previous_parameters = surface._parameters.copy()
+    assert surface.recalibrate(volSurface) == 0
+    assert (surface._parameters == previous_parameters).all()
+
+    # Only the expiry whose quotes move is refitted
+    newVolSurface = volSurface.copy()
+    newVolSurface[1] += 0.002
+    assert surface.recalibrate(newVolSurface) == 1
+    assert (surface._parameters[[0, 2]] == previous_parameters[[0, 2]]).all()
+
+    rebuilt = EquityVolSurface(value_date, stock_price,
+                               discount_curve, dividend_curve,
+                               expiry_dates, strikes, newVolSurface,
+                               VolFuncTypes.SVI,
+                               FinSolverTypes.LEVENBERG_MARQUARDT)
+
+    vols = surface.vol_from_strikes_dates(strikes, expiry_dates[1])
+    expected = rebuilt.vol_from_strikes_dates(strikes, expiry_dates[1])
+    assert np.max(np.abs(vols - expected)) < 1e-4
+
+    # A new stock price and curves move every forward so all are refitted
+    new_stock_price = 3850.0
+    new_discount_curve = DiscountCurveFlat(value_date, 0.025)
+
+    assert surface.recalibrate(newVolSurface, stock_price=new_stock_price,
+                               discount_curve=new_discount_curve) == 3
+
+    rebuilt = EquityVolSurface(value_date, new_stock_price,
+                               new_discount_curve, dividend_curve,
+                               expiry_dates, strikes, newVolSurface,
+                               VolFuncTypes.SVI,
+                               FinSolverTypes.LEVENBERG_MARQUARDT)
+
+    assert np.max(np.abs(surface._F0T - rebuilt._F0T)) < 1e-12
+
+    for expiry_date in expiry_dates:
+        vols = surface.vol_from_strikes_dates(strikes, expiry_date)
+        expected = rebuilt.vol_from_strikes_dates(strikes, expiry_date)
+        assert np.max(np.abs(vols - expected)) < 1e-4
+
+    # The previous surface must have the same expiry dates and strikes
+    other = EquityVolSurface(value_date, stock_price,
+                             discount_curve, dividend_curve,
+                             expiry_dates, strikes * 1.01, volSurface,
+                             VolFuncTypes.SVI,
+                             FinSolverTypes.LEVENBERG_MARQUARDT)
+
+    with pytest.raises(FinError):
+        surface.recalibrate(volSurface, previous_surface=other)
+
+    # The market inputs and previous surface are type checked
+    with pytest.raises(FinError):
+        surface.recalibrate(volSurface, stock_price="3800")
+
+    with pytest.raises(FinError):
+        surface.recalibrate(volSurface, previous_surface=discount_curve)
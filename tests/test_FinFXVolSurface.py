@@ -2,6 +2,8 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ###############################################################################
 
+from concurrent.futures import ThreadPoolExecutor
+
 from financepy.models.volatility_fns import VolFuncTypes
 from financepy.utils.date import Date
 from financepy.market.volatility.fx_vol_surface import FinFXDeltaMethod
@@ -59,6 +61,98 @@ def test_FinFXMktVolSurface1(capsys):
     captured = capsys.readouterr()
     assert captured.out == ""
 
+    # Calibrating the tenors in parallel gives the same parameters
+    fxMarketParallel = FXVolSurface(value_date,
+                                    spot_fx_rate,
+                                    currency_pair,
+                                    notional_currency,
+                                    dom_discount_curve,
+                                    for_discount_curve,
+                                    tenors,
+                                    atm_vols,
+                                    marketStrangle25DeltaVols,
+                                    riskReversal25DeltaVols,
+                                    atmMethod,
+                                    delta_method,
+                                    vol_functionType,
+                                    num_processes=2)
+
+    assert (fxMarketParallel._parameters == fxMarket._parameters).all()
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        fxMarketParallel.build_vol_surface(executor)
+
+    assert (fxMarketParallel._parameters == fxMarket._parameters).all()
+
+    # Only the tenors whose quotes move are refitted from the previous fit
+    previous_parameters = fxMarket._parameters.copy()
+    atm_vols[2] += 0.10
+    riskReversal25DeltaVols[4] -= 0.05
+
+    num_refitted = fxMarket.recalibrate(atm_vols,
+                                        marketStrangle25DeltaVols,
+                                        riskReversal25DeltaVols)
+    assert num_refitted == 2
+
+    unchanged = [0, 1, 3, 5]
+    assert (fxMarket._parameters[unchanged] ==
+            previous_parameters[unchanged]).all()
+
+    fxMarket.check_calibration(verboseCalibration, tol=1e-5)
+    captured = capsys.readouterr()
+    assert captured.out == ""
+
+    fxMarketRebuilt = FXVolSurface(value_date,
+                                   spot_fx_rate,
+                                   currency_pair,
+                                   notional_currency,
+                                   dom_discount_curve,
+                                   for_discount_curve,
+                                   tenors,
+                                   atm_vols,
+                                   marketStrangle25DeltaVols,
+                                   riskReversal25DeltaVols,
+                                   atmMethod,
+                                   delta_method,
+                                   vol_functionType)
+
+    for expiry_date in fxMarket._expiry_dates:
+        for strike in [1.25, 1.35, 1.45]:
+            vol = fxMarket.volatility(strike, expiry_date)
+            expected = fxMarketRebuilt.volatility(strike, expiry_date)
+            assert abs(vol - expected) < 1e-4
+
+    # A new spot rate moves every forward and ATM strike so all are refitted
+    new_spot_fx_rate = 1.3565
+
+    num_refitted = fxMarket.recalibrate(atm_vols,
+                                        marketStrangle25DeltaVols,
+                                        riskReversal25DeltaVols,
+                                        spot_fx_rate=new_spot_fx_rate)
+    assert num_refitted == 6
+
+    fxMarketRebuilt = FXVolSurface(value_date,
+                                   new_spot_fx_rate,
+                                   currency_pair,
+                                   notional_currency,
+                                   dom_discount_curve,
+                                   for_discount_curve,
+                                   tenors,
+                                   atm_vols,
+                                   marketStrangle25DeltaVols,
+                                   riskReversal25DeltaVols,
+                                   atmMethod,
+                                   delta_method,
+                                   vol_functionType)
+
+    assert abs(fxMarket._K_ATM - fxMarketRebuilt._K_ATM).max() < 1e-12
+
+    for expiry_date in fxMarket._expiry_dates:
+        for strike in [1.25, 1.35, 1.45]:
+            vol = fxMarket.volatility(strike, expiry_date)
+            expected = fxMarketRebuilt.volatility(strike, expiry_date)
+            assert abs(vol - expected) < 1e-4
+
 
 def test_FinFXMktVolSurface2(capsys):
     # Example from Book extract by Iain Clark using Tables 3.3 and 3.4
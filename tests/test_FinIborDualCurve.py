@@ -4,7 +4,9 @@
 
 from financepy.products.rates.ois import OIS
 from financepy.products.rates.ois_curve import OISCurve
-from financepy.products.rates.dual_curve import IborDualCurve
+from financepy.products.rates.dual_curve import IborDualCurve, joint_solve
+from financepy.products.rates.ibor_basis_swap import IborBasisSwap
+from financepy.products.rates.ois_basis_swap import OISBasisSwap
 from financepy.products.rates.ibor_single_curve import IborSingleCurve
 from financepy.utils.global_types import SwapTypes
 from financepy.utils.math import ONE_MILLION
@@ -16,8 +18,10 @@ from financepy.products.rates.ibor_fra import IborFRA
 from financepy.utils.frequency import FrequencyTypes
 from financepy.utils.day_count import DayCountTypes
 from financepy.utils.date import Date
+from financepy.utils.error import FinError
 import matplotlib.pyplot as plt
 import numpy as np
+import pytest
 
 
 def buildOIS(value_date):
@@ -271,3 +275,113 @@ def test_bloombergPricingExample():
         settle_date, oisCurve), 4) == -55524.5709
     assert round(swaps[0]._float_leg.value(
         settle_date, oisCurve, liborDualCurve, None), 4) == 55524.5709
+
+
+def build_tenor_curves(value_date, interp_type, bootstrap=True):
+    """ Build an OIS curve, a 3M Ibor curve from swaps and a 6M Ibor curve
+    from 3M-6M basis swaps. """
+
+    settle_date = value_date.add_weekdays(2)
+    tenors = ["1Y", "2Y", "3Y", "5Y", "7Y", "10Y"]
+
+    depos = [IborDeposit(value_date, "1D", 0.0140, DayCountTypes.ACT_360)]
+    swaps = [OIS(settle_date, tenor, SwapTypes.PAY, rate,
+                 FrequencyTypes.ANNUAL, DayCountTypes.ACT_360)
+             for tenor, rate in zip(tenors, [0.0150, 0.0165, 0.0172,
+                                             0.0180, 0.0190, 0.0200])]
+    oisCurve = OISCurve(value_date, depos, [], swaps, interp_type)
+
+    depos = [IborDeposit(settle_date, "3M", 0.0165, DayCountTypes.ACT_360)]
+    swaps = [IborSwap(settle_date, tenor, SwapTypes.PAY, rate,
+                      FrequencyTypes.ANNUAL, DayCountTypes.THIRTY_E_360,
+                      float_freq_type=FrequencyTypes.QUARTERLY,
+                      float_dc_type=DayCountTypes.ACT_360)
+             for tenor, rate in zip(tenors, [0.0180, 0.0195, 0.0202,
+                                             0.0210, 0.0220, 0.0230])]
+    curve3M = IborDualCurve(value_date, oisCurve, depos, [], swaps,
+                            interp_type, bootstrap=bootstrap)
+
+    depos = [IborDeposit(settle_date, "6M", 0.0180, DayCountTypes.ACT_360)]
+    swaps = [IborBasisSwap(settle_date, tenor, SwapTypes.RECEIVE,
+                           FrequencyTypes.SEMI_ANNUAL, DayCountTypes.ACT_360,
+                           spread, FrequencyTypes.QUARTERLY,
+                           DayCountTypes.ACT_360)
+             for tenor, spread in zip(tenors, [0.0010, 0.0011, 0.0012,
+                                               0.0012, 0.0013, 0.0013])]
+    curve6M = IborDualCurve(value_date, oisCurve, depos, [], swaps,
+                            interp_type, basis_curve=curve3M,
+                            bootstrap=bootstrap)
+
+    return oisCurve, curve3M, curve6M
+
+
+def test_joint_solve():
+    value_date = Date(6, 6, 2018)
+
+    # With flat forwards the sequential bootstrap is already the solution
+    oisCurve, curve3M, curve6M = build_tenor_curves(value_date,
+                                                    InterpTypes.FLAT_FWD_RATES)
+    dfs6M = curve6M._dfs.copy()
+    jac = joint_solve(oisCurve, [curve3M, curve6M])
+    assert np.max(np.abs(curve6M._dfs - dfs6M)) < 1e-9
+
+    num_ois = len(oisCurve._times) - 1
+    num_3M = len(curve3M._times) - 1
+    num_points = num_ois + num_3M + len(curve6M._times) - 1
+    assert jac.shape == (num_points, num_points)
+
+    # The basis swaps depend on the 3M curve but the OIS swaps do not
+    assert np.max(np.abs(jac[num_ois + num_3M:, num_ois:num_ois + num_3M])) > 0
+    assert np.max(np.abs(jac[0:num_ois, num_ois:])) == 0.0
+
+    # With splines all instruments on all curves are refitted together
+    oisCurve, curve3M, curve6M = build_tenor_curves(
+        value_date, InterpTypes.NATCUBIC_ZERO_RATES)
+    joint_solve(oisCurve, [curve3M, curve6M])
+
+    for swap in oisCurve._usedSwaps:
+        v = swap.value(value_date, oisCurve)
+        assert abs(v / swap._fixed_leg._notional) < 1e-10
+
+    for swap in curve3M._usedSwaps:
+        v = swap.value(value_date, oisCurve, curve3M)
+        assert abs(v / swap._fixed_leg._notional) < 1e-10
+
+    for swap in curve6M._usedSwaps:
+        v = swap.value(value_date, oisCurve, curve6M, curve3M)
+        assert abs(v / swap._floatLeg1._notional) < 1e-10
+
+
+def test_joint_solve_from_quotes():
+    value_date = Date(6, 6, 2018)
+    interp_type = InterpTypes.NATCUBIC_ZERO_RATES
+
+    oisCurve, curve3M, curve6M = build_tenor_curves(value_date, interp_type)
+    joint_solve(oisCurve, [curve3M, curve6M])
+
+    # The Ibor curves are seeded from their quotes without a bootstrap
+    oisCurve, seed3M, seed6M = build_tenor_curves(value_date, interp_type,
+                                                  bootstrap=False)
+    assert np.max(np.abs(seed6M._dfs - curve6M._dfs)) > 1e-4
+
+    joint_solve(oisCurve, [seed3M, seed6M])
+    assert np.max(np.abs(seed3M._dfs - curve3M._dfs)) < 1e-10
+    assert np.max(np.abs(seed6M._dfs - curve6M._dfs)) < 1e-10
+
+
+def test_ois_basis_swap_basis_curve():
+    value_date = Date(6, 6, 2018)
+    settle_date = value_date.add_weekdays(2)
+    oisCurve, curve3M, _ = build_tenor_curves(value_date,
+                                              InterpTypes.FLAT_FWD_RATES)
+
+    depos = [IborDeposit(settle_date, "3M", 0.0165, DayCountTypes.ACT_360)]
+    swaps = [OISBasisSwap(settle_date, "2Y", SwapTypes.PAY)]
+
+    # The OIS leg cannot be indexed to an Ibor curve
+    with pytest.raises(FinError):
+        IborDualCurve(value_date, oisCurve, depos, [], swaps,
+                      basis_curve=curve3M, bootstrap=False)
+
+    IborDualCurve(value_date, oisCurve, depos, [], swaps,
+                  basis_curve=oisCurve, bootstrap=False)
@@ -137,3 +137,107 @@ def test_bloombergPricingExample():
         settle_date, libor_curve), 4) == 53714.5507
     assert round(swaps[0]._float_leg.value(
         settle_date, libor_curve, libor_curve, None), 4) == 53714.5507
+
+
+def build_instruments(value_date, swap_rates):
+    settle_date = value_date.add_weekdays(2)
+    depos = [IborDeposit(settle_date, "6M", 0.0231, DayCountTypes.ACT_360)]
+    fras = [IborFuture(value_date, 3).to_fra(97.35, -0.0015),
+            IborFuture(value_date, 4).to_fra(97.25, -0.0026)]
+
+    swaps = []
+    for tenor, rate in zip(["2Y", "3Y", "5Y", "7Y", "10Y", "20Y"],
+                           swap_rates):
+        swap = IborSwap(settle_date, tenor, SwapTypes.PAY, rate,
+                        FrequencyTypes.SEMI_ANNUAL, DayCountTypes.THIRTY_E_360)
+        swaps.append(swap)
+
+    return depos, fras, swaps
+
+
+def test_update_quote():
+    value_date = Date(6, 6, 2018)
+    swap_rates = [0.0277, 0.0286, 0.0293, 0.0295, 0.0300, 0.0304]
+
+    for interp_type in [InterpTypes.FLAT_FWD_RATES,
+                        InterpTypes.NATCUBIC_ZERO_RATES]:
+
+        depos, fras, swaps = build_instruments(value_date, swap_rates)
+        libor_curve = IborSingleCurve(value_date, depos, fras, swaps,
+                                      interp_type)
+
+        num_instruments = len(libor_curve._usedDeposits) + len(fras) + 6
+        assert len(libor_curve._times) == num_instruments + 1
+
+        # Tick the 7Y swap and then the second FRA
+        libor_curve.update_quote(num_instruments - 3, 0.0297)
+        libor_curve.update_quote(num_instruments - 7, 0.0280)
+
+        # The swap passed in is not changed
+        assert swaps[3]._fixed_leg._cpn == 0.0295
+
+        new_rates = list(swap_rates)
+        new_rates[3] = 0.0297
+        depos, fras, swaps = build_instruments(value_date, new_rates)
+        fras[1]._fraRate = 0.0280
+        rebuilt_curve = IborSingleCurve(value_date, depos, fras, swaps,
+                                        interp_type)
+
+        for i in range(0, len(rebuilt_curve._dfs)):
+            assert abs(libor_curve._dfs[i] - rebuilt_curve._dfs[i]) < 1e-9
+
+        # The last swap is repriced exactly by either interpolation
+        swap = libor_curve._usedSwaps[-1]
+        v = swap.value(value_date, libor_curve, libor_curve)
+        assert abs(v / swap._fixed_leg._notional) < 1e-8
+
+
+def test_global_solve():
+    value_date = Date(6, 6, 2018)
+    swap_rates = [0.0277, 0.0286, 0.0293, 0.0295, 0.0300, 0.0304]
+
+    # With flat forwards the bootstrap is exact so both builds agree
+    depos, fras, swaps = build_instruments(value_date, swap_rates)
+    bootstrap_curve = IborSingleCurve(value_date, depos, fras, swaps)
+    depos, fras, swaps = build_instruments(value_date, swap_rates)
+    global_curve = IborSingleCurve(value_date, depos, fras, swaps,
+                                   global_solve=True)
+
+    for i in range(0, len(global_curve._dfs)):
+        assert abs(global_curve._dfs[i] - bootstrap_curve._dfs[i]) < 1e-10
+
+    # A cubic spline curve reprices every instrument
+    depos, fras, swaps = build_instruments(value_date, swap_rates)
+    libor_curve = IborSingleCurve(value_date, depos, fras, swaps,
+                                  InterpTypes.NATCUBIC_ZERO_RATES,
+                                  global_solve=True)
+
+    for swap in libor_curve._usedSwaps:
+        v = swap.value(value_date, libor_curve, libor_curve)
+        assert abs(v / swap._fixed_leg._notional) < 1e-10
+
+    for fra in libor_curve._usedFRAs:
+        v = fra.value(value_date, libor_curve)
+        assert abs(v / fra._notional) < 1e-10
+
+    # The Jacobian agrees with a finite difference of the swap values
+    jac = libor_curve.jacobian()
+    num_points = len(libor_curve._dfs)
+    assert jac.shape == (num_points - 1, num_points - 1)
+
+    swap = libor_curve._usedSwaps[2]
+    row = num_points - 1 - len(libor_curve._usedSwaps) + 2
+    dfs = libor_curve._dfs.copy()
+    h = 1e-6
+
+    for j in range(1, num_points):
+        values = []
+        for bump in [h, -h]:
+            libor_curve._dfs = dfs.copy()
+            libor_curve._dfs[j] += bump
+            libor_curve._interpolator.fit(libor_curve._times, libor_curve._dfs)
+            v = swap.value(value_date, libor_curve, libor_curve)
+            values.append(v / swap._fixed_leg._notional)
+
+        fd = (values[0] - values[1]) / (2.0 * h)
+        assert abs(jac[row, j - 1] - fd) < 1e-7
@@ -3,6 +3,13 @@
 ###############################################################################
 
 from financepy.market.curves.interpolator import Interpolator, InterpTypes
+from financepy.market.curves.interpolator import _fit_coeffs
+from financepy.market.curves.interpolator import _uinterpolate_coeffs
+from financepy.market.curves.interpolator import _vinterpolate_coeffs
+from financepy.market.curves.interpolator import _df_jacobian
+from financepy.market.curves.interpolator import _df_jacobian_column
+from financepy.market.curves.interpolator import _uinterpolate, _vinterpolate
+from scipy.interpolate import CubicSpline, PchipInterpolator
 import numpy as np
 import math
 
@@ -232,3 +239,94 @@ def test_PCHIP_LOG_DISCOUNT():
     y_int = interpolator.interpolate(x)
     assert round(x, 4) == 6.8421
     assert round(y_int, 4) == 0.5551
+
+
+def test_spline_coeffs_match_scipy():
+    log_dfs = np.log(yValues)
+    zero_rates = -log_dfs / (xValues + 1e-12)
+    t = np.linspace(0.01, 12.0, 50)
+
+    scipy_values = {
+        InterpTypes.PCHIP_LOG_DISCOUNT:
+            np.exp(PchipInterpolator(xValues, log_dfs)(t)),
+        InterpTypes.PCHIP_ZERO_RATES:
+            np.exp(-t * PchipInterpolator(xValues, zero_rates)(t)),
+        InterpTypes.FINCUBIC_ZERO_RATES:
+            np.exp(-t * CubicSpline(xValues, zero_rates,
+                                    bc_type=((2, 0.0), (1, 0.0)))(t)),
+        InterpTypes.NATCUBIC_LOG_DISCOUNT:
+            np.exp(CubicSpline(xValues, log_dfs, bc_type='natural')(t)),
+        InterpTypes.NATCUBIC_ZERO_RATES:
+            np.exp(-t * CubicSpline(xValues, zero_rates,
+                                    bc_type='natural')(t))}
+
+    for interp_type, expected in scipy_values.items():
+        interpolator = Interpolator(interp_type)
+        interpolator.fit(xValues, yValues)
+        assert np.allclose(interpolator.interpolate(t), expected,
+                           rtol=1e-10, atol=0.0)
+
+
+def test_uinterpolate_coeffs():
+    for interp_type in InterpTypes:
+        interpolator = Interpolator(interp_type)
+        interpolator.fit(xValues, yValues)
+        coeffs = _fit_coeffs(xValues, yValues, interp_type.value)
+
+        for x in xInterpolateValues[1:]:
+            y = _uinterpolate_coeffs(x, coeffs, interp_type.value)
+            assert y == interpolator.interpolate(x)
+
+
+def test_vinterpolate_sorted_and_unsorted():
+    # A daily grid such as a long OIS curve
+    times = np.arange(0, 3651) / 365.0
+    dfs = np.exp(-0.03 * times - 0.001 * times * times)
+
+    np.random.seed(1919)
+    t = np.random.uniform(0.0, 12.0, 1000)
+    t_sorted = np.sort(t)
+
+    for interp_type in [InterpTypes.FLAT_FWD_RATES,
+                        InterpTypes.LINEAR_FWD_RATES,
+                        InterpTypes.LINEAR_ZERO_RATES]:
+        method = interp_type.value
+        scalar = np.array([_uinterpolate(x, times, dfs, method) for x in t])
+        unsorted = _vinterpolate(t, times, dfs, method)
+        merged = _vinterpolate(t_sorted, times, dfs, method)
+
+        assert np.array_equal(unsorted, scalar)
+        assert np.array_equal(merged, scalar[np.argsort(t)])
+        assert np.allclose(_vinterpolate(times[1:], times, dfs, method),
+                           dfs[1:], rtol=1e-9, atol=0.0)
+
+
+def test_df_jacobian():
+    # A curve grid starting at time zero with points before, on and beyond
+    # the grid to cover every bracket and the extrapolation
+    times = np.array([0.0, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 7.0, 10.0])
+    zeros = np.array([0.0, 0.01, 0.012, 0.015, 0.018, 0.02, 0.022, 0.023,
+                      0.025])
+    dfs = np.exp(-zeros * times)
+    t = np.array([0.0, 0.1, 0.25, 0.3, 0.7, 1.0, 1.5, 2.5, 4.0, 6.0, 8.5,
+                  10.0, 12.0])
+
+    for interp_type in InterpTypes:
+        method = interp_type.value
+        jac = _df_jacobian(t, times, dfs, method)
+
+        for j in range(0, len(times)):
+            h = 1e-6 * dfs[j]
+            dfs_up = dfs.copy()
+            dfs_up[j] += h
+            dfs_down = dfs.copy()
+            dfs_down[j] -= h
+            coeffs_up = _fit_coeffs(times, dfs_up, method)
+            coeffs_down = _fit_coeffs(times, dfs_down, method)
+            df_up = _vinterpolate_coeffs(t, coeffs_up, method)
+            df_down = _vinterpolate_coeffs(t, coeffs_down, method)
+            fd = (df_up - df_down) / (2.0 * h)
+
+            col = _df_jacobian_column(t, times, dfs, method, j)
+            assert np.max(np.abs(col - jac[:, j])) < 1e-12
+            assert np.max(np.abs(jac[:, j] - fd)) < 1e-7
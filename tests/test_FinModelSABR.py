@@ -5,6 +5,11 @@
 from financepy.utils.global_types import OptionTypes
 from financepy.models.sabr import SABR
 from financepy.models.sabr import vol_function_sabr
+from financepy.models.sabr import vol_function_sabr_grad
+from financepy.models.sabr import vol_function_sabr_beta_one
+from financepy.models.sabr import vol_function_sabr_beta_one_grad
+from financepy.models.sabr import vol_function_sabr_beta_half
+from financepy.models.sabr import vol_function_sabr_beta_half_grad
 import numpy as np
 
 
@@ -82,3 +87,32 @@ def test_SABR_Calibration():
     valuePut = modelSABR_02.value(f, k, t_exp, df, put_optionType)
     assert round(valueCall - valuePut, 12) == round(df*(f - k), 12), \
         "The method called 'value()' doesn't comply with Call-Put parity"
+
+
+def finite_difference_grad(vol_fn, params, f, k, t):
+    grad = np.zeros(len(params))
+    for i in range(0, len(params)):
+        up = params.copy()
+        up[i] += 1e-6
+        down = params.copy()
+        down[i] -= 1e-6
+        grad[i] = (vol_fn(up, f, k, t) - vol_fn(down, f, k, t)) / 2e-6
+    return grad
+
+
+def test_SABR_grad():
+    f = 0.043
+    t = 2.0
+
+    cases = [(vol_function_sabr, vol_function_sabr_grad,
+              np.array([0.2, 0.5, -0.8, 0.21])),
+             (vol_function_sabr_beta_half, vol_function_sabr_beta_half_grad,
+              np.array([0.05, -0.3, 0.5])),
+             (vol_function_sabr_beta_one, vol_function_sabr_beta_one_grad,
+              np.array([0.2, -0.3, 0.5]))]
+
+    for vol_fn, grad_fn, params in cases:
+        for k in [0.030, 0.043, 0.060]:
+            grad = grad_fn(params, f, k, t)
+            expected = finite_difference_grad(vol_fn, params, f, k, t)
+            assert np.max(np.abs(grad - expected)) < 1e-7
@@ -129,3 +129,33 @@ def test_bloombergPricingExample():
                                             oisCurve), 4) == 53714.3020
     assert round(swaps[0]._float_leg.value(
         settleDt, oisCurve, None), 4) == 53714.3020
+
+
+def test_bootstrap_reprices_swaps():
+    value_date = Date(6, 6, 2018)
+    settleDt = value_date.add_weekdays(2)
+    depos = [IborDeposit(value_date, "1D", 0.0140, DayCountTypes.ACT_360)]
+
+    swaps = []
+    for tenor, rate in zip(["1Y", "2Y", "3Y", "5Y", "10Y", "30Y"],
+                           [0.0150, 0.0165, 0.0172, 0.0180, 0.0200, 0.0215]):
+        swap = OIS(settleDt, tenor, SwapTypes.RECEIVE, rate,
+                   FrequencyTypes.ANNUAL, DayCountTypes.ACT_360,
+                   float_spread=0.0005)
+        swaps.append(swap)
+
+    for interp_type in [InterpTypes.FLAT_FWD_RATES,
+                        InterpTypes.LINEAR_ZERO_RATES,
+                        InterpTypes.NATCUBIC_ZERO_RATES]:
+
+        oisCurve = OISCurve(value_date, depos, [], swaps, interp_type)
+
+        # Each swap is solved exactly when its pillar is added so the last
+        # swap is repriced by any scheme and all are by local schemes
+        v = swaps[-1].value(value_date, oisCurve)
+        assert abs(v / swaps[-1]._fixed_leg._notional) < 1e-12
+
+        if interp_type != InterpTypes.NATCUBIC_ZERO_RATES:
+            for swap in swaps:
+                v = swap.value(value_date, oisCurve)
+                assert abs(v / swap._fixed_leg._notional) < 1e-12
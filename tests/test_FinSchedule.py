@@ -5,9 +5,13 @@
 from financepy.utils.date import Date, set_date_format, DateFormatTypes
 from financepy.utils.calendar import CalendarTypes, Calendar
 from financepy.utils.frequency import FrequencyTypes
-from financepy.utils.schedule import Schedule
+from financepy.utils.schedule import Schedule, gScheduleCache
 from financepy.utils.calendar import DateGenRuleTypes
 from financepy.utils.calendar import BusDayAdjustTypes
+from financepy.utils.calendar import JointCalendar
+from financepy.products.rates.ibor_swap import IborSwap
+from financepy.utils.global_types import SwapTypes
+from financepy.utils.day_count import DayCountTypes
 
 
 termination_dateAdjust = True
@@ -215,3 +219,64 @@ def test_forward_end_stub():
     adjusted_dates = schedule._adjusted_dates
     assert len(adjusted_dates) == 5
     check_frequency(schedule)
+
+
+def test_schedule_cache():
+    d1 = Date(20, 6, 2018)
+    d2 = Date(31, 3, 2025)
+    freq_type = FrequencyTypes.QUARTERLY
+    cal_type = CalendarTypes.TARGET
+    bd_type = BusDayAdjustTypes.MODIFIED_FOLLOWING
+    dg_type = DateGenRuleTypes.BACKWARD
+
+    gScheduleCache.clear()
+
+    schedule1 = Schedule(d1, d2, freq_type, cal_type, bd_type, dg_type)
+    assert gScheduleCache.misses == 1
+    assert gScheduleCache.hits == 0
+
+    schedule2 = Schedule(d1, d2, freq_type, cal_type, bd_type, dg_type)
+    assert gScheduleCache.hits == 1
+
+    assert schedule1._adjusted_dates == schedule2._adjusted_dates
+    assert schedule1._termination_date == schedule2._termination_date
+    assert schedule1._adjusted_dates is schedule2._adjusted_dates
+    assert isinstance(schedule1.schedule_dates(), tuple)
+
+    gScheduleCache.set_max_size(0)
+    Schedule(d1, d2, freq_type, cal_type, bd_type, dg_type)
+    assert len(gScheduleCache) == 0
+    gScheduleCache.set_max_size(10000)
+
+
+def test_joint_calendar_schedule():
+    d1 = Date(20, 6, 2018)
+    d2 = Date(20, 6, 2023)
+    freq_type = FrequencyTypes.QUARTERLY
+    bd_type = BusDayAdjustTypes.FOLLOWING
+    dg_type = DateGenRuleTypes.BACKWARD
+    cal_types = [CalendarTypes.UNITED_STATES, CalendarTypes.UNITED_KINGDOM]
+
+    gScheduleCache.clear()
+
+    joint_calendar = JointCalendar(cal_types)
+    schedule = Schedule(d1, d2, freq_type, joint_calendar, bd_type, dg_type)
+
+    # The payment dates are business days in both calendars
+    for dt in schedule._adjusted_dates[1:]:
+        for cal_type in cal_types:
+            assert Calendar(cal_type).is_business_day(dt)
+
+    # An equal joint calendar shares the cache entry
+    Schedule(d1, d2, freq_type, JointCalendar(cal_types), bd_type, dg_type)
+    assert gScheduleCache.hits == 1
+
+    # A schedule on one of the calendars alone is a different entry
+    Schedule(d1, d2, freq_type, CalendarTypes.UNITED_STATES, bd_type, dg_type)
+    assert gScheduleCache.misses == 2
+
+    swap = IborSwap(d1, d2, SwapTypes.PAY, 0.02, freq_type,
+                    DayCountTypes.ACT_360,
+                    cal_type=joint_calendar, bd_type=bd_type)
+    assert tuple(swap._fixed_leg._payment_dates) == \
+        schedule._adjusted_dates[1:]
@@ -0,0 +1,161 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+from financepy.utils.date import Date
+from financepy.utils.error import FinError
+from financepy.utils.global_types import FinSolverTypes
+from financepy.models.volatility_fns import VolFuncTypes
+from financepy.market.volatility.swaption_vol_surface import \
+    SwaptionVolSurface
+
+# https://fr.mathworks.com/help/fininst/pricing-a-swaption-using-the-sabr-model.html
+value_date = Date(12, 6, 2013)
+
+# These are 3M, 1Y, 2Y, 3Y, 4Y, 5Y, 7Y, 10Y
+expiry_dates = [Date(12, 9, 2013), Date(12, 6, 2014),
+                Date(12, 6, 2015), Date(12, 6, 2016),
+                Date(12, 6, 2017), Date(12, 6, 2018),
+                Date(12, 6, 2020), Date(12, 6, 2023)]
+
+# First dimension is the strike, then the expiry date
+market_vols = [[57.6, 53.7, 49.4, 45.6, 44.1, 41.1, 35.2, 32.0],
+               [46.6, 46.9, 44.8, 41.6, 39.8, 37.4, 33.4, 31.0],
+               [35.9, 39.3, 39.6, 37.9, 37.2, 34.7, 30.5, 28.9],
+               [34.1, 36.5, 37.8, 36.6, 35.0, 31.9, 28.1, 26.6],
+               [41.0, 41.3, 39.5, 37.8, 36.0, 32.6, 29.0, 26.0],
+               [45.8, 43.4, 41.9, 39.2, 36.9, 33.2, 29.6, 26.3],
+               [50.3, 46.9, 44.0, 40.0, 37.5, 33.8, 30.2, 27.3]]
+
+market_vols = np.array(market_vols) / 100.0
+
+market_strikes = [[1.00, 1.25, 1.68, 2.00, 2.26, 2.41, 2.58, 2.62],
+                  [1.50, 1.75, 2.18, 2.50, 2.76, 2.91, 3.08, 3.12],
+                  [2.00, 2.25, 2.68, 3.00, 3.26, 3.41, 3.58, 3.62],
+                  [2.50, 2.75, 3.18, 3.50, 3.76, 3.91, 4.08, 4.12],
+                  [3.00, 3.25, 3.68, 4.00, 4.26, 4.41, 4.58, 4.62],
+                  [3.50, 3.75, 4.18, 4.50, 4.76, 4.91, 5.08, 5.12],
+                  [4.00, 4.25, 4.68, 5.00, 5.26, 5.41, 5.58, 5.62]]
+
+market_strikes = np.array(market_strikes) / 100.0
+
+fwd_swap_rates = market_strikes[3]
+
+
+def fitted_vols(surface):
+    """ The surface vols at the quoted strikes and expiry dates. """
+
+    vols = np.zeros(market_vols.shape)
+    for i in range(0, len(market_strikes)):
+        for j in range(0, len(expiry_dates)):
+            vols[i, j] = surface.vol_from_strike_date(market_strikes[i, j],
+                                                      expiry_dates[j])
+    return vols
+
+
+def test_swaption_vol_surface_parallel():
+    serial = SwaptionVolSurface(value_date, expiry_dates,
+                                fwd_swap_rates, market_strikes,
+                                market_vols,
+                                VolFuncTypes.SABR_BETA_HALF)
+
+    # The fits do not depend on the number of processes or on whether they
+    # are done in an executor shared between surfaces
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        for num_processes, ex in [(2, None), (3, None), (1, executor),
+                                  (1, executor)]:
+            surface = SwaptionVolSurface(value_date, expiry_dates,
+                                         fwd_swap_rates, market_strikes,
+                                         market_vols,
+                                         VolFuncTypes.SABR_BETA_HALF,
+                                         num_processes=num_processes,
+                                         executor=ex)
+
+            assert (surface._parameters == serial._parameters).all()
+
+        new_vols = market_vols.copy()
+        new_vols[:, 2:5] += 0.002
+        assert serial.recalibrate(new_vols) == 3
+        assert surface.recalibrate(new_vols, executor=executor) == 3
+        assert (surface._parameters == serial._parameters).all()
+
+
+def test_swaption_vol_surface_levenberg_marquardt():
+    errors = []
+    for solver_type in [FinSolverTypes.NELDER_MEAD,
+                        FinSolverTypes.LEVENBERG_MARQUARDT]:
+        surface = SwaptionVolSurface(value_date, expiry_dates,
+                                     fwd_swap_rates, market_strikes,
+                                     market_vols,
+                                     VolFuncTypes.SABR_BETA_HALF,
+                                     solver_type)
+        vols = fitted_vols(surface)
+        errors.append(np.sqrt(np.mean((vols - market_vols)**2)))
+
+    assert errors[1] < errors[0] + 1e-6
+
+
+def test_swaption_vol_surface_recalibrate():
+    surface = SwaptionVolSurface(value_date, expiry_dates,
+                                 fwd_swap_rates, market_strikes,
+                                 market_vols,
+                                 VolFuncTypes.SABR_BETA_HALF,
+                                 FinSolverTypes.LEVENBERG_MARQUARDT)
+
+    # Nothing is refitted if the quotes have not moved
+    previous_parameters = surface._parameters.copy()
+    assert surface.recalibrate(market_vols) == 0
+    assert (surface._parameters == previous_parameters).all()
+
+    # Only the expiry whose quotes move is refitted
+    new_vols = market_vols.copy()
+    new_vols[:, 2] += 0.002
+    assert surface.recalibrate(new_vols) == 1
+    unchanged = [0, 1, 3, 4, 5, 6, 7]
+    assert (surface._parameters[unchanged] ==
+            previous_parameters[unchanged]).all()
+
+    # Only the expiry whose forward moves in relative terms is refitted
+    new_fwd_swap_rates = fwd_swap_rates.copy()
+    new_fwd_swap_rates[5] *= 1.001
+    assert surface.recalibrate(new_vols,
+                               fwd_swap_rates=new_fwd_swap_rates) == 1
+
+    rebuilt = SwaptionVolSurface(value_date, expiry_dates,
+                                 new_fwd_swap_rates, market_strikes,
+                                 new_vols,
+                                 VolFuncTypes.SABR_BETA_HALF,
+                                 FinSolverTypes.LEVENBERG_MARQUARDT)
+
+    assert np.max(np.abs(fitted_vols(surface) - fitted_vols(rebuilt))) < 1e-4
+
+    # The previous surface must have the same expiry dates and strikes
+    other = SwaptionVolSurface(value_date, expiry_dates,
+                               fwd_swap_rates, market_strikes + 0.001,
+                               market_vols,
+                               VolFuncTypes.SABR_BETA_HALF,
+                               FinSolverTypes.LEVENBERG_MARQUARDT)
+
+    with pytest.raises(FinError):
+        surface.recalibrate(market_vols, previous_surface=other)
+
+
+def test_swaption_vol_grid():
+    surface = SwaptionVolSurface(value_date, expiry_dates,
+                                 fwd_swap_rates, market_strikes,
+                                 market_vols,
+                                 VolFuncTypes.SABR_BETA_HALF,
+                                 FinSolverTypes.LEVENBERG_MARQUARDT)
+
+    tol = 1e-4
+    grid = surface.build_vol_grid(tol=tol)
+
+    # The grid covers all of the quoted strikes including the 3M 1% strike
+    t_exps = np.tile(surface._t_exp, (len(market_strikes), 1))
+    vols = grid.vol_from_strikes_times(market_strikes, t_exps)
+    assert np.max(np.abs(vols - fitted_vols(surface))) < tol
@@ -0,0 +1,110 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+from numba import njit
+
+from financepy.utils.date import Date
+from financepy.models.volatility_fns import VolFuncTypes
+from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
+from financepy.market.volatility.equity_vol_surface import EquityVolSurface
+from financepy.market.volatility.fx_vol_surface import FinFXDeltaMethod
+from financepy.market.volatility.fx_vol_surface import FinFXATMMethod
+from financepy.market.volatility.fx_vol_surface import FXVolSurface
+from financepy.market.volatility.vol_grid import vol_grid_lookup
+
+
+@njit
+def sum_of_vols(grid_arrays, strikes, t):
+    t_grid, log_fwds, x_mins, dxs, var_grid = grid_arrays
+    total = 0.0
+    for k in strikes:
+        total += vol_grid_lookup(t_grid, log_fwds, x_mins, dxs, var_grid,
+                                 k, t)
+    return total
+
+
+def test_equity_vol_grid():
+    value_date = Date(11, 1, 2021)
+    stock_price = 3800.0
+
+    expiry_dates = [Date(11, 2, 2021), Date(11, 7, 2021), Date(11, 1, 2023)]
+    strikes = np.array([3037, 3418, 3608, 3703, 3798,
+                        3893, 3988, 4178, 4557])
+
+    volSurface = [[42.94, 31.30, 25.88, 22.94, 19.72, 16.90, 15.31, 17.54, 25.67],
+                  [31.41, 26.25, 23.51, 22.05, 20.61, 19.25, 18.03, 16.01, 15.90],
+                  [27.59, 24.33, 22.72, 21.93, 21.17, 20.43, 19.71, 18.36, 16.26]]
+    volSurface = np.array(volSurface) / 100.0
+
+    discount_curve = DiscountCurveFlat(value_date, 0.020)
+    dividend_curve = DiscountCurveFlat(value_date, 0.010)
+
+    surface = EquityVolSurface(value_date, stock_price,
+                               discount_curve, dividend_curve,
+                               expiry_dates, strikes, volSurface,
+                               VolFuncTypes.CLARK5)
+
+    tol = 1e-4
+    grid = surface.build_vol_grid(tol=tol)
+
+    # Times before, between and after the expiries
+    test_strikes = np.linspace(3200.0, 4400.0, 61)
+    test_times = np.array([0.02, 0.0849, 0.3, 1.0, 2.0, 3.5])
+    k, t = np.meshgrid(test_strikes, test_times)
+
+    vols = grid.vol_from_strikes_times(k, t)
+    expected = surface.vol_from_strikes_times(k, t)
+    assert vols.shape == k.shape
+    assert np.max(np.abs(vols - expected)) < tol
+
+    total = sum_of_vols(grid.arrays, test_strikes, 1.0)
+    assert abs(total - np.sum(vols[3])) < 1e-10
+
+    # A narrow grid is still widened to cover the quoted strikes
+    grid = surface.build_vol_grid(num_std=0.5, tol=tol)
+    t_exps = surface._t_exp
+
+    for t in t_exps:
+        vols = grid.vol_from_strikes_times(strikes, t)
+        expected = surface.vol_from_strikes_times(strikes, t)
+        assert np.max(np.abs(vols - expected)) < tol
+
+
+def test_fx_vol_grid():
+    value_date = Date(10, 4, 2020)
+
+    dom_discount_curve = DiscountCurveFlat(value_date, 0.02940)
+    for_discount_curve = DiscountCurveFlat(value_date, 0.03460)
+
+    tenors = ['1M', '2M', '3M', '6M', '1Y', '2Y']
+    atm_vols = [21.00, 21.00, 20.750, 19.400, 18.250, 17.677]
+    marketStrangle25DeltaVols = [0.65, 0.75, 0.85, 0.90, 0.95, 0.85]
+    riskReversal25DeltaVols = [-0.20, -0.25, -0.30, -0.50, -0.60, -0.562]
+
+    fxMarket = FXVolSurface(value_date,
+                            1.3465,
+                            "EURUSD",
+                            "EUR",
+                            dom_discount_curve,
+                            for_discount_curve,
+                            tenors,
+                            atm_vols,
+                            marketStrangle25DeltaVols,
+                            riskReversal25DeltaVols,
+                            FinFXATMMethod.FWD_DELTA_NEUTRAL,
+                            FinFXDeltaMethod.SPOT_DELTA,
+                            VolFuncTypes.CLARK)
+
+    grid = fxMarket.build_vol_grid(num_log_moneyness=11, tol=1e-5)
+    assert grid._var_grid.shape[1] > 11
+    assert grid._max_error < 1e-5
+
+    for tenor in ['1M', '5M', '18M', '3Y']:
+        expiry_date = value_date.add_tenor(tenor)
+        t = (expiry_date - value_date) / 365.0
+        for strike in [1.20, 1.30, 1.35, 1.40, 1.50]:
+            vol = grid.vol_from_strikes_times(strike, t)
+            expected = fxMarket.volatility(strike, expiry_date)
+            assert abs(vol - expected) < 1e-5
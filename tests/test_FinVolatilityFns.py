@@ -0,0 +1,45 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+
+from financepy.models.volatility_fns import vol_function_clark
+from financepy.models.volatility_fns import vol_function_clark_grad
+from financepy.models.volatility_fns import vol_function_svi
+from financepy.models.volatility_fns import vol_function_svi_grad
+
+
+def finite_difference_grad(vol_fn, params, f, k, t):
+    grad = np.zeros(len(params))
+    for i in range(0, len(params)):
+        up = params.copy()
+        up[i] += 1e-6
+        down = params.copy()
+        down[i] -= 1e-6
+        grad[i] = (vol_fn(up, f, k, t) - vol_fn(down, f, k, t)) / 2e-6
+    return grad
+
+
+def test_clark_grad():
+    f = 1.35
+    t = 0.5
+
+    for params in [np.array([np.log(0.2), 0.1, 0.5]),
+                   np.array([np.log(0.2), 0.1, 0.5, 0.2, -0.1])]:
+        for k in [1.1, 1.35, 1.6]:
+            grad = vol_function_clark_grad(params, f, k, t)
+            expected = finite_difference_grad(vol_function_clark, params,
+                                              f, k, t)
+            assert np.max(np.abs(grad - expected)) < 1e-7
+
+
+def test_svi_grad():
+    f = 100.0
+    t = 1.5
+    params = np.array([0.02, 0.1, -0.4, 0.05, 0.1])
+
+    for k in [70.0, 100.0, 130.0]:
+        grad = vol_function_svi_grad(params, f, k, t)
+        expected = finite_difference_grad(vol_function_svi, params, f, k, t)
+        assert np.max(np.abs(grad - expected)) < 1e-7
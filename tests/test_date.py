@@ -2,11 +2,18 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ###############################################################################
 
+import copy
 import datetime
+import pickle
 import numpy as np
 import time
 
+import pytest
+
 from financepy.utils.date import Date, date_range
+from financepy.utils.date import date_to_excel_serial, excel_serial_to_date
+from financepy.utils.date import intern_date
+from financepy.utils.error import FinError
 
 # Not under test
 
@@ -340,3 +347,53 @@ def test_list_of_date():
     # Test finding date difference
     assert (Date(1, 1, 2019) - dates) == [Date(1, 1, 2019) - d for d in dates]
     assert (dates - Date(1, 1, 2019)) == [Date(1, 1, 2019) - d for d in dates]
+
+
+def test_excel_serial_conversion():
+    assert date_to_excel_serial(1, 1, 1900) == 1
+    assert date_to_excel_serial(1, 3, 1900) == 61
+    assert date_to_excel_serial(1, 3, 2020) == 43891
+    assert excel_serial_to_date(43891) == (1, 3, 2020)
+    assert excel_serial_to_date(60) == (29, 2, 1900)
+
+
+def test_excel_serial_round_trip_1900():
+    # Excel counts 29 Feb 1900 so the serials either side of it must agree
+    for serial in range(1, 400):
+        d, m, y = excel_serial_to_date(serial)
+        assert date_to_excel_serial(d, m, y) == serial
+
+    assert date_to_excel_serial(29, 2, 1900) == 60
+    assert excel_serial_to_date(61) == (1, 3, 1900)
+    assert Date(1, 3, 1900)._excel_date - Date(28, 2, 1900)._excel_date == 2
+
+
+def test_dates_after_2100():
+    assert Date(1, 1, 2150).add_days(-1) == Date(31, 12, 2149)
+    assert Date(15, 6, 2020).add_years(100) == Date(15, 6, 2120)
+
+
+def test_date_is_hashable():
+    cache = {Date(1, 1, 2020): 1.0}
+    assert cache[Date(1, 1, 2020)] == 1.0
+    assert len({Date(1, 1, 2020), Date(1, 1, 2020), Date(2, 1, 2020)}) == 2
+
+
+def test_date_is_immutable():
+    dt = Date(1, 1, 2020)
+    with pytest.raises(FinError):
+        dt._d = 2
+    assert not hasattr(dt, "__dict__")
+    assert copy.deepcopy(dt) is dt
+    assert pickle.loads(pickle.dumps(dt)) == dt
+
+
+def test_intern_date():
+    assert intern_date(Date(5, 5, 2020)) is intern_date(Date(5, 5, 2020))
+
+
+def test_add_tenor_interns_dates():
+    d1 = Date(5, 5, 2020).add_tenor("3M")
+    d2 = Date(5, 5, 2020).add_tenor("3M")
+    assert d1 is d2
+    assert d1 is intern_date(Date(5, 8, 2020))
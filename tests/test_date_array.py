@@ -0,0 +1,92 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+
+from financepy.utils.date import Date
+from financepy.utils.date_array import DateArray
+
+
+dates = [Date(1, 1, 1900), Date(28, 2, 1900), Date(1, 3, 1900),
+         Date(31, 1, 2019), Date(29, 2, 2020), Date(30, 6, 2021),
+         Date(31, 12, 2099)]
+
+
+def test_round_trip():
+    da = DateArray.from_dates(dates)
+    assert len(da) == len(dates)
+    assert list(da.serials) == [dt._excel_date for dt in dates]
+    assert da.to_dates() == dates
+    assert da[3] == dates[3]
+
+
+def test_from_dmy():
+    da = DateArray.from_dmy([5, 1], [1, 3], [1900, 2020])
+    assert list(da.serials) == [5, 43891]
+
+
+def test_weekday():
+    da = DateArray.from_dates(dates)
+    assert list(da.weekday) == [dt._weekday for dt in dates]
+    assert list(da.is_weekend()) == [dt.is_weekend() for dt in dates]
+
+
+def test_eom():
+    da = DateArray.from_dates(dates)
+    assert da.eom().to_dates() == [dt.eom() for dt in dates]
+    assert list(da.is_eom()) == [dt.is_eom() for dt in dates]
+
+
+def test_add_days_and_months():
+    da = DateArray.from_dates(dates)
+    assert da.add_days(45).to_dates() == [dt.add_days(45) for dt in dates]
+    assert da[3:].add_days(-45)[0] == dates[3].add_days(-45)
+
+    for mm in [1, 5, -13, 24]:
+        assert da[3:].add_months(mm).to_dates() == \
+            [dt.add_months(mm) for dt in dates[3:]]
+
+    shifts = np.array([1, 2, 3, 4])
+    shifted = da[3:].add_months(shifts).to_dates()
+    assert shifted == [dt.add_months(int(mm))
+                       for dt, mm in zip(dates[3:], shifts)]
+
+
+def test_add_tenor():
+    da = DateArray.from_dates(dates[3:-1])
+    for tenor in ["5D", "-7D", "2W", "1M", "3M", "-1M", "1Y", "5Y", "-2Y"]:
+        assert da.add_tenor(tenor).to_dates() == \
+            [dt.add_tenor(tenor) for dt in dates[3:-1]]
+
+
+def test_comparisons():
+    da = DateArray.from_dates(dates)
+    assert list(da < Date(1, 1, 2000)) == [True] * 3 + [False] * 4
+    assert list(da == da) == [True] * 7
+    assert list(da.add_days(3) - da) == [3] * 7
+
+
+def test_datetime64():
+    x = np.array(["1900-01-01", "1900-02-28", "1900-03-01", "2019-01-31",
+                  "2020-02-29", "2021-06-30", "2099-12-31"],
+                 dtype="datetime64[D]")
+    da = DateArray.from_datetime64(x)
+    assert da.to_dates() == dates
+    assert np.all(da.to_datetime64() == x)
+
+    x_ns = x.astype("datetime64[ns]") + np.timedelta64(13, "h")
+    assert DateArray.from_datetime64(x_ns).to_dates() == dates
+
+    assert Date.from_date(x[1]) == dates[1]
+    assert Date.from_date(x_ns[4]) == dates[4]
+
+
+def test_from_strings():
+    strings = ["1900-01-01", "1900-02-28", "1900-03-01", "2019-01-31",
+               "2020-02-29", "2021-06-30", "2099-12-31"]
+    assert DateArray.from_strings(strings).to_dates() == dates
+    assert DateArray.from_strings(np.array(strings)).to_dates() == dates
+
+    da = DateArray.from_strings(["31/01/2019", "29/02/2020"], "%d/%m/%Y")
+    assert da.to_dates() == dates[3:5]